@@ -0,0 +1,43 @@
+"""
+Avatars served by this site in place of gravatar.com.
+
+With AVATAR_PROXY set, pages link each avatar to the avatar view, which fetches
+the image from gravatar once per process and size and serves it from the cache
+afterwards. Browsers listing members thus only ask this site, which they may
+cache the images of for AVATAR_MAX_AGE, and gravatar does not learn who views
+whose avatar. Images gravatar cannot be fetched for are left uncached, so the
+next request tries again.
+"""
+
+import urllib.request
+
+from django.conf import settings
+from django.core.cache import cache
+
+from clubs.models.user_models import email_hash
+
+AVATAR_FETCH_TIMEOUT = 5
+# Gravatar serves images of at most 2048 pixels square, far below this.
+MAX_AVATAR_BYTES = 1024 * 1024
+
+def get_avatar(user, size):
+    """Return the content type and bytes of a user's gravatar, or None if it could not be fetched."""
+    key = f'avatar:{user.email_hash or email_hash(user.email)}:{size}'
+    avatar = cache.get(key)
+    if avatar is None:
+        avatar = fetch_avatar(user.gravatar_url(size))
+        if avatar is not None:
+            cache.set(key, avatar, timeout=settings.AVATAR_MAX_AGE)
+    return avatar
+
+def fetch_avatar(url):
+    try:
+        with urllib.request.urlopen(url, timeout=AVATAR_FETCH_TIMEOUT) as response:
+            content_type = response.headers.get_content_type()
+            content = response.read(MAX_AVATAR_BYTES + 1)
+    except OSError:
+        # Unreachable, timed out or answered with an error status.
+        return None
+    if not content_type.startswith('image/') or len(content) > MAX_AVATAR_BYTES:
+        return None
+    return content_type, content
@@ -0,0 +1,52 @@
+"""
+Version numbers for cached content, kept in the shared cache.
+
+Cached content includes the version of the object it was built from in its key,
+so bumping the version makes every earlier entry unreachable, and those expire
+on their own. Content is cached in each process, but versions are read from the
+cache every process shares, so a bump in one process reaches them all.
+
+Versions are taken from the current time, both when one is missing, e.g. because
+it was evicted, and when one is bumped, so a version never coincides with an
+earlier one and concurrent bumps cannot undo each other.
+"""
+
+import time
+
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+# The cache every process reads, for versions and for figures collected across processes.
+shared_cache = ConnectionProxy(caches, 'shared')
+
+# Knockout stages and groups, bumped whenever one of their matches changes.
+MATCH_COLLECTIONS = 'match_collection'
+# The club directory as a whole, bumped whenever any club changes.
+CLUB_DIRECTORY = 'club_directory'
+# Paginated lists, e.g. the members of a club, bumped whenever one of their rows changes.
+PAGINATED_LISTS = 'paginated_list'
+
+def version_key(namespace, object_id):
+    return f'version:{namespace}:{object_id}'
+
+def get_versions(namespace, object_ids):
+    """Return the current version of each object id, reading the cache once."""
+    keys = {object_id: version_key(namespace, object_id) for object_id in object_ids}
+    stored = shared_cache.get_many(keys.values())
+    missing = {key: time.time_ns() for key in keys.values() if key not in stored}
+    if missing:
+        shared_cache.set_many(missing, timeout=None)
+        stored.update(missing)
+    return {object_id: stored[key] for object_id, key in keys.items()}
+
+def get_version(namespace, object_id):
+    return get_versions(namespace, [object_id])[object_id]
+
+def bump_version(namespace, object_id):
+    """Invalidate everything cached for an object."""
+    shared_cache.set(version_key(namespace, object_id), time.time_ns(), timeout=None)
+
+def bump_versions(namespace, object_ids):
+    """Invalidate everything cached for several objects, writing the cache once."""
+    version = time.time_ns()
+    shared_cache.set_many({version_key(namespace, object_id): version for object_id in object_ids}, timeout=None)
@@ -0,0 +1,47 @@
+"""
+Rows being deleted by the cascade under way.
+
+Counters kept on a parent row, e.g. the member count of a club, are adjusted by
+post_delete receivers on its children. When the parent is deleted together with
+its children, adjusting it once per child is wasted work, as it is about to go.
+Receivers on the parent mark it in pre_delete, which Django sends for every row
+of a cascade before deleting any, and unmark it in post_delete, sent after its
+children are gone. Receivers on the children check the mark first.
+
+Marks are kept per thread. A failed delete rolls back without sending
+post_delete, so marks left behind are dropped as the next request starts.
+"""
+
+import threading
+from contextlib import contextmanager
+
+_local = threading.local()
+
+def _marks():
+    if not hasattr(_local, 'marks'):
+        _local.marks = set()
+    return _local.marks
+
+def mark_deleting(model, pk):
+    _marks().add((model._meta.label, pk))
+
+def unmark_deleting(model, pk):
+    _marks().discard((model._meta.label, pk))
+
+def is_being_deleted(model, pk):
+    return (model._meta.label, pk) in _marks()
+
+@contextmanager
+def deleting(model, pks):
+    """Mark rows as being deleted for the duration of the block, e.g. while their children are deleted in bulk."""
+    pks = list(pks)
+    for pk in pks:
+        mark_deleting(model, pk)
+    try:
+        yield
+    finally:
+        for pk in pks:
+            unmark_deleting(model, pk)
+
+def clear_marks(**kwargs):
+    _marks().clear()
@@ -0,0 +1,120 @@
+"""
+Cached pages of the club directory.
+
+The directory only changes when a club is created, edited or deleted, so the
+number of clubs and each page of clubs are cached under the directory's version,
+which signals on Club bump. Pages are cached in each process, and the version in
+the cache all processes share.
+
+Hits and misses are counted in each process's own cache, which costs no more
+than the lookup itself, and added to counts in the shared cache at most once a
+STATS_FLUSH_INTERVAL, so the hit rate covers every process while lookups stay
+off the shared cache. The shared counts therefore lag by up to that interval,
+and, as adding to them is not atomic on every backend, processes flushing at
+the same moment may lose a few lookups.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from clubs.models import Club
+from clubs.cache_versions import get_version, bump_version, shared_cache, CLUB_DIRECTORY
+from clubs.pagination import KeysetList
+
+HITS_KEY = 'club_directory:hits'
+MISSES_KEY = 'club_directory:misses'
+# Lookups counted in this process and not yet added to the shared counts, and when they are next added.
+PENDING_KEYS = {HITS_KEY: 'club_directory:pending_hits', MISSES_KEY: 'club_directory:pending_misses'}
+FLUSH_DUE_KEY = 'club_directory:flush_due'
+STATS_FLUSH_INTERVAL = 60
+
+_flush_lock = threading.Lock()
+
+class CachedDirectory:
+    """
+    A sorted list of clubs for a Paginator, answering from the cache where it can.
+
+    Only the count and slices of the clubs are ever taken by the Paginator, and
+    each page is a slice, so the cache holds one entry per page shown. Pages
+    missing from it are fetched by seeking past the pages beside them, where
+    those were fetched, and with OFFSET otherwise.
+    """
+    def __init__(self, clubs, param=None, order=None):
+        self.key_prefix = f'club_directory:{get_version(CLUB_DIRECTORY, "all")}:{param}:{order}'
+        self.clubs = KeysetList(clubs, self.key_prefix, count=self.count)
+
+    def count(self):
+        return self._cached(f'{self.key_prefix}:count', self.clubs.queryset.count)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        clubs = self._cached(f'{self.key_prefix}:{index.start}:{index.stop}', lambda: list(self.clubs[index]))
+        # Members join and leave far more often than clubs change, so their counts are read afresh.
+        member_counts = dict(Club.objects.filter(pk__in=[club.pk for club in clubs]).values_list('pk', 'member_count'))
+        for club in clubs:
+            club.member_count = member_counts.get(club.pk, club.member_count)
+        return clubs
+
+    def __len__(self):
+        return self.count()
+
+    def _cached(self, key, compute):
+        value = cache.get(key)
+        if value is None:
+            record(False)
+            value = compute()
+            cache.set(key, value, timeout=settings.CLUB_DIRECTORY_CACHE_TIMEOUT)
+        else:
+            record(True)
+        return value
+
+def invalidate_directory():
+    bump_version(CLUB_DIRECTORY, 'all')
+
+def record(hit):
+    _add(cache, PENDING_KEYS[HITS_KEY if hit else MISSES_KEY], 1)
+    cache.add(FLUSH_DUE_KEY, time.monotonic() + STATS_FLUSH_INTERVAL, timeout=None)
+    if time.monotonic() >= cache.get(FLUSH_DUE_KEY, 0):
+        flush_directory_cache_stats()
+
+def flush_directory_cache_stats():
+    """Add the lookups counted in this process to the counts in the shared cache."""
+    with _flush_lock:
+        cache.delete(FLUSH_DUE_KEY)
+        pending = cache.get_many(PENDING_KEYS.values())
+        for key, pending_key in PENDING_KEYS.items():
+            count = pending.get(pending_key)
+            if not count:
+                continue
+            # Lookups counted meanwhile stay pending.
+            _add(cache, pending_key, -count)
+            _add(shared_cache, key, count)
+
+def _add(counts, key, delta):
+    if not counts.add(key, delta, timeout=None):
+        try:
+            counts.incr(key, delta)
+        except ValueError:
+            # Evicted between add and incr, so the count starts again.
+            counts.add(key, delta, timeout=None)
+
+def directory_cache_stats():
+    """Return the hits, misses and hit rate of the directory cache since its stats were last reset."""
+    flush_directory_cache_stats()
+    counts = shared_cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counts.get(HITS_KEY, 0)
+    misses = counts.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / lookups if lookups else None,
+    }
+
+def reset_directory_cache_stats():
+    cache.delete_many(list(PENDING_KEYS.values()) + [FLUSH_DUE_KEY])
+    shared_cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -96,6 +96,52 @@ class ApplyToClubForm(forms.ModelForm):
         )
         return application
 
+class ApplicationIdsField(forms.MultipleChoiceField):
+    """Ids of applications, which may since have been answered, so they are checked by the view rather than as choices."""
+
+    def to_python(self, value):
+        try:
+            return [int(application_id) for application_id in super().to_python(value)]
+        except ValueError:
+            raise forms.ValidationError('Select applications from the list.', code='invalid')
+
+    def validate(self, value):
+        if self.required and not value:
+            raise forms.ValidationError(self.error_messages['required'], code='required')
+
+class RespondToApplicationsForm(forms.Form):
+    """Form to accept or reject the selected applications to a club, or all of those matching a filter."""
+    SELECTED = 'selected'
+    MATCHING = 'matching'
+
+    decision = forms.ChoiceField(choices=[('accept', 'Accept'), ('reject', 'Reject')])
+    scope = forms.ChoiceField(choices=[(SELECTED, 'Selected applications'), (MATCHING, 'All applications matching the filter')])
+    applications = ApplicationIdsField(required=False)
+    experience = forms.TypedChoiceField(
+        choices=[('', 'Any experience')] + list(User.LEVELS), coerce=int, required=False, empty_value=None
+    )
+
+    def clean(self):
+        super().clean()
+        if self.cleaned_data.get('scope') == self.SELECTED and not self.cleaned_data.get('applications'):
+            raise forms.ValidationError('Select at least one application.')
+
+    def is_accept(self):
+        return self.cleaned_data['decision'] == 'accept'
+
+    def chosen_applications(self, club):
+        """Return the applications to club the form chose."""
+        applications = club.get_applications()
+        if self.cleaned_data['scope'] == self.SELECTED:
+            return applications.filter(pk__in=self.cleaned_data['applications'])
+        if self.cleaned_data['experience'] is not None:
+            applications = applications.filter(user__experience=self.cleaned_data['experience'])
+        return applications
+
+class ImportRosterForm(forms.Form):
+    """Form to upload a CSV roster of members to a club."""
+    roster = forms.FileField(label='Roster (CSV)')
+
 class EditAccountForm(forms.ModelForm):
     class Meta:
         model = User
@@ -0,0 +1,103 @@
+"""
+Per view measurements of database cost and latency.
+
+QueryInstrumentationMiddleware records, for each request, the queries run, the
+time spent in SQL, statements repeated with different parameters (the signature
+of an N+1 query) and the wall time, then adds them to the totals of the URL name
+the request resolved to. Totals are kept in the shared cache, so every process
+contributes to and can report the same figures. Merging is not atomic, so
+under concurrent requests a few measurements may be lost, which is fine for
+spotting regressions.
+"""
+
+import time
+
+from clubs.cache_versions import shared_cache
+
+VIEWS_KEY = 'instrumentation:views'
+# Only the most repeated statements of each view are kept, so totals stay small.
+MAX_SIGNATURES = 10
+UNRESOLVED = '<unresolved>'
+
+def view_key(view_name):
+    return f'instrumentation:view:{view_name}'
+
+class QueryRecorder:
+    """An execute wrapper noting the statements run while it is installed, and their duration."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0
+        self.signatures = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            # Parameters are kept apart from the SQL, so the same statement for other rows has the same text.
+            self.signatures[sql] = self.signatures.get(sql, 0) + 1
+
+    @property
+    def duplicates(self):
+        return {sql: count for sql, count in self.signatures.items() if count > 1}
+
+def record_request(view_name, recorder, wall_time):
+    """Add the measurements of a single request to the totals of its view."""
+    view_name = view_name or UNRESOLVED
+    stats = shared_cache.get(view_key(view_name)) or {
+        'requests': 0,
+        'queries': 0,
+        'max_queries': 0,
+        'sql_time': 0,
+        'wall_time': 0,
+        'duplicate_queries': 0,
+        'signatures': {},
+    }
+    stats['requests'] += 1
+    stats['queries'] += recorder.queries
+    stats['max_queries'] = max(stats['max_queries'], recorder.queries)
+    stats['sql_time'] += recorder.sql_time
+    stats['wall_time'] += wall_time
+    duplicates = recorder.duplicates
+    stats['duplicate_queries'] += sum(count - 1 for count in duplicates.values())
+    signatures = stats['signatures']
+    for sql, count in duplicates.items():
+        signatures[sql] = signatures.get(sql, 0) + count - 1
+    stats['signatures'] = dict(sorted(signatures.items(), key=lambda item: -item[1])[:MAX_SIGNATURES])
+    shared_cache.set(view_key(view_name), stats, timeout=None)
+
+    view_names = shared_cache.get(VIEWS_KEY) or []
+    if view_name not in view_names:
+        shared_cache.set(VIEWS_KEY, sorted(view_names + [view_name]), timeout=None)
+
+def view_reports():
+    """Return the averages of every view measured, most queries per request first."""
+    view_names = shared_cache.get(VIEWS_KEY) or []
+    totals = shared_cache.get_many([view_key(view_name) for view_name in view_names])
+    reports = []
+    for view_name in view_names:
+        stats = totals.get(view_key(view_name))
+        if not stats:
+            continue
+        requests = stats['requests']
+        reports.append({
+            'view': view_name,
+            'requests': requests,
+            'avg_queries': stats['queries'] / requests,
+            'max_queries': stats['max_queries'],
+            'avg_sql_ms': stats['sql_time'] * 1000 / requests,
+            'avg_wall_ms': stats['wall_time'] * 1000 / requests,
+            'avg_duplicate_queries': stats['duplicate_queries'] / requests,
+            'duplicate_signatures': [
+                {'sql': sql, 'repeats': repeats} for sql, repeats in stats['signatures'].items()
+            ],
+        })
+    reports.sort(key=lambda report: -report['avg_queries'])
+    return reports
+
+def reset_view_reports():
+    view_names = shared_cache.get(VIEWS_KEY) or []
+    shared_cache.delete_many([view_key(view_name) for view_name in view_names] + [VIEWS_KEY])
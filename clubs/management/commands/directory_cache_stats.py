@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from clubs.directory import directory_cache_stats, reset_directory_cache_stats
+
+class Command(BaseCommand):
+    """Report how often pages of the club directory were served from the cache."""
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Start counting again after reporting.")
+
+    def handle(self, *args, **options):
+        stats = directory_cache_stats()
+        hit_rate = "n/a" if stats['hit_rate'] is None else f"{stats['hit_rate']:.1%}"
+        self.stdout.write(f"Hits: {stats['hits']}, misses: {stats['misses']}, hit rate: {hit_rate}")
+        if options['reset']:
+            reset_directory_cache_stats()
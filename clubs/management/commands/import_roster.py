@@ -0,0 +1,33 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from clubs.models import Club
+from clubs.roster import import_roster, IMPORT_CHUNK_SIZE
+
+class Command(BaseCommand):
+    """Create accounts for the new users listed in a CSV roster, as members of a club."""
+    def add_arguments(self, parser):
+        parser.add_argument('club_id', type=int)
+        parser.add_argument('path', help="CSV with columns username, email, first_name, last_name, experience and role.")
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help="Rows written per transaction.")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("The chunk size must be positive.")
+        club = Club.objects.filter(pk=options['club_id']).first()
+        if club is None:
+            raise CommandError(f"No club with id {options['club_id']} exists.")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as roster_file:
+                result = import_roster(club, roster_file, options['chunk_size'])
+        except OSError as error:
+            raise CommandError(f"Could not read {options['path']}: {error.strerror}.")
+        except ValidationError as error:
+            raise CommandError(error.messages[0])
+
+        for line, reason in result.skipped:
+            self.stdout.write(f"Skipped line {line}: {reason}")
+        self.stdout.write(
+            f"Added {result.members_added} new users as members of {club.name}. "
+            f"{result.already_members} were already members, {len(result.skipped)} lines were skipped."
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from clubs.instrumentation import view_reports, reset_view_reports
+
+class Command(BaseCommand):
+    """Report the query counts and latency recorded for each view, most queries first."""
+    def add_arguments(self, parser):
+        parser.add_argument('--signatures', action='store_true', help="Also list the statements each view repeats.")
+        parser.add_argument('--reset', action='store_true', help="Start recording again after reporting.")
+
+    def handle(self, *args, **options):
+        reports = view_reports()
+        if not reports:
+            self.stdout.write("Nothing recorded. Set QUERY_INSTRUMENTATION to record requests.")
+        for report in reports:
+            self.stdout.write(
+                f"{report['view']}: {report['requests']} requests, "
+                f"{report['avg_queries']:.1f} queries (max {report['max_queries']}), "
+                f"{report['avg_duplicate_queries']:.1f} repeated, "
+                f"{report['avg_sql_ms']:.1f} ms SQL, {report['avg_wall_ms']:.1f} ms total"
+            )
+            if options['signatures']:
+                for signature in report['duplicate_signatures']:
+                    self.stdout.write(f"    {signature['repeats']} x {signature['sql']}")
+        if options['reset']:
+            reset_view_reports()
@@ -1,10 +1,15 @@
 from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import F
 from faker import Faker
 from random import sample, choice
 from django.utils.timezone import now
 from datetime import timedelta
-from clubs.models import User, Club, Membership, Application, Ban, Tournament, Organiser, Participant
-from ..helpers import complete_round
+from clubs.models.user_models import email_hash
+from clubs.models import User, Club, Membership, Application, Ban, Tournament, Organiser, Participant, MemberTournamentRelationship, RoundOfMatches
+from clubs.search import rebuild_search_index
+from ..helpers import complete_round, next_id, bulk_create_inherited, reset_sequences, invalidate_cached_content
 
 class Command(BaseCommand):
     """Fill the database with pseudorandom data and some mandated test cases."""
@@ -12,6 +17,12 @@ class Command(BaseCommand):
         super().__init__()
         self.faker = Faker('en_GB')
 
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, help="Generate this many users in bulk, for load testing.")
+        parser.add_argument('--clubs', type=int, help="Number of clubs to generate in bulk. Defaults to one per 100 users.")
+        parser.add_argument('--tournaments', type=int, help="Number of tournaments to generate in bulk. Defaults to one per club.")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Rows written per transaction in bulk mode.")
+
     def generate_random_data(self):
         for i in range(750):
             first_name = self.faker.first_name()
@@ -452,7 +463,183 @@ class Command(BaseCommand):
             )).save()
 
 
+    def generate_bulk_data(self, num_users, num_clubs, num_tournaments, chunk_size):
+        """
+        Generate a large dataset quickly, for load testing.
+
+        Rows are built in memory and written with bulk_create, chunk by chunk, each
+        chunk in its own transaction. Ids are assigned up front so related rows can
+        be built without reading anything back, and the id sequences are moved past
+        them afterwards. Every user shares one password hash.
+        """
+        password = make_password("Password123")
+        # Names are drawn from small pools, as generating them per user dominates the run time.
+        first_names = [name for name in (self.faker.first_name() for i in range(200)) if name.isalpha()]
+        last_names = [name for name in (self.faker.last_name() for i in range(200)) if name.isalpha()]
+        paragraphs = [self.faker.paragraph(nb_sentences=3) for i in range(50)]
+        countries = [country for country in (self.faker.country() for i in range(50)) if len(country) <= 50]
+
+        # Users
+        first_user_id = next_id(User)
+        for start in range(0, num_users, chunk_size):
+            users = []
+            for i in range(start, min(start + chunk_size, num_users)):
+                user_id = first_user_id + i
+                first_name = first_names[i % len(first_names)]
+                last_name = last_names[(i // len(first_names)) % len(last_names)]
+                email = f"{first_name}.{last_name}{user_id}@example.org"
+                users.append(User(
+                    id = user_id,
+                    username = f"{first_name[:16]}{user_id}",
+                    first_name = first_name,
+                    last_name = last_name,
+                    email = email,
+                    # bulk_create skips save, which keeps the hash up to date.
+                    email_hash = email_hash(email),
+                    bio = paragraphs[i % len(paragraphs)],
+                    experience = (i % 3) + 1,
+                    password = password,
+                ))
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            self.stdout.write(f"Users: {start + len(users)}/{num_users}")
+
+        # Clubs, with their members and applicants.
+        # Each club takes the next block of users as members: the first is owner, the second an officer.
+        members_per_club = min(num_users, max(2, num_users // num_clubs))
+        applicants_per_club = max(0, min(5, num_users - members_per_club))
+        first_club_id = next_id(Club)
+        first_membership_id = next_id(Membership)
+        for start in range(0, num_clubs, chunk_size):
+            clubs = []
+            memberships = []
+            applications = []
+            for k in range(start, min(start + chunk_size, num_clubs)):
+                club_id = first_club_id + k
+                clubs.append(Club(
+                    id = club_id,
+                    name = f"{self.faker.word().capitalize()} Club {club_id}",
+                    location = countries[k % len(countries)],
+                    description = paragraphs[k % len(paragraphs)],
+                    # bulk_create sends no signals, so counts are set up front.
+                    member_count = members_per_club,
+                ))
+                for j in range(members_per_club):
+                    memberships.append(Membership(
+                        id = first_membership_id + k * members_per_club + j,
+                        club_id = club_id,
+                        user_id = first_user_id + (k * members_per_club + j) % num_users,
+                        is_owner = j == 0,
+                        is_officer = j % 10 == 1,
+                    ))
+                for j in range(applicants_per_club):
+                    applications.append(Application(
+                        club_id = club_id,
+                        user_id = first_user_id + (k * members_per_club + members_per_club + j) % num_users,
+                        personal_statement = paragraphs[j % len(paragraphs)],
+                    ))
+            with transaction.atomic():
+                Club.objects.bulk_create(clubs)
+                Membership.objects.bulk_create(memberships)
+                Application.objects.bulk_create(applications)
+                # bulk_create sends no signals, and the ids may be those of clubs deleted by unseed.
+                invalidate_cached_content(clubs=[club.id for club in clubs])
+            self.stdout.write(f"Clubs: {start + len(clubs)}/{num_clubs}")
+
+        # Tournaments, spread evenly over the clubs, organised by each club's first officer.
+        # Owner and organiser do not play, so capacities are limited to the remaining members.
+        capacities = [capacity for capacity, label in Tournament.CAPACITIES if capacity <= members_per_club - 2]
+        if not capacities:
+            num_tournaments = 0
+        first_tournament_id = next_id(Tournament)
+        first_relationship_id = next_id(MemberTournamentRelationship)
+        next_relationship_id = first_relationship_id
+        seedtime = now()
+        for start in range(0, num_tournaments, chunk_size):
+            tournaments = []
+            organisers = []
+            participants = []
+            for t in range(start, min(start + chunk_size, num_tournaments)):
+                tournament_id = first_tournament_id + t
+                club_index = t % num_clubs
+                # Each club gets past, ongoing and upcoming tournaments in turn.
+                phase = (t // num_clubs) % 3
+                if phase == 0:
+                    starttime = seedtime - timedelta(hours=48)
+                elif phase == 1:
+                    starttime = seedtime - timedelta(hours=12)
+                else:
+                    starttime = seedtime + timedelta(hours=24)
+                capacity = capacities[t % len(capacities)]
+                tournaments.append(Tournament(
+                    id = tournament_id,
+                    club_id = first_club_id + club_index,
+                    name = f"Tournament {tournament_id}",
+                    description = paragraphs[t % len(paragraphs)],
+                    capacity = capacity,
+                    participant_count = capacity,
+                    start = starttime,
+                    end = starttime + timedelta(hours=24),
+                    deadline = starttime - timedelta(hours=24),
+                ))
+                first_member_id = first_membership_id + club_index * members_per_club
+                organisers.append(Organiser(
+                    id = next_relationship_id,
+                    member_id = first_member_id + 1,
+                    tournament_id = tournament_id,
+                    is_lead_organiser = True,
+                ))
+                next_relationship_id += 1
+                for j in range(capacity):
+                    participants.append(Participant(
+                        id = next_relationship_id,
+                        member_id = first_member_id + 2 + j,
+                        tournament_id = tournament_id,
+                    ))
+                    next_relationship_id += 1
+            with transaction.atomic():
+                Tournament.objects.bulk_create(tournaments)
+                # Creation dates are set on insert, so are moved back before the deadline afterwards.
+                (Tournament.objects
+                    .filter(id__gte=tournaments[0].id, id__lte=tournaments[-1].id)
+                    .update(created_on=F('deadline') - timedelta(hours=24)))
+                bulk_create_inherited(Organiser, organisers)
+                bulk_create_inherited(Participant, participants)
+                invalidate_cached_content(tournaments=[tournament.id for tournament in tournaments])
+            self.stdout.write(f"Tournaments: {start + len(tournaments)}/{num_tournaments}")
+
+        reset_sequences(User, Club, Membership, Application, Tournament, MemberTournamentRelationship)
+
+        # Play past tournaments to the end, and ongoing ones for a round.
+        first_round_id = next_id(RoundOfMatches)
+        played = Tournament.objects.filter(id__gte=first_tournament_id, start__lte=seedtime).order_by('id')
+        for count, tournament in enumerate(played.iterator(), start=1):
+            with transaction.atomic():
+                curr_round = tournament.generate_next_round()
+                while curr_round != None:
+                    complete_round(curr_round)
+                    curr_round = tournament.generate_next_round()
+                    if curr_round != None and tournament.end > seedtime:
+                        break
+            if count % 100 == 0:
+                self.stdout.write(f"Tournaments played: {count}")
+        # Completed rounds are invalidated as they complete, but not the last one of each tournament.
+        invalidate_cached_content(rounds=range(first_round_id, next_id(RoundOfMatches)))
+
+        rebuild_search_index()
+
     def handle(self, *args, **options):
+        if any(options[option] is not None for option in ('users', 'clubs', 'tournaments')):
+            num_users = options['users'] if options['users'] is not None else 750
+            num_clubs = options['clubs'] if options['clubs'] is not None else max(1, num_users // 100)
+            num_tournaments = options['tournaments'] if options['tournaments'] is not None else num_clubs
+            if num_users < 1 or num_clubs < 1 or num_tournaments < 0 or options['chunk_size'] < 1:
+                raise CommandError("Users, clubs and the chunk size must be positive, and tournaments not negative.")
+            self.stdout.write(f"Seeding database in bulk with {num_users} users, {num_clubs} clubs and {num_tournaments} tournaments.")
+            self.generate_bulk_data(num_users, num_clubs, num_tournaments, options['chunk_size'])
+            self.stdout.write("Seeding Complete.")
+            return
+
         print("Seeding database... Please be patient as we are creating ~750 users and distributing them among clubs and tournaments.")
         # It is VERY important that random data is generated first, so we can fully control the memberships of the mandated users
         self.generate_random_data()
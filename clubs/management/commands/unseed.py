@@ -1,10 +1,14 @@
 from django.core.management.base import BaseCommand, CommandError
-from faker import Faker
-from clubs.models import User, Club
+from clubs.search import rebuild_search_index
+from ..helpers import purge_steps, purge
 
 class Command(BaseCommand):
+    """Remove everything but staff users, in chunks, so memory use does not grow with the data."""
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Rows deleted per transaction.")
+
     def handle(self, *args, **options):
-        User.objects.exclude(is_staff=True).delete()
-        #User.objects.all().delete()
-        # Cascading will handle other deletions
-        Club.objects.all().delete()
\ No newline at end of file
+        if options['chunk_size'] < 1:
+            raise CommandError("The chunk size must be positive.")
+        purge(purge_steps(), options['chunk_size'], self.stdout.write)
+        rebuild_search_index()
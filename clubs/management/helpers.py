@@ -1,6 +1,134 @@
+from django.contrib.admin.models import LogEntry
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max, Q
+
+from clubs.models import (User, Club, Membership, Application, Ban, Tournament, MemberTournamentRelationship,
+    Organiser, Participant, RoundOfMatches, TournamentStageBase, KnockoutStage, GroupStage, SingleGroup, Match)
+from clubs.cache_versions import bump_versions, MATCH_COLLECTIONS
+from clubs.directory import invalidate_directory
+from clubs.pagination import invalidate_lists
+
 def complete_round(my_round):
-    for match in my_round.get_matches():
-        match.result = 1
-        match.save()
-        match.black_player.round_eliminated = my_round.round_num
-        match.black_player.save()
\ No newline at end of file
+    """Let white win every match. Eliminations are recorded when the next round is generated."""
+    # Results are set with one update rather than per match, so counters are reset alongside.
+    collection_ids = list(RoundOfMatches.objects.filter(
+        Q(pk=my_round.pk) | Q(singlegroup__group_stage_id=my_round.pk)
+    ).values_list('pk', flat=True))
+    Match.objects.filter(collection_id__in=collection_ids).update(result=1)
+    RoundOfMatches.objects.filter(pk__in=collection_ids).update(outstanding_matches=0)
+    invalidate_cached_content(rounds=collection_ids)
+
+def invalidate_cached_content(clubs=(), tournaments=(), rounds=()):
+    """
+    Invalidate what is cached for clubs, tournaments and rounds written or deleted without signals, once committed.
+
+    Ids freed by raw deletes are taken again by the rows created next, which
+    would otherwise be shown what was cached for the rows that had them before.
+    """
+    clubs, tournaments, rounds = list(clubs), list(tournaments), list(rounds)
+
+    def invalidate():
+        for name in ('memberships', 'applications', 'bans'):
+            invalidate_lists(name, clubs)
+        invalidate_lists('participants', tournaments)
+        bump_versions(MATCH_COLLECTIONS, rounds)
+        if clubs:
+            invalidate_directory()
+    transaction.on_commit(invalidate)
+
+def next_id(model):
+    """Return the first free primary key of model, for rows created with bulk_create."""
+    return (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+
+def reset_sequences(*models):
+    """
+    Move the id sequences of models past their largest id, after rows were created with ids set.
+
+    Backends such as PostgreSQL keep the next id in a sequence, which inserts with
+    an id leave behind, so the next row created normally would take a used id.
+    """
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+def bulk_create_inherited(model, objs):
+    """
+    Insert objs of a model with a single parent through multi-table inheritance.
+
+    bulk_create does not support such models, so the parent rows are bulk
+    created first, then the model's own rows are inserted in batches. The id
+    of every object must already be set.
+    """
+    parent_model = model._meta.get_parent_list()[0]
+    parent_link = model._meta.get_ancestor_link(parent_model)
+    parent_model.objects.bulk_create([
+        parent_model(**{field.attname: getattr(obj, field.attname) for field in parent_model._meta.concrete_fields})
+        for obj in objs
+    ])
+
+    for obj in objs:
+        setattr(obj, parent_link.attname, obj.id)
+    fields = model._meta.local_concrete_fields
+    batch_size = max(connection.ops.bulk_batch_size(fields, objs), 1)
+    for start in range(0, len(objs), batch_size):
+        model._base_manager._insert(objs[start:start + batch_size], fields=fields)
+
+def purge_steps():
+    """
+    Return (label, queryset) pairs removing everything but staff users, in an order
+    where no row is deleted before the rows referencing it.
+
+    Models using multi-table inheritance appear once per table, child before parent,
+    as raw deletes only remove rows from the model's own table.
+    """
+    return [
+        ('matches', Match.objects.all()),
+        ('groups', SingleGroup.objects.all()),
+        ('knockout stages', KnockoutStage.objects.all()),
+        ('group stages', GroupStage.objects.all()),
+        ('tournament stages', TournamentStageBase.objects.all()),
+        ('rounds', RoundOfMatches.objects.all()),
+        ('participants', Participant.objects.all()),
+        ('organisers', Organiser.objects.all()),
+        ('tournament roles', MemberTournamentRelationship.objects.all()),
+        ('tournaments', Tournament.objects.all()),
+        ('memberships', Membership.objects.all()),
+        ('applications', Application.objects.all()),
+        ('bans', Ban.objects.all()),
+        ('clubs', Club.objects.all()),
+        ('user groups', User.groups.through.objects.filter(user__is_staff=False)),
+        ('user permissions', User.user_permissions.through.objects.filter(user__is_staff=False)),
+        ('admin log entries', LogEntry.objects.filter(user__is_staff=False)),
+        ('users', User.objects.filter(is_staff=False)),
+    ]
+
+# The argument of invalidate_cached_content taking the ids of each model purged.
+INVALIDATED_ON_PURGE = {Club: 'clubs', Tournament: 'tournaments', RoundOfMatches: 'rounds'}
+
+def purge(steps, chunk_size, report=None):
+    """
+    Delete the rows of each queryset in steps, a chunk of primary keys at a time.
+
+    Rows are removed with raw deletes, so neither the objects nor their cascades
+    are loaded into memory and no delete signals are sent, so what is cached for
+    deleted clubs, tournaments and rounds is invalidated here instead. Callers
+    must order the steps so dependent rows go first. Rounds are unlinked from their tournaments
+    beforehand, as that reference points against the order of the steps.
+    """
+    Tournament.objects.exclude(current_round=None).update(current_round=None)
+    for label, queryset in steps:
+        total = queryset.count()
+        deleted = 0
+        while True:
+            ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                deleted += queryset.model._base_manager.filter(pk__in=ids)._raw_delete(queryset.db)
+                if queryset.model in INVALIDATED_ON_PURGE:
+                    invalidate_cached_content(**{INVALIDATED_ON_PURGE[queryset.model]: ids})
+            if report is not None:
+                report(f"Deleted {deleted}/{total} {label}")
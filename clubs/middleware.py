@@ -0,0 +1,51 @@
+"""Middleware used by the clubs app."""
+
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from clubs.instrumentation import QueryRecorder, record_request
+from clubs.roles import RoleResolver, activate_role_resolver, deactivate_role_resolver
+
+
+class RoleResolverMiddleware:
+    """Give each request a RoleResolver for the logged in user, as request.roles."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.roles = RoleResolver(request.user)
+        token = activate_role_resolver(request.roles)
+        try:
+            return self.get_response(request)
+        finally:
+            deactivate_role_resolver(token)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record the queries, SQL time and wall time of each request against its URL name.
+
+    Only used when QUERY_INSTRUMENTATION is set, as every query is then timed.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        wall_time = time.perf_counter() - start
+        resolver_match = getattr(request, 'resolver_match', None)
+        record_request(resolver_match.url_name if resolver_match else None, recorder, wall_time)
+        return response
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.5 on 2026-10-17 23:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def set_current_rounds(apps, schema_editor):
+    """Point every tournament that has already begun at its latest stage."""
+    Tournament = apps.get_model('clubs', 'Tournament')
+    TournamentStageBase = apps.get_model('clubs', 'TournamentStageBase')
+    KnockoutStage = apps.get_model('clubs', 'KnockoutStage')
+    knockout_ids = set(KnockoutStage.objects.values_list('pk', flat=True))
+    latest_stages = {}
+    for stage in TournamentStageBase.objects.order_by('round_num', 'id'):
+        latest_stages[stage.tournament_id] = stage.pk
+    for tournament_id, stage_id in latest_stages.items():
+        Tournament.objects.filter(pk=tournament_id).update(
+            current_round_id=stage_id,
+            current_round_is_knockout=stage_id in knockout_ids
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='current_round',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='clubs.tournamentstagebase'),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='current_round_is_knockout',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(set_current_rounds, migrations.RunPython.noop),
+    ]
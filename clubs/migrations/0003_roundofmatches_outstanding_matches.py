@@ -0,0 +1,33 @@
+# Generated by Django 3.2.5 on 2026-10-17 23:34
+
+from django.db import migrations, models
+
+
+def count_outstanding_matches(apps, schema_editor):
+    """Count the matches without a result of every round and group stage."""
+    RoundOfMatches = apps.get_model('clubs', 'RoundOfMatches')
+    SingleGroup = apps.get_model('clubs', 'SingleGroup')
+    Match = apps.get_model('clubs', 'Match')
+    outstanding = {}
+    for collection_id in Match.objects.filter(result=0).values_list('collection_id', flat=True):
+        outstanding[collection_id] = outstanding.get(collection_id, 0) + 1
+    for group_id, group_stage_id in SingleGroup.objects.values_list('pk', 'group_stage_id'):
+        outstanding[group_stage_id] = outstanding.get(group_stage_id, 0) + outstanding.get(group_id, 0)
+    for collection_id, count in outstanding.items():
+        RoundOfMatches.objects.filter(pk=collection_id).update(outstanding_matches=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0002_tournament_current_round'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roundofmatches',
+            name='outstanding_matches',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_outstanding_matches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.5 on 2026-10-17 23:36
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+# The first version of SQLite with the trigram tokenizer. Older versions search by substring instead.
+TRIGRAM_SQLITE_VERSION = (3, 34, 0)
+
+def has_trigram_tokenizer(connection):
+    return connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= TRIGRAM_SQLITE_VERSION
+
+def create_search_table(apps, schema_editor):
+    """Index existing clubs for full text search, on SQLite with the trigram tokenizer only."""
+    if not has_trigram_tokenizer(schema_editor.connection):
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE clubs_club_search USING fts5(name, location, description, tokenize='trigram')"
+    )
+    schema_editor.execute(
+        "INSERT INTO clubs_club_search (rowid, name, location, description) "
+        "SELECT id, name, location, description FROM clubs_club"
+    )
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS clubs_club_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0003_roundofmatches_outstanding_matches'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='club_lower_name_idx'),
+        ),
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 3.2.5 on 2026-10-17 23:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0004_club_search'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='application',
+            options={'ordering': ['club_id']},
+        ),
+        migrations.AlterModelOptions(
+            name='ban',
+            options={'ordering': ['club_id']},
+        ),
+        migrations.AlterModelOptions(
+            name='membership',
+            options={'ordering': ['club_id']},
+        ),
+        migrations.AlterModelOptions(
+            name='membertournamentrelationship',
+            options={'ordering': ['tournament_id']},
+        ),
+        migrations.AlterModelOptions(
+            name='tournamentstagebase',
+            options={'ordering': ['tournament_id']},
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['user', 'club'], name='application_user_club_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['created_on'], name='club_created_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(fields=['user', 'club'], name='membership_user_club_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(condition=models.Q(('is_owner', True)), fields=['club'], name='membership_club_owner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(condition=models.Q(('is_officer', True)), fields=['club'], name='membership_club_officer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tournament',
+            index=models.Index(fields=['club', 'start', 'end'], name='tournament_club_start_end_idx'),
+        ),
+    ]
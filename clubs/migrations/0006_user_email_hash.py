@@ -0,0 +1,33 @@
+# Generated by Django 3.2.5 on 2026-10-17 23:47
+
+from django.db import migrations, models
+from libgravatar import sanitize_email, md5_hash
+
+
+def hash_emails(apps, schema_editor):
+    """Store the gravatar hash of every existing user's email."""
+    User = apps.get_model('clubs', 'User')
+    users = []
+    for user in User.objects.only('id', 'email').iterator(chunk_size=2000):
+        user.email_hash = md5_hash(sanitize_email(user.email))
+        users.append(user)
+        if len(users) == 2000:
+            User.objects.bulk_update(users, ['email_hash'])
+            users = []
+    User.objects.bulk_update(users, ['email_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0005_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_hash',
+            field=models.CharField(default='', editable=False, max_length=32),
+        ),
+        migrations.RunPython(hash_emails, migrations.RunPython.noop),
+    ]
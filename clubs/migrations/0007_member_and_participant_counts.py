@@ -0,0 +1,51 @@
+# Generated by Django 3.2.5 on 2026-10-17 23:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Lower
+
+
+def count_members_and_participants(apps, schema_editor):
+    """Count the members of every club and the participants of every tournament."""
+    Club = apps.get_model('clubs', 'Club')
+    Membership = apps.get_model('clubs', 'Membership')
+    Tournament = apps.get_model('clubs', 'Tournament')
+    Participant = apps.get_model('clubs', 'Participant')
+    Club.objects.update(member_count=Coalesce(Subquery(
+        Membership.objects.filter(club=OuterRef('pk')).order_by().values('club').annotate(count=Count('pk')).values('count')
+    ), Value(0)))
+    Tournament.objects.update(participant_count=Coalesce(Subquery(
+        Participant.objects.filter(tournament=OuterRef('pk')).order_by().values('tournament').annotate(count=Count('pk')).values('count')
+    ), Value(0)))
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0006_user_email_hash'),
+    ]
+
+    operations = [
+        # SQLite rebuilds the table to add a column, and cannot rebuild expression indexes
+        # on this Django version, so the index on the lowered name is set aside meanwhile.
+        migrations.RemoveIndex(
+            model_name='club',
+            name='club_lower_name_idx',
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(Lower('name'), name='club_lower_name_idx'),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='participant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_members_and_participants, migrations.RunPython.noop),
+    ]
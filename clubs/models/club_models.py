@@ -1,13 +1,41 @@
 """Models related to the base functionality of a chess club."""
 
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import UniqueConstraint
+from django.db import models, transaction
+from django.db.models import UniqueConstraint, Q, Exists, OuterRef
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
+from django.dispatch import Signal
 
 from .user_models import User
 
-class Club(models.Model):
+# Sent with club and whether the applications were accepted once they were answered in bulk,
+# as the bulk statements send no signal per row.
+applications_answered = Signal()
+
+# Outcomes of answering an application in bulk.
+ACCEPTED = 'accepted'
+REJECTED = 'rejected'
+ALREADY_MEMBER = 'already_member'
+
+class SignalMaintainedFieldsMixin:
+    """
+    Leave out SIGNAL_MAINTAINED_FIELDS when saving an existing row.
+
+    Those fields are only ever written through queryset updates, which saving a
+    stale instance must not undo.
+    """
+    SIGNAL_MAINTAINED_FIELDS = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SIGNAL_MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+class Club(SignalMaintainedFieldsMixin, models.Model):
     """Model representing a single chess club."""
     name = models.CharField(max_length=50, blank=False, unique = True)
     location = models.CharField(max_length=50, blank=False)
@@ -15,18 +43,60 @@ class Club(models.Model):
     #Automatically use current time as the club creation date
     created_on = models.DateTimeField(auto_now_add=True, blank=False)
 
+    # Kept in step by signals on Membership, so listing clubs needs no count per club.
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+
+    SIGNAL_MAINTAINED_FIELDS = ('member_count',)
+
     def __str__(self):
         return f'{self.name}'
 
     def get_memberships(self):
         return Membership.objects.filter(club=self)
 
+    def recount_members(self):
+        """Count the members afresh, e.g. after memberships were created in bulk."""
+        self.member_count = self.get_memberships().count()
+        Club.objects.filter(pk=self.pk).update(member_count=self.member_count)
+
     def get_banned_members(self):
         return Ban.objects.filter(club=self)
 
     def get_applications(self):
         return Application.objects.filter(club=self)
 
+    def respond_to_applications(self, applications, accept):
+        """
+        Accept or reject several applications to this club at once, returning each with its outcome.
+
+        Memberships are created in bulk and the applications removed with a single
+        delete, in one transaction. Applicants who are already members only have
+        their application removed, as do those who join from another request
+        meanwhile, whose memberships the unique constraint on club and user keeps.
+        """
+        with transaction.atomic():
+            applications = list(applications.filter(club=self).select_related('user'))
+            members = set()
+            if accept and applications:
+                members = set(
+                    self.get_memberships().filter(user_id__in=[application.user_id for application in applications])
+                    .values_list('user_id', flat=True)
+                )
+                Membership.objects.bulk_create([
+                    Membership(club=self, user_id=application.user_id)
+                    for application in applications if application.user_id not in members
+                ], ignore_conflicts=True)
+            # Applications have no dependent rows, so they are deleted without loading them again.
+            Application.objects.filter(pk__in=[application.pk for application in applications])._raw_delete(Application.objects.db)
+            applications_answered.send(sender=Club, club=self, accepted=accept and bool(applications))
+
+        if not accept:
+            return [(application, REJECTED) for application in applications]
+        return [
+            (application, ALREADY_MEMBER if application.user_id in members else ACCEPTED)
+            for application in applications
+        ]
+
     def get_officers(self):
         return Membership.objects.filter(club=self, is_officer=True)
 
@@ -36,6 +106,20 @@ class Club(models.Model):
 
     class Meta:
         ordering = ['-created_on']
+        indexes = [
+            # Clubs are sorted by name ignoring case.
+            models.Index(Lower('name'), name='club_lower_name_idx'),
+            models.Index(fields=['created_on'], name='club_created_on_idx'),
+        ]
+
+class MembershipQuerySet(models.QuerySet):
+    def with_roles_of(self, user):
+        """Annotate each membership with whether user owns, or is an officer of, its club, in the same query."""
+        roles = Membership.objects.filter(club=OuterRef('club'), user=user)
+        return self.annotate(
+            actor_is_owner=Exists(roles.filter(is_owner=True)),
+            actor_is_officer=Exists(roles.filter(is_officer=True)),
+        )
 
 class Membership(models.Model):
     """Model representing a membership of some single chess club by some single user"""
@@ -44,17 +128,75 @@ class Membership(models.Model):
     is_officer = models.BooleanField(default=False)
     is_owner = models.BooleanField(default=False)
 
+    objects = MembershipQuerySet.as_manager()
+
     def __str__(self):
         return f'User: {self.user.first_name} {self.user.last_name} at Club: {self.club}'
 
+    # Role changes are single conditional statements, which only apply if the roles
+    # of both the actor and this member are still those the change was allowed for,
+    # so changes racing from other requests cannot combine into an invalid state.
+    # Each returns whether it applied. Updates do not send post_save.
+
+    def _managed_by(self, actor, officers_may=False):
+        """This membership, provided actor still owns its club, or is an officer of it if officers_may."""
+        managers = Membership.objects.filter(club=OuterRef('club'), user=actor)
+        managers = managers.filter(Q(is_owner=True) | Q(is_officer=True)) if officers_may else managers.filter(is_owner=True)
+        return Membership.objects.filter(pk=self.pk).filter(Exists(managers))
+
+    def kick(self, actor):
+        """Remove this plain member from the club on behalf of its owner or an officer."""
+        deleted, _ = self._managed_by(actor, officers_may=True).filter(is_officer=False, is_owner=False).delete()
+        return deleted > 0
+
+    def ban(self, actor):
+        """Remove this plain member from the club and ban them, on behalf of its owner."""
+        with transaction.atomic():
+            deleted, _ = self._managed_by(actor).filter(is_officer=False, is_owner=False).delete()
+            if deleted:
+                Ban.objects.create(club_id=self.club_id, user_id=self.user_id)
+        return deleted > 0
+
+    def promote(self, actor):
+        """Make this plain member an officer, on behalf of the club's owner."""
+        promoted = self._managed_by(actor).filter(is_officer=False, is_owner=False).update(is_officer=True) > 0
+        if promoted:
+            self.is_officer = True
+        return promoted
+
+    def demote(self, actor):
+        """Make this officer a plain member, on behalf of the club's owner."""
+        demoted = self._managed_by(actor).filter(is_officer=True).update(is_officer=False) > 0
+        if demoted:
+            self.is_officer = False
+        return demoted
+
+    def transfer_ownership(self, actor):
+        """Make this officer the owner of the club, and its current owner, actor, an officer."""
+        with transaction.atomic():
+            # The owner steps down first, so the club never has two owners.
+            stepped_down = Membership.objects.filter(club_id=self.club_id, user=actor, is_owner=True).update(is_owner=False, is_officer=True)
+            if stepped_down and Membership.objects.filter(pk=self.pk, is_officer=True).update(is_owner=True, is_officer=False):
+                self.is_owner, self.is_officer = True, False
+                return True
+            transaction.set_rollback(True)
+        return False
+
     class Meta:
-        ordering = ['club']
+        ordering = ['club_id']
         constraints = [
             UniqueConstraint(
                 name='user_in_club_unique',
                 fields=['club', 'user'],
             ),
         ]
+        indexes = [
+            # Clubs of a user, in the default order. Lookups by club and user use the unique constraint.
+            models.Index(fields=['user', 'club'], name='membership_user_club_idx'),
+            # Partial, as booleans are filtered on as bare columns, which a composite index cannot seek on.
+            models.Index(fields=['club'], condition=Q(is_owner=True), name='membership_club_owner_idx'),
+            models.Index(fields=['club'], condition=Q(is_officer=True), name='membership_club_officer_idx'),
+        ]
 
     def full_clean(self, *args, **kwargs):
         super().full_clean(*args, **kwargs)
@@ -75,13 +217,16 @@ class Application(models.Model):
         return f'Applications: {self.user.first_name} {self.user.last_name} to Club: {self.club}'
 
     class Meta:
-        ordering = ['club']
+        ordering = ['club_id']
         constraints = [
             UniqueConstraint(
                 name='application_to_club_unique',
                 fields=['club', 'user'],
             )
         ]
+        indexes = [
+            models.Index(fields=['user', 'club'], name='application_user_club_idx'),
+        ]
 
 class Ban(models.Model):
     "Model for a ban to a club for some user."
@@ -92,7 +237,7 @@ class Ban(models.Model):
         return f'Ban: {self.user.first_name} {self.user.last_name} from Club: {self.club}'
 
     class Meta:
-        ordering = ['club']
+        ordering = ['club_id']
         constraints = [
             UniqueConstraint(
                 name='user_ban_from_club_unique',
@@ -16,6 +16,12 @@ from .club_models import Membership
 class RoundOfMatches(models.Model):
     """Model for collecting together all models that control a set of matches."""
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, unique=False, blank=False, related_name='tournament')
+    # Matches without a result, counting those of its groups for a group stage. Kept in step by Match.
+    outstanding_matches = models.PositiveIntegerField(default=0)
+
+    def get_outstanding_matches(self):
+        """Read the counter from the database, as results are set through other instances."""
+        return RoundOfMatches.objects.filter(pk=self.pk).values_list('outstanding_matches', flat=True).get()
 
 class StageMethodInterface(models.Model):
     """Enforces child models to have/implement particular methods"""
@@ -40,7 +46,7 @@ class StageMethodInterface(models.Model):
         return player_occurrences
 
     def get_is_complete(self):
-        return not self.get_matches().filter(result = 0).exists()
+        return self.get_outstanding_matches() == 0
 
 class TournamentStageBase(RoundOfMatches):
     """Model for single round in the tournament."""
@@ -54,5 +60,24 @@ class TournamentStageBase(RoundOfMatches):
         else:
             return None
 
+    def close_round(self):
+        """
+        Record the players knocked out in this round, once it is complete.
+
+        Everyone still in the tournament who is not a winner of this round was
+        knocked out in it, so they are all marked with a single update. Players
+        already marked are left alone, so closing a round twice is harmless.
+        """
+        winners = self.get_winners()
+        if not winners:
+            # Incomplete, or without any matches to decide who went out.
+            return False
+        from .tournament_models import Participant
+        (Participant.objects
+            .filter(tournament_id=self.tournament_id, round_eliminated=-1)
+            .exclude(id__in=[winner.id for winner in winners])
+            .update(round_eliminated=self.round_num))
+        return True
+
     class Meta:
-        ordering = ['tournament']
\ No newline at end of file
+        ordering = ['tournament_id']
\ No newline at end of file
@@ -1,12 +1,23 @@
 """Models related to a single round in a tournament."""
 from libgravatar import Gravatar
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import CheckConstraint, Q, F
+from django.db import models, transaction
+from django.db.models import CheckConstraint, Q, F, OuterRef, Subquery, Count
+from django.db.models.functions import Coalesce
 
+from clubs.cascades import deleting
 from .interface_models import RoundOfMatches, StageMethodInterface, TournamentStageBase
 from .tournament_models import Participant
 
+class MatchQuerySet(models.QuerySet):
+    def delete(self):
+        """Delete the matches, then count the outstanding matches of their collections afresh, once each."""
+        collection_ids = set(self.values_list('collection_id', flat=True))
+        with transaction.atomic(), deleting(RoundOfMatches, collection_ids):
+            deleted = super().delete()
+            recount_outstanding_matches(collection_ids)
+        return deleted
+
 class Match(models.Model):
     """Model representing a single game of chess, in some tournament stage."""
     white_player = models.ForeignKey(Participant, on_delete=models.CASCADE, unique=False, blank=False, related_name='white')
@@ -22,6 +33,8 @@ class Match(models.Model):
 
     result = models.IntegerField(default = 0, choices = Result.choices, blank = False)
 
+    objects = MatchQuerySet.as_manager()
+
     class Meta:
         ordering = ['collection']
         constraints = [
@@ -31,66 +44,161 @@ class Match(models.Model):
             ),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored result, so saving can tell whether the match was completed.
+        if 'result' in field_names:
+            instance._stored_result = values[field_names.index('result')]
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            if adding:
+                was_outstanding = False
+            else:
+                if not hasattr(self, '_stored_result'):
+                    self._stored_result = Match.objects.filter(pk=self.pk).values_list('result', flat=True).first()
+                was_outstanding = self._stored_result == 0
+            super().save(*args, **kwargs)
+            change = int(self.result == 0) - int(was_outstanding)
+            if change != 0:
+                adjust_outstanding_matches(self.collection_id, change)
+        self._stored_result = self.result
+
+def adjust_outstanding_matches(collection_id, change):
+    """Add change to the outstanding matches of a collection, and of its group stage if it is a group."""
+    collections = RoundOfMatches.objects.filter(
+        Q(pk=collection_id) | Q(pk__in=SingleGroup.objects.filter(pk=collection_id).values('group_stage_id'))
+    )
+    if change < 0:
+        # Never drop below zero, e.g. for matches loaded from fixtures, which bypass save.
+        collections = collections.filter(outstanding_matches__gte=-change)
+    collections.update(outstanding_matches=F('outstanding_matches') + change)
+
+def recount_outstanding_matches(collection_ids):
+    """Count the outstanding matches of collections afresh, and of the group stages of those that are groups."""
+    collection_ids = list(collection_ids)
+    outstanding = Match.objects.filter(
+        Q(collection=OuterRef('pk')) | Q(collection__singlegroup__group_stage=OuterRef('pk')), result=0
+    ).order_by().values('result').annotate(count=Count('pk')).values('count')
+    RoundOfMatches.objects.filter(
+        Q(pk__in=collection_ids) | Q(pk__in=SingleGroup.objects.filter(pk__in=collection_ids).values('group_stage_id'))
+    ).update(outstanding_matches=Coalesce(Subquery(outstanding), 0))
+
+def compute_standings(matches):
+    """
+    Score a round robin in one pass over its matches.
+
+    Players are taken from the matches themselves, so these should be loaded
+    together with their players to avoid a query per player.
+    """
+    players = {}
+    scores = {}
+    matches_played = {}
+    for match in matches:
+        for player in (match.white_player, match.black_player):
+            if player.id not in players:
+                players[player.id] = player
+                scores[player.id] = 0
+                matches_played[player.id] = 0
+
+        # Add points to total for each played match
+        if match.result == 1:
+            scores[match.white_player_id] += 1
+        elif match.result == 2:
+            scores[match.black_player_id] += 1
+        elif match.result == 3:
+            scores[match.white_player_id] += 0.5
+            scores[match.black_player_id] += 0.5
+
+        # Add 1 to matches played if result is not incomplete
+        if not match.result == 0:
+            matches_played[match.white_player_id] += 1
+            matches_played[match.black_player_id] += 1
+
+    # Sort by id first, so players on equal points are always listed in the same order.
+    ordered_ids = sorted(sorted(scores), key = lambda player_id: scores[player_id])
+
+    standings = []
+    for player_id in reversed(ordered_ids):
+        standings.append([players[player_id], scores[player_id], matches_played[player_id]])
+    return standings
+
 class KnockoutStage(TournamentStageBase, StageMethodInterface):
     """Tournament round of type knockout."""
     def full_clean(self):
         super().full_clean()
-        matches = self.get_matches()
+        self.validate_pairings(self.get_matches().values_list('white_player_id', 'black_player_id'))
 
-        # Using len is more efficient here as we intend to traverse the query set later.
-        if (len(matches) & (len(matches) - 1) != 0):
+    @staticmethod
+    def validate_pairings(pairings):
+        """Check that (white, black) pairings form a valid knockout round, without touching the database."""
+        pairings = list(pairings)
+        if (len(pairings) & (len(pairings) - 1) != 0):
             raise ValidationError("The number of matches must be a power of two.")
 
-        player_occurrences = self.get_player_occurrences()
+        player_occurrences = [player for pairing in pairings for player in pairing]
 
         if(len(player_occurrences) != len(set(player_occurrences))):
             raise ValidationError("Each player must only play 1 match.")
 
     def get_winners(self):
-        if not self.get_is_complete():
-            return None
-
-        matches = self.get_matches()
-        winners = []
-        for match in matches:
-            if match.result == 1:
-                winners.append(match.white_player)
-                match.black_player.round_eliminated = self.round_num
-                match.black_player.save()
-            elif match.result == 2:
-                winners.append(match.black_player)
-                match.white_player.round_eliminated = self.round_num
-                match.white_player.save()
-        # Case draw not considered: To-do
-        return winners
+        """Return the winner of each match in order, or None while the round is incomplete."""
+        if getattr(self, '_winners', None) is None:
+            matches = list(self.get_matches().select_related('white_player', 'black_player').order_by('id'))
+            if any(match.result == 0 for match in matches):
+                return None
+            winners = []
+            for match in matches:
+                if match.result == 1:
+                    winners.append(match.white_player)
+                elif match.result == 2:
+                    winners.append(match.black_player)
+            # Case draw not considered: To-do
+            # Results cannot change once set, so a complete round's winners are final.
+            self._winners = winners
+        return self._winners
 
 class GroupStage(TournamentStageBase, StageMethodInterface):
     """Tournament round of type group. Is associated with multiple groups."""
     def get_winners(self):
-        if not self.get_is_complete():
-            return None
+        """Return the seeded winners of all groups, or None while any group is incomplete."""
+        if getattr(self, '_winners', None) is not None:
+            return self._winners
 
         # We assume the number of winners is even, with the current algorithms this should always be the case.
-        
-        groups = list(self.get_single_groups())
+
+        groups = list(self.get_single_groups().order_by('id'))
+        matches_of_groups = {group.id: [] for group in groups}
+        matches = (Match.objects
+            .filter(collection__in=matches_of_groups.keys())
+            .select_related('white_player', 'black_player')
+            .order_by('id'))
+        for match in matches:
+            if match.result == 0:
+                return None
+            matches_of_groups[match.collection_id].append(match)
+
         winners_per_group = groups[0].winners_required
-        num_winners = len(groups)*winners_per_group
         seeds = []
         for i in range(winners_per_group):
             seeds.append([])
-            
+
         for group in groups:
-            winners_from_group = group.get_winners()
+            winners_from_group = group.winners_from_standings(compute_standings(matches_of_groups[group.id]))
             for i in range(winners_per_group):
                 seeds[i].append(winners_from_group[i])
-                
+
         winners = []
         for i in range(winners_per_group):
             # 'Clever' use of modulo to seperate those in the same group.
             # We also ensure 2 players in the same seed are not adjacent.
             for j in range(len(groups)):
                 winners.append(seeds[(i+j)%winners_per_group][j])
-        
+
+        self._winners = winners
         return winners
 
     def get_matches(self):
@@ -103,13 +211,6 @@ class GroupStage(TournamentStageBase, StageMethodInterface):
     def get_single_groups(self):
         return SingleGroup.objects.filter(group_stage=self)
 
-    def get_is_complete(self):
-        groups = list(SingleGroup.objects.filter(group_stage=self))
-        for group in groups:
-            if not group.get_is_complete():
-                return False
-        return True
-
     def full_clean(self):
         super().full_clean()
         if SingleGroup.objects.filter(group_stage=self).count() < 1:
@@ -126,7 +227,13 @@ class SingleGroup(RoundOfMatches, StageMethodInterface):
 
     def full_clean(self):
         super().full_clean()
-        player_occurrences = self.get_player_occurrences()
+        self.validate_pairings(self.get_matches().values_list('white_player_id', 'black_player_id'))
+
+    @staticmethod
+    def validate_pairings(pairings):
+        """Check that (white, black) pairings form a valid round robin, without touching the database."""
+        pairings = list(pairings)
+        player_occurrences = [player for pairing in pairings for player in pairing]
 
         # We must calculate the number of players each player plays.
         unique_players = set(player_occurrences)
@@ -134,10 +241,10 @@ class SingleGroup(RoundOfMatches, StageMethodInterface):
 
         num_occurrences = {}
         for player in unique_players:
-            num_occurrences.update({player.id : 0})
+            num_occurrences.update({player : 0})
 
         for occurrence in player_occurrences:
-            num_occurrences.update({occurrence.id : num_occurrences[occurrence.id]+1})
+            num_occurrences.update({occurrence : num_occurrences[occurrence]+1})
 
         # Now we ensure all players have played exactly n-1 games i.e. everyone once
         for k in num_occurrences.values():
@@ -145,58 +252,30 @@ class SingleGroup(RoundOfMatches, StageMethodInterface):
                 raise ValidationError("Not all players play the correct number of games.")
 
         # Check total number of matches, in case of edge case.
-        if self.get_matches().count() != ((num_players-1)/2.0) * num_players: # Triangle number: (n/2)*(n+1)
+        if len(pairings) != ((num_players-1)/2.0) * num_players: # Triangle number: (n/2)*(n+1)
             raise ValidationError("The incorrect number of matches are linked to this group.")
 
-    def get_standings(self):
-        matches = self.get_matches()
-        players = set(self.get_player_occurrences())
-        scores = {}
-        matches_played = {}
-        for player in players:
-            scores.update({player.id:0})
-            matches_played.update({player.id:0})
+    def get_standings(self, refresh=False):
+        """
+        Return [participant, points, matches played] for each player, best first.
 
-        for match in matches:
-            # Add points to total for each played match
-            if match.result == 1:
-                scores[match.white_player.id] += 1
-            elif match.result == 2:
-                scores[match.black_player.id] += 1
-            elif match.result == 3:
-                scores[match.white_player.id] += 0.5
-                scores[match.black_player.id] += 0.5
-
-            # Add 1 to matches played if result is not incomplete
-            if not match.result == 0:
-                matches_played[match.white_player.id] += 1
-                matches_played[match.black_player.id] += 1
-
-        # https://www.geeksforgeeks.org/python-sort-list-by-dictionary-values/
-        ordered_scores = dict(sorted(scores.items(), key = lambda item: item[1]))
-
-        standings = []
-        for participant in ordered_scores.keys():
-            standing = [Participant.objects.get(id=participant), ordered_scores[participant], matches_played[participant]]
-            standings.append(standing)
-
-        return list(reversed(standings))
+        The result is kept on the instance, so templates may use it repeatedly.
+        Pass refresh to recompute it after results have changed.
+        """
+        if refresh or getattr(self, '_standings', None) is None:
+            matches = self.get_matches().select_related('white_player__member__user', 'black_player__member__user')
+            self._standings = compute_standings(matches)
+        return self._standings
 
     def get_winners(self):
-        if not self.get_is_complete():
-            return None
-
-        standings = self.get_standings()
-        
-        winners_standings = standings[:self.winners_required]
-        losers_standings = standings[self.winners_required:]
-        
-        winners=[]
-        for entry in winners_standings:
-            winners.append(entry[0])
-
-        for entry in losers_standings:
-            entry[0].round_eliminated = self.group_stage.round_num
-            entry[0].save()
-
-        return winners
+        """Return the players going through from this group, or None while it is incomplete."""
+        if getattr(self, '_winners', None) is None:
+            matches = list(self.get_matches().select_related('white_player__member__user', 'black_player__member__user'))
+            if any(match.result == 0 for match in matches):
+                return None
+            self._standings = compute_standings(matches)
+            self._winners = self.winners_from_standings(self._standings)
+        return self._winners
+
+    def winners_from_standings(self, standings):
+        return [standing[0] for standing in standings[:self.winners_required]]
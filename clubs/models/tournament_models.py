@@ -8,17 +8,17 @@ Dependencies for helper functions are imported within those helpers.
 
 from django.utils.timezone import now
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 
 from django.db.models import UniqueConstraint
 from django.core.validators import MinValueValidator, MaxValueValidator
 
-from django.db.models import Max
+from django.db.models import Q, F
 from itertools import combinations
 
-from .club_models import Club, Membership
+from .club_models import Club, Membership, SignalMaintainedFieldsMixin
 
-class Tournament(models.Model):
+class Tournament(SignalMaintainedFieldsMixin, models.Model):
     """Model representing a single tournament."""
     club = models.ForeignKey(Club, on_delete=models.CASCADE, unique=False, blank=False)
     name = models.CharField(max_length=50, blank=False, unique = False)
@@ -45,6 +45,13 @@ class Tournament(models.Model):
     end = models.DateTimeField(blank=False)
     created_on = models.DateTimeField(auto_now_add=True, blank=False)
 
+    # The latest stage, kept in step by signals so it can be found without searching all stages.
+    current_round = models.ForeignKey('TournamentStageBase', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    current_round_is_knockout = models.BooleanField(default=False)
+
+    # Kept in step by signals on Participant, so capacity checks need no count.
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
+
     def __str__(self):
         return f'{self.name} by {self.club}'
 
@@ -56,15 +63,45 @@ class Tournament(models.Model):
                 fields=['club', 'name'],
             ),
         ]
+        indexes = [
+            # Tournaments of a club, in the default order and split by date.
+            models.Index(fields=['club', 'start', 'end'], name='tournament_club_start_end_idx'),
+        ]
+
+    SIGNAL_MAINTAINED_FIELDS = ('current_round', 'current_round_is_knockout', 'participant_count')
 
     def get_participants(self):
         return Participant.objects.filter(tournament=self)
 
     def get_num_participants(self):
-        return Participant.objects.filter(tournament=self).count()
+        """Read the counter from the database, as participants join through other instances."""
+        self.participant_count = Tournament.objects.filter(pk=self.pk).values_list('participant_count', flat=True).get()
+        return self.participant_count
 
     def is_full(self):
-        return self.get_num_participants() == self.capacity
+        """Whether the tournament was full when loaded, without querying, e.g. for listing tournaments."""
+        return self.participant_count >= self.capacity
+
+    def add_participant(self, member):
+        """
+        Enrol member in the tournament, returning the participant, or None if it is full.
+
+        The participant is created first, which counts it through the signal on
+        Participant, and only kept if the count is then within capacity. Concurrent
+        joins are serialised on the counter's row, so of several joins racing for
+        the last place exactly one is kept, with no lock held beforehand.
+        """
+        with transaction.atomic():
+            participant = Participant.objects.create(member=member, tournament=self)
+            if not Tournament.objects.filter(pk=self.pk, participant_count__lte=F('capacity')).exists():
+                transaction.set_rollback(True)
+                return None
+        return participant
+
+    def recount_participants(self):
+        """Count the participants afresh, e.g. after they were created in bulk."""
+        self.participant_count = self.get_participants().count()
+        Tournament.objects.filter(pk=self.pk).update(participant_count=self.participant_count)
 
     def get_organisers(self):
         return Organiser.objects.filter(tournament=self)
@@ -84,8 +121,11 @@ class Tournament(models.Model):
         return False
 
     def full_clean(self, *args, **kwargs):
+        # The current round is not user input, and may point at a stage deleted since loading.
+        kwargs['exclude'] = list(kwargs.get('exclude') or []) + ['current_round']
         super().full_clean(*args, **kwargs)
-        if self.capacity < self.get_num_participants():
+        # Counted afresh, as validation must not trust a counter loaded earlier.
+        if self.capacity < self.get_participants().count():
             raise ValidationError("At no point can there be more participants than capacity.")
         if self.deadline > self.start:
             raise ValidationError("The deadline date cannot be after the start!")
@@ -105,12 +145,39 @@ class Tournament(models.Model):
         return TournamentStageBase.objects.filter(tournament=self)
 
     def get_current_round(self):
-        rounds = self.get_all_stage_bases()
-        if rounds.count() == 0:
+        """Return the latest stage of the tournament as a KnockoutStage or GroupStage, or None."""
+        # The pointer is read afresh, as rounds may have been added since this instance was loaded.
+        self.current_round_id, self.current_round_is_knockout = (Tournament.objects
+            .filter(pk=self.pk)
+            .values_list('current_round_id', 'current_round_is_knockout')
+            .get())
+        if self.current_round_id is None:
             return None
-        curr_round_num = rounds.aggregate(Max('round_num'))['round_num__max']
-        stage_base_of_round = rounds.get(round_num=curr_round_num)
-        return stage_base_of_round.get_stage()
+        from .round_models import KnockoutStage, GroupStage
+        stage_model = KnockoutStage if self.current_round_is_knockout else GroupStage
+        return stage_model.objects.get(pk=self.current_round_id)
+
+    def advance_current_round(self, stage):
+        """Make a newly created stage the current round, unless a later round already exists."""
+        from .round_models import KnockoutStage
+        is_knockout = isinstance(stage, KnockoutStage)
+        updated = Tournament.objects.filter(
+            Q(current_round__isnull=True) | Q(current_round__round_num__lte=stage.round_num),
+            pk=self.pk
+        ).update(current_round_id=stage.pk, current_round_is_knockout=is_knockout)
+        if updated:
+            self.current_round_id = stage.pk
+            self.current_round_is_knockout = is_knockout
+
+    def refresh_current_round(self):
+        """Find the current round again from the stages themselves, e.g. after one is deleted."""
+        latest = self.get_all_stage_bases().select_related('knockoutstage').order_by('-round_num', '-id').first()
+        self.current_round_id = latest.pk if latest is not None else None
+        self.current_round_is_knockout = latest is not None and hasattr(latest, 'knockoutstage')
+        Tournament.objects.filter(pk=self.pk).update(
+            current_round_id=self.current_round_id,
+            current_round_is_knockout=self.current_round_is_knockout
+        )
 
     def get_max_round_num(self):
         n = self.get_num_participants()
@@ -128,24 +195,24 @@ class Tournament(models.Model):
     # If participants do not fill capacity, reduce number of participants to next lowest capacity.
     def _participants_to_appropriate_capacity(self):
         participants = Participant.objects.filter(tournament=self)
+        num_participants = participants.count()
         potential_capacity = self.capacity
         capacities =[]
         for entry in self.CAPACITIES:
             capacities.append(entry[0])
 
         cap_index = capacities.index(potential_capacity)
-        while participants.count() < potential_capacity:
+        while num_participants < potential_capacity:
             cap_index -= 1
             if cap_index == -1:
                 return participants
             potential_capacity = capacities[cap_index]
 
-        excess_participant_count = participants.count() - potential_capacity
-        ordered_participants = participants.order_by('-joined')
-        excess_participants = ordered_participants[:excess_participant_count]
-
-        for p in excess_participants:
-            p.delete()
+        excess_participant_count = num_participants - potential_capacity
+        if excess_participant_count > 0:
+            ordered_participants = participants.order_by('-joined')
+            excess_ids = list(ordered_participants.values_list('id', flat=True)[:excess_participant_count])
+            Participant.objects.filter(id__in=excess_ids).delete()
 
         self.capacity = potential_capacity
         return Participant.objects.filter(tournament=self)
@@ -153,50 +220,61 @@ class Tournament(models.Model):
     def generate_next_round(self):
         self.full_clean() # Constraints are needed for this to work.
 
-        if self.get_is_complete():
-            # Whole tournament is complete already
-            return None
-
+        # Closing the current round, dropping excess participants and creating the next round are
+        # written in one transaction, so a failure part way leaves the tournament as it was.
+        capacity = self.capacity
+        try:
+            with transaction.atomic():
+                return self._generate_next_round()
+        except Exception:
+            self.capacity = capacity
+            raise
+
+    def _generate_next_round(self):
         curr_round = self.get_current_round()
 
         if curr_round != None:
             participants = curr_round.get_winners()
+            if participants == None:
+                # Current round is not yet complete
+                return None
+
+            curr_round.close_round()
+            if len(participants) == 1:
+                # Whole tournament is complete already
+                return None
             next_num = curr_round.round_num+1
         else: # No round has occured yet.
             participants = list(self._participants_to_appropriate_capacity())
             next_num = 1
 
-        if participants == None:
-            # Current round is not yet complete
-            return None
-
         num_participants = len(participants)
 
-        if num_participants == 0:
-            # No one joined!!!
+        if num_participants < 2:
+            # No one joined, or a single player with no one to play!!!
             return None
 
         from .round_models import KnockoutStage, GroupStage, SingleGroup, Match
+
+        # The whole round is drawn and validated in memory first, then written with
+        # every match of the round inserted by a single bulk_create.
+        # As bulk_create skips Match.save, outstanding match counters are set up front.
         # KNOCKOUT CASE
         if num_participants <= 16 and (num_participants & (num_participants - 1) == 0):
+            pairings = [(participants[i], participants[i+1]) for i in range(0, num_participants, 2)]
+            KnockoutStage.validate_pairings(pairings)
+
             my_stage = KnockoutStage.objects.create(
                 round_num = next_num,
-                tournament=self
+                tournament=self,
+                outstanding_matches=len(pairings)
             )
-            i = 0
-            while i < num_participants:
-                (Match.objects.create(
-                    collection = my_stage,
-                    white_player = participants[i],
-                    black_player = participants[i+1]
-                )).save()
-                i += 2
+            Match.objects.bulk_create([
+                Match(collection=my_stage, white_player=white, black_player=black)
+                for white, black in pairings
+            ])
         # GROUP STAGE CASE
         else:
-            my_stage = GroupStage.objects.create(
-                round_num = next_num,
-                tournament=self
-            )
             # By own constraints, this will result in a valid draw.
             if num_participants < 33:
                 group_size = 4
@@ -208,28 +286,31 @@ class Tournament(models.Model):
             num_groups = num_participants // group_size
             winners_per_group = required_winners // num_groups
 
+            group_pairings = []
             for i in range(0, num_groups):
+                group_members = participants[i*group_size:(i+1)*group_size]
+                pairings = list(combinations(group_members, 2))
+                SingleGroup.validate_pairings(pairings)
+                group_pairings.append(pairings)
+
+            my_stage = GroupStage.objects.create(
+                round_num = next_num,
+                tournament=self,
+                outstanding_matches=sum(len(pairings) for pairings in group_pairings)
+            )
+            matches = []
+            for pairings in group_pairings:
                 group = SingleGroup.objects.create(
                     group_stage = my_stage,
-                    winners_required = winners_per_group
+                    winners_required = winners_per_group,
+                    outstanding_matches=len(pairings)
                 )
-                group_members = participants[:group_size]
-                participants = participants[group_size:]
-
-                player_pairs = combinations(group_members, 2)
-
-                for pair in player_pairs:
-                    (Match.objects.create(
-                        collection = group,
-                        white_player = pair[0],
-                        black_player = pair[1]
-                    )).save()
-
-                group.full_clean()
-                group.save()
+                matches += [
+                    Match(collection=group, white_player=white, black_player=black)
+                    for white, black in pairings
+                ]
+            Match.objects.bulk_create(matches)
 
-        my_stage.full_clean()
-        my_stage.save()
         return my_stage
 
 class MemberTournamentRelationship(models.Model):
@@ -239,7 +320,7 @@ class MemberTournamentRelationship(models.Model):
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, unique=False, blank=False)
 
     class Meta:
-        ordering = ['tournament']
+        ordering = ['tournament_id']
         constraints = [
             UniqueConstraint(
                 name='one_object_per_relationship',
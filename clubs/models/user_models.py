@@ -1,10 +1,19 @@
 """Models related to registered users independent of clubs."""
 
-from libgravatar import Gravatar
+from libgravatar import sanitize_email, md5_hash
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
+from django.urls import reverse
+
+GRAVATAR_URL = 'https://www.gravatar.com/avatar/{hash}?size={size}&default=mp'
+
+def email_hash(email):
+    """Return the hash gravatar identifies an email address by."""
+    return md5_hash(sanitize_email(email))
 
 class User(AbstractUser):
     """Model for a registered user, independent of any clubs."""
@@ -55,21 +64,57 @@ class User(AbstractUser):
     )
     experience = models.IntegerField(default = 1, choices = LEVELS)
 
+    # Kept in step with email on save, so avatars can be shown without hashing per render.
+    email_hash = models.CharField(max_length=32, editable=False, default='')
+    # The email email_hash was last computed from, so saves leaving the email alone do not hash it.
+    _hashed_email = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        if user.__dict__.get('email_hash'):
+            user._hashed_email = user.__dict__.get('email')
+        return user
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # An email deferred when the user was loaded, and never read since, is unchanged.
+        email = self.__dict__.get('email')
+        rehash = email is not None and email != self._hashed_email and (update_fields is None or 'email' in update_fields)
+        if rehash:
+            self.email_hash = email_hash(email)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'email_hash'}
+        super().save(*args, **kwargs)
+        if rehash:
+            self._hashed_email = email
+
     def gravatar(self, size=120):
-        """Return a URL to the user's gravatar."""
-        gravatar_object = Gravatar(self.email)
-        gravatar_url = gravatar_object.get_image(size=size, default='mp')
-        return gravatar_url
+        """Return a URL to the user's gravatar, through the local avatar endpoint if enabled."""
+        if settings.AVATAR_PROXY and self.pk is not None:
+            return reverse('avatar', kwargs={'user_id': self.pk, 'size': size})
+        return self.gravatar_url(size)
 
     def mini_gravatar(self, size=50):
         """Return a URL to the user's small gravatar."""
-        gravatar_object = Gravatar(self.email)
-        gravatar_url = gravatar_object.get_image(size=size, default='mp')
-        return gravatar_url
+        return self.gravatar(size)
+
+    def gravatar_url(self, size):
+        """Return the URL of the user's gravatar on gravatar.com."""
+        # Rows written without save, such as loaded fixtures, have no stored hash.
+        return GRAVATAR_URL.format(hash=self.email_hash or email_hash(self.email), size=size)
 
     def get_clubs(self):
-        my_clubs = []
         from .club_models import Membership
-        for membership in Membership.objects.filter(user=self):
-            my_clubs.append(membership.club)
-        return my_clubs
+        memberships = Membership.objects.filter(user=self).select_related('club')
+        return [membership.club for membership in memberships]
+
+    def get_clubs_and_applications(self):
+        """Return the clubs the user is a member of or has applied to, each exactly once."""
+        from .club_models import Club, Membership, Application
+        # Both subqueries are resolved through the index on user, so the cost
+        # depends on the user's own clubs and not on the size of the catalogue.
+        return Club.objects.filter(
+            Q(id__in=Membership.objects.filter(user=self).values('club'))
+            | Q(id__in=Application.objects.filter(user=self).values('club'))
+        )
@@ -0,0 +1,151 @@
+"""
+Keyset pagination of long lists.
+
+Django's Paginator takes each page as a slice of its list, which a queryset
+fetches with OFFSET, reading and discarding every row before the page, and it
+counts every row on every page. A KeysetList instead remembers, in the cache,
+the sort key of the first and last row of each slice it fetched, and fetches the
+slices beside them by seeking past those keys, which an index answers in the
+same time however deep the page is. Its count is either given, e.g. by a counter
+kept on the model, or cached.
+
+Pages are still addressed by number, as the numbered links of bootstrap_paginate
+need, so only stepping to the page beside one already fetched avoids OFFSET. A
+page reached any other way, by jumping several pages ahead or once its
+neighbours' keys have left the cache, is fetched with OFFSET counted from the
+nearer end of the list, so pages in the middle of a long list still scan the
+rows before them. Avoiding that would take links carrying the key to seek past.
+
+Counts and keys are cached in each process, under a version kept in the cache
+all processes share, which signals bump once a change to the rows is committed.
+So no process serves a stale count or key after the request making the change.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, OrderBy, Q
+
+from clubs.cache_versions import get_version, bump_version, bump_versions, PAGINATED_LISTS
+
+def list_key(name, object_id):
+    """Return the cache key of a list of some object, e.g. the members of a club, at its current version."""
+    list_id = f'{name}:{object_id}'
+    return f'keyset:{list_id}:{get_version(PAGINATED_LISTS, list_id)}'
+
+def invalidate_list(name, object_id):
+    bump_version(PAGINATED_LISTS, f'{name}:{object_id}')
+
+def invalidate_lists(name, object_ids):
+    bump_versions(PAGINATED_LISTS, [f'{name}:{object_id}' for object_id in object_ids])
+
+def keyset_ordering(queryset):
+    """Return the expressions a queryset is sorted by, with whether each is descending, ending with the primary key."""
+    ordering = []
+    for field in queryset.query.order_by or queryset.model._meta.ordering:
+        if isinstance(field, str):
+            if field == '?':
+                raise ValueError("A randomly ordered queryset has no keys to seek past.")
+            ordering.append((F(field.lstrip('-')), field.startswith('-')))
+        elif isinstance(field, OrderBy):
+            ordering.append((field.expression, field.descending))
+        else:
+            ordering.append((field, False))
+
+    pk = queryset.model._meta.pk
+    if not ordering or getattr(ordering[-1][0], 'name', None) not in ('pk', pk.name, pk.attname):
+        # Rows sorting equally are told apart by their primary key, so every key is unique. It
+        # follows the direction of the last column, so one index can be read in either direction.
+        ordering.append((F('pk'), ordering[-1][1] if ordering else False))
+    return ordering
+
+class KeysetList:
+    """
+    A sorted queryset for a Paginator, fetching each page by seeking past its neighbour where that was fetched.
+
+    The columns sorted by must not be null. The count is the number of rows or a
+    callable returning it, and is counted and cached when not given.
+    """
+    def __init__(self, queryset, cache_key, count=None):
+        self.cache_key = cache_key
+        self.queryset = queryset
+        self.ordering = keyset_ordering(queryset)
+        self.names = [f'keyset_{position}' for position in range(len(self.ordering))]
+        self.keyed = queryset.annotate(**{
+            name: expression for name, (expression, descending) in zip(self.names, self.ordering)
+        })
+        self._count = count
+
+    def count(self):
+        if callable(self._count):
+            self._count = self._count()
+        elif self._count is None:
+            key = f'{self.cache_key}:count'
+            self._count = cache.get(key)
+            if self._count is None:
+                self._count = self.queryset.count()
+                cache.set(key, self._count, timeout=settings.PAGINATION_CACHE_TIMEOUT)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = self.count() if index.stop is None else index.stop
+        if stop <= start:
+            return []
+
+        rows = self._fetch(start, stop)
+        if rows:
+            cache.set_many({
+                self._row_key(start): self._key(rows[0]),
+                self._row_key(start + len(rows) - 1): self._key(rows[-1]),
+            }, timeout=settings.PAGINATION_CACHE_TIMEOUT)
+        return rows
+
+    def _fetch(self, start, stop):
+        size = stop - start
+        if start == 0:
+            return list(self._sorted()[:size])
+
+        before, after = self._row_key(start - 1), self._row_key(stop)
+        known = cache.get_many([before, after])
+        if before in known:
+            return list(self._sorted().filter(self._past(known[before]))[:size])
+        if after in known:
+            return list(reversed(self._sorted(reverse=True).filter(self._past(known[after], reverse=True))[:size]))
+
+        # No neighbouring slice has been fetched, so the rows are counted off from the nearer end,
+        # with OFFSET, which still reads every row skipped. See the module docstring.
+        count = self.count()
+        if start > count - stop:
+            return list(reversed(self._sorted(reverse=True)[max(count - stop, 0):count - start]))
+        return list(self._sorted()[start:stop])
+
+    def _sorted(self, reverse=False):
+        return self.keyed.order_by(*[
+            F(name).desc() if descending != reverse else F(name).asc()
+            for name, (expression, descending) in zip(self.names, self.ordering)
+        ])
+
+    def _past(self, key, reverse=False):
+        """Filter for the rows sorted after key, or before it if reverse."""
+        past = Q()
+        equal = Q()
+        for name, (expression, descending), value in zip(self.names, self.ordering, key):
+            lookup = 'lt' if descending != reverse else 'gt'
+            past |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        if len(self.ordering) > 1:
+            # Bounding the first column as well lets the index seek to the key rather than scan up to it.
+            first_lookup = 'lte' if self.ordering[0][1] != reverse else 'gte'
+            past &= Q(**{f'{self.names[0]}__{first_lookup}': key[0]})
+        return past
+
+    def _key(self, row):
+        return tuple(getattr(row, name) for name in self.names)
+
+    def _row_key(self, position):
+        return f'{self.cache_key}:row:{position}'
@@ -0,0 +1,212 @@
+"""
+Request scoped cache of the roles users hold in clubs and tournaments.
+
+Permission checks are made many times while rendering a single page, often for
+the same club and user. The RoleResolver loads the memberships, applications and
+tournament roles of the logged in user once, and answers every later question
+from memory. Memberships of other users (e.g. the rows of a member list) can be
+added in bulk so they do not need a query each either.
+
+The resolver of the current request is made available by RoleResolverMiddleware
+and is cleared whenever one of the underlying objects is saved or deleted. The
+predicates at the end of the module are what views and template tags call.
+"""
+
+from contextvars import ContextVar
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import F
+
+from clubs.models import Membership, Application, Organiser, Participant
+
+_active_resolver = ContextVar('active_role_resolver', default=None)
+
+def get_role_resolver():
+    """Return the resolver of the request being handled, or None outside of a request."""
+    return _active_resolver.get()
+
+def activate_role_resolver(resolver):
+    return _active_resolver.set(resolver)
+
+def deactivate_role_resolver(token):
+    _active_resolver.reset(token)
+
+
+class RoleResolver:
+    """Answer permission questions about a user from roles loaded once per request."""
+
+    def __init__(self, user):
+        self.user = user
+        self.clear()
+
+    def clear(self):
+        """Forget everything loaded so far, used when roles change mid-request."""
+        self._memberships = None
+        self._applied_club_ids = None
+        self._organiser_roles = None
+        self._participating_ids = None
+        self._other_memberships = {}
+
+    def _is_own(self, user):
+        return user is None or user.pk == self.user.pk
+
+    def _query_own(self, queryset):
+        # Anonymous users hold no roles, and cannot be used in a filter.
+        if not self.user.is_authenticated:
+            return queryset.none()
+        return queryset
+
+    # Loading
+
+    def _load_memberships(self):
+        if self._memberships is None:
+            self._memberships = {m.club_id: m for m in self._query_own(Membership.objects.filter(user=self.user))}
+        return self._memberships
+
+    def _load_applied_club_ids(self):
+        if self._applied_club_ids is None:
+            self._applied_club_ids = set(
+                self._query_own(Application.objects.filter(user=self.user)).values_list('club_id', flat=True)
+            )
+        return self._applied_club_ids
+
+    def _load_organiser_roles(self):
+        if self._organiser_roles is None:
+            self._organiser_roles = dict(
+                self._query_own(Organiser.objects.filter(member__user=self.user, member__club=F('tournament__club')))
+                .values_list('tournament_id', 'is_lead_organiser')
+            )
+        return self._organiser_roles
+
+    def _load_participating_ids(self):
+        if self._participating_ids is None:
+            self._participating_ids = set(
+                self._query_own(Participant.objects.filter(member__user=self.user, member__club=F('tournament__club')))
+                .values_list('tournament_id', flat=True)
+            )
+        return self._participating_ids
+
+    def add_memberships(self, memberships):
+        """Remember memberships that have already been loaded, e.g. a page of members."""
+        for membership in memberships:
+            if membership.user_id == self.user.pk:
+                continue
+            self._other_memberships[(membership.club_id, membership.user_id)] = membership
+
+    def load_memberships(self, club, users):
+        """Fetch the memberships of several users in a club with a single query."""
+        missing_ids = [
+            user.pk for user in users
+            if not self._is_own(user) and (club.pk, user.pk) not in self._other_memberships
+        ]
+        if not missing_ids:
+            return
+        for user_id in missing_ids:
+            self._other_memberships[(club.pk, user_id)] = None
+        self.add_memberships(Membership.objects.filter(club=club, user_id__in=missing_ids))
+
+    # Club roles
+
+    def get_membership(self, club, user=None):
+        """Return the membership of user (by default the current user) in club, or None."""
+        if self._is_own(user):
+            return self._load_memberships().get(club.pk)
+        if (club.pk, user.pk) not in self._other_memberships:
+            self.load_memberships(club, [user])
+        return self._other_memberships[(club.pk, user.pk)]
+
+    def is_member(self, club, user=None):
+        return self.get_membership(club, user) is not None
+
+    def is_officer(self, club, user=None):
+        membership = self.get_membership(club, user)
+        return membership is not None and membership.is_officer
+
+    def is_owner(self, club, user=None):
+        membership = self.get_membership(club, user)
+        return membership is not None and membership.is_owner
+
+    def has_applied(self, club, user=None):
+        if self._is_own(user):
+            return club.pk in self._load_applied_club_ids()
+        return Application.objects.filter(club=club, user=user).exists()
+
+    # Tournament roles
+
+    def is_organiser(self, tournament, user=None):
+        if self._is_own(user):
+            return tournament.pk in self._load_organiser_roles()
+        return Organiser.objects.filter(member__user=user, member__club=tournament.club_id, tournament=tournament).exists()
+
+    def is_lead_organiser(self, tournament, user=None):
+        if self._is_own(user):
+            return self._load_organiser_roles().get(tournament.pk, False)
+        return Organiser.objects.filter(
+            member__user=user, member__club=tournament.club_id, tournament=tournament, is_lead_organiser=True
+        ).exists()
+
+    def is_participant(self, tournament, user=None):
+        if self._is_own(user):
+            return tournament.pk in self._load_participating_ids()
+        return Participant.objects.filter(member__user=user, member__club=tournament.club_id, tournament=tournament).exists()
+
+
+# The predicates below answer from the roles cached for the current request when
+# one is being handled, and query the database directly otherwise.
+
+def is_user_officer_of_club(user, club):
+    roles = get_role_resolver()
+    if roles is not None:
+        return roles.is_officer(club, user)
+    return Membership.objects.filter(user=user, club=club, is_officer=True).exists()
+
+def is_user_owner_of_club(user, club):
+    roles = get_role_resolver()
+    if roles is not None:
+        return roles.is_owner(club, user)
+    return Membership.objects.filter(user=user, club=club, is_owner=True).exists()
+
+def is_user_member_of_club(user, club):
+    roles = get_role_resolver()
+    if roles is not None:
+        return roles.is_member(club, user)
+    return Membership.objects.filter(user=user, club=club).exists()
+
+def has_user_applied_to_club(user, club):
+    roles = get_role_resolver()
+    if roles is not None:
+        return roles.has_applied(club, user)
+    return Application.objects.filter(user=user, club=club).exists()
+
+def is_user_organiser_of_tournament(user, tournament):
+    roles = get_role_resolver()
+    if roles is not None:
+        return roles.is_organiser(tournament, user)
+    try:
+        possible_organiser_member = Membership.objects.get(club = tournament.club, user = user)
+    except(ObjectDoesNotExist):
+        return False
+    else:
+        return Organiser.objects.filter(member = possible_organiser_member, tournament = tournament).exists()
+
+def is_lead_organiser_of_tournament(user, tournament):
+    roles = get_role_resolver()
+    if roles is not None:
+        return roles.is_lead_organiser(tournament, user)
+    try:
+        possible_organiser_member = Membership.objects.get(club = tournament.club, user = user)
+    except(ObjectDoesNotExist):
+        return False
+    else:
+        return Organiser.objects.filter(member = possible_organiser_member, tournament = tournament, is_lead_organiser = True).exists()
+
+def is_participant_in_tournament(user, tournament):
+    roles = get_role_resolver()
+    if roles is not None:
+        return roles.is_participant(tournament, user)
+    try:
+        possible_organiser_member = Membership.objects.get(club = tournament.club, user = user)
+    except(ObjectDoesNotExist):
+        return False
+    else:
+        return Participant.objects.filter(member = possible_organiser_member, tournament = tournament).exists()
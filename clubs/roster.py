@@ -0,0 +1,182 @@
+"""
+Import and export of the members of a club as CSV.
+
+Both directions stream: an import reads the roster a chunk of rows at a time,
+writing each chunk with bulk_create in its own transaction, and an export reads
+the members with an iterator, so neither holds the whole roster in memory and an
+import makes the same number of queries per chunk however large the chunk is.
+
+Exported cells which a spreadsheet would read as a formula are escaped with a
+leading quote, which an import removes again.
+"""
+
+import csv
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from clubs.models import User, Membership
+from clubs.models.user_models import email_hash
+from clubs.pagination import invalidate_list
+from clubs.roles import get_role_resolver
+
+ROSTER_FIELDS = ['username', 'email', 'first_name', 'last_name', 'experience', 'role']
+REQUIRED_FIELDS = ['username', 'email', 'first_name', 'last_name']
+
+OWNER = 'owner'
+OFFICER = 'officer'
+MEMBER = 'member'
+
+IMPORT_CHUNK_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+
+# Spreadsheets evaluate cells starting with these as formulas.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+class Echo:
+    """A file that returns what is written to it, so csv.writer can produce one line at a time."""
+    def write(self, value):
+        return value
+
+def export_roster(club, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the members of club as lines of CSV, with the header first."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(ROSTER_FIELDS)
+    members = club.get_memberships().order_by('pk').values_list(
+        'user__username', 'user__email', 'user__first_name', 'user__last_name', 'user__experience', 'is_owner', 'is_officer'
+    )
+    for username, email, first_name, last_name, experience, is_owner, is_officer in members.iterator(chunk_size=chunk_size):
+        role = OWNER if is_owner else (OFFICER if is_officer else MEMBER)
+        yield writer.writerow([escape_cell(value) for value in (username, email, first_name, last_name)] + [experience, role])
+
+def escape_cell(value):
+    """Quote a value a spreadsheet would otherwise evaluate as a formula."""
+    return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+
+def unescape_cell(value):
+    return value[1:] if value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES) else value
+
+class RosterImport:
+    """What importing a roster did: how many members it added, and each row it skipped with why."""
+    def __init__(self):
+        self.members_added = 0
+        self.already_members = 0
+        self.skipped = []
+
+    def skip(self, line, reason):
+        self.skipped.append((line, reason))
+
+def import_roster(club, lines, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Make the users listed in a CSV roster members of club, creating their accounts.
+
+    Only users new to the site are added, as adding an existing account would
+    make its user a member without their consent. Rows matching an account by
+    email, ignoring case, are skipped, unless the account is already a member.
+    New accounts have no usable password, so their users must set one before
+    logging in. Raises ValidationError if the roster lacks a required column.
+    """
+    reader = csv.DictReader(lines)
+    missing = [field for field in REQUIRED_FIELDS if field not in (reader.fieldnames or [])]
+    if missing:
+        raise ValidationError(f"The roster has no {', '.join(missing)} column.")
+
+    result = RosterImport()
+    seen_emails = set()
+    rows = ((reader.line_num, row) for row in reader)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        with transaction.atomic():
+            _import_chunk(club, chunk, result, seen_emails)
+
+    result.skipped.sort()
+    # bulk_create sends no signals and skips conflicts, so members are counted afresh, once the whole roster is in.
+    club.recount_members()
+    club_id = club.pk
+    transaction.on_commit(lambda: invalidate_list('memberships', club_id))
+    roles = get_role_resolver()
+    if roles is not None:
+        roles.clear()
+    return result
+
+def _import_chunk(club, chunk, result, seen_emails):
+    users = {}
+    for line, row in chunk:
+        user, is_officer = _read_row(line, row, result)
+        if user is None:
+            continue
+        # Addresses are told apart ignoring case, as their users would be.
+        email = user.email.lower()
+        if email in seen_emails:
+            result.skip(line, f"{user.email} is listed more than once.")
+            continue
+        seen_emails.add(email)
+        users[email] = (line, user, is_officer)
+
+    existing = dict(
+        User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=users).values_list('email_lower', 'id')
+    )
+    members = set(club.get_memberships().filter(user_id__in=existing.values()).values_list('user_id', flat=True))
+    new_users = {}
+    for email, (line, user, is_officer) in users.items():
+        if email not in existing:
+            new_users[email] = (line, user, is_officer)
+        elif existing[email] in members:
+            result.already_members += 1
+        else:
+            result.skip(line, f"{user.email} already has an account, so must apply to the club themselves.")
+
+    # Users whose username was taken since, or by an account with another email, are not created.
+    User.objects.bulk_create([user for line, user, is_officer in new_users.values()], ignore_conflicts=True)
+    created = {
+        (email, username): user_id for email, username, user_id in
+        User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=new_users).values_list('email_lower', 'username', 'id')
+    }
+    memberships = []
+    for email, (line, user, is_officer) in new_users.items():
+        # An account created meanwhile by someone else under the same email is not theirs to add.
+        user_id = created.get((email, user.username))
+        if user_id is None:
+            result.skip(line, f"The username {user.username} is taken.")
+        else:
+            memberships.append(Membership(club=club, user_id=user_id, is_officer=is_officer))
+
+    # An import of the same roster running at once may have added some of them first. bulk_create
+    # does not tell which rows conflicted, so the members are counted afresh once the roster is in.
+    Membership.objects.bulk_create(memberships, ignore_conflicts=True)
+    result.members_added += len(memberships)
+
+def _read_row(line, row, result):
+    """Return the user a row lists, unsaved, and whether they are to be an officer, or None if the row is invalid."""
+    values = {field: unescape_cell((row.get(field) or '').strip()) for field in ROSTER_FIELDS}
+    role = values['role'].lower() or MEMBER
+    if role not in (MEMBER, OFFICER):
+        result.skip(line, "Only members and officers can be imported." if role == OWNER else f"Unknown role {values['role']}.")
+        return None, False
+
+    email = User.objects.normalize_email(values['email'])
+    user = User(
+        username=values['username'],
+        email=email,
+        first_name=values['first_name'],
+        last_name=values['last_name'],
+        # bulk_create skips save, which keeps the hash up to date.
+        email_hash=email_hash(email),
+        password=make_password(None),
+    )
+    try:
+        user.experience = int(values['experience'] or 1)
+    except ValueError:
+        result.skip(line, f"Unknown experience {values['experience']}.")
+        return None, False
+    try:
+        user.full_clean(exclude=['password'], validate_unique=False)
+    except ValidationError as error:
+        result.skip(line, f"Invalid {', '.join(error.message_dict)}.")
+        return None, False
+    return user, role == OFFICER
@@ -0,0 +1,114 @@
+"""
+Full text search over the name, location and description of clubs.
+
+On SQLite the clubs are indexed in an FTS5 table using the trigram tokenizer, so
+any part of a word can be searched for, and results are ranked by relevance.
+The table is created by a migration and kept current by signals on Club. Other
+database backends, SQLite before 3.34, which lacks the trigram tokenizer, and
+search terms too short to form a trigram fall back to case insensitive substring
+matching, ordered as clubs normally are. A database migrated with an older SQLite
+has no table, which rebuild_search_index creates once SQLite is upgraded.
+"""
+
+from django.db import connection
+from django.db.models import Q
+
+from clubs.models import Club
+
+SEARCH_TABLE = 'clubs_club_search'
+SEARCHED_FIELDS = ('name', 'location', 'description')
+
+# The trigram tokenizer cannot match anything shorter than a trigram.
+MIN_TERM_LENGTH = 3
+
+# The first version of SQLite with the trigram tokenizer.
+TRIGRAM_SQLITE_VERSION = (3, 34, 0)
+
+def is_search_index_available(using=connection):
+    return using.vendor == 'sqlite' and using.Database.sqlite_version_info >= TRIGRAM_SQLITE_VERSION
+
+def rebuild_search_index(using=connection):
+    """Index every club again, e.g. after clubs were created with bulk_create."""
+    if not is_search_index_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5({', '.join(SEARCHED_FIELDS)}, tokenize='trigram')"
+        )
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCHED_FIELDS)}) "
+            f"SELECT id, {', '.join(SEARCHED_FIELDS)} FROM {Club._meta.db_table}"
+        )
+
+def index_club(club):
+    if not is_search_index_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [club.id])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCHED_FIELDS)}) VALUES (%s, %s, %s, %s)",
+            [club.id] + [getattr(club, field) for field in SEARCHED_FIELDS]
+        )
+
+def unindex_club(club):
+    if not is_search_index_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [club.id])
+
+def search_clubs(searched):
+    """Return the clubs matching every term of searched, best matches first."""
+    terms = (searched or '').split()
+    if not terms:
+        return Club.objects.all()
+
+    if not is_search_index_available() or any(len(term) < MIN_TERM_LENGTH for term in terms):
+        clubs = Club.objects.all()
+        for term in terms:
+            term_filter = Q()
+            for field in SEARCHED_FIELDS:
+                term_filter |= Q(**{f'{field}__icontains': term})
+            clubs = clubs.filter(term_filter)
+        return clubs
+
+    # Each term is quoted, so it is matched as a piece of text rather than parsed as query syntax.
+    return SearchResults(' '.join('"' + term.replace('"', '""') + '"' for term in terms))
+
+class SearchResults:
+    """
+    The clubs matching a full text query, best matches first, for a Paginator.
+
+    The index counts, ranks and slices the matches on its own, so only the clubs
+    on the page taken are read from the clubs table.
+    """
+    def __init__(self, match):
+        self.match = match
+
+    def count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [self.match])
+            return cursor.fetchone()[0]
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            clubs = self[index:index + 1]
+            if not clubs:
+                raise IndexError("Search result index out of range.")
+            return clubs[0]
+        start = index.start or 0
+        limit = -1 if index.stop is None else max(index.stop - start, 0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank, rowid LIMIT %s OFFSET %s",
+                [self.match, limit, start]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        clubs = Club.objects.in_bulk(ids)
+        return [clubs[club_id] for club_id in ids if club_id in clubs]
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __len__(self):
+        return self.count()
@@ -0,0 +1,172 @@
+"""Signal handlers keeping derived data in step with the models it is derived from."""
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.core.signals import request_started
+from django.dispatch import receiver
+
+from clubs.models import Club, Membership, Application, Ban, Organiser, Participant, Tournament, RoundOfMatches, TournamentStageBase, KnockoutStage, GroupStage, Match, adjust_outstanding_matches, applications_answered
+from clubs.cascades import mark_deleting, unmark_deleting, is_being_deleted, clear_marks
+from clubs.roles import get_role_resolver
+from clubs.search import index_club, unindex_club
+from clubs.cache_versions import bump_version, MATCH_COLLECTIONS
+from clubs.directory import invalidate_directory
+from clubs.pagination import invalidate_list
+
+
+@receiver([post_save, post_delete], sender=Membership)
+@receiver([post_save, post_delete], sender=Application)
+@receiver([post_save, post_delete], sender=Organiser)
+@receiver([post_save, post_delete], sender=Participant)
+def clear_role_resolver(sender, **kwargs):
+    """Roles cached for the current request are stale once any role changes."""
+    roles = get_role_resolver()
+    if roles is not None:
+        roles.clear()
+
+
+@receiver(post_save, sender=KnockoutStage)
+@receiver(post_save, sender=GroupStage)
+def advance_current_round(sender, instance, created, raw=False, **kwargs):
+    """A newly created stage becomes the current round of its tournament."""
+    if created and not raw:
+        instance.tournament.advance_current_round(instance)
+
+
+# Stages are deleted along with their parent rows, so the parent model is listened
+# to, as only once its rows are gone do the remaining stages reflect the deletion.
+@receiver(post_delete, sender=TournamentStageBase)
+def refresh_current_round(sender, instance, **kwargs):
+    """The current round moves back to the latest remaining stage, unless the tournament is going too."""
+    if is_being_deleted(Tournament, instance.tournament_id):
+        return
+    tournament = Tournament.objects.filter(pk=instance.tournament_id).first()
+    if tournament is not None:
+        tournament.refresh_current_round()
+
+
+request_started.connect(clear_marks)
+
+
+@receiver(pre_delete, sender=Club)
+@receiver(pre_delete, sender=Tournament)
+@receiver(pre_delete, sender=RoundOfMatches)
+def mark_deleting_parent(sender, instance, **kwargs):
+    """Counters on a row deleted along with its children are not adjusted for each child."""
+    mark_deleting(sender, instance.pk)
+
+
+@receiver(post_delete, sender=Club)
+@receiver(post_delete, sender=Tournament)
+@receiver(post_delete, sender=RoundOfMatches)
+def unmark_deleted_parent(sender, instance, **kwargs):
+    unmark_deleting(sender, instance.pk)
+
+
+@receiver(post_delete, sender=Match)
+def discount_deleted_match(sender, instance, **kwargs):
+    """A deleted match is no longer outstanding, unless its collection is going too."""
+    if instance.result == 0 and not is_being_deleted(RoundOfMatches, instance.collection_id):
+        adjust_outstanding_matches(instance.collection_id, -1)
+
+
+@receiver([post_save, post_delete], sender=Match)
+def invalidate_cached_results(sender, instance, **kwargs):
+    """Fragments showing the match's stage are stale once it changes."""
+    # Bumped after commit, or another request could cache the old result under the new version.
+    collection_id = instance.collection_id
+    transaction.on_commit(lambda: bump_version(MATCH_COLLECTIONS, collection_id))
+
+
+@receiver(post_save, sender=Membership)
+def count_new_member(sender, instance, created, raw=False, **kwargs):
+    """Members are counted on their club as they join."""
+    if raw:
+        # Loaded fixtures may or may not carry the count, so it is taken afresh.
+        for club in Club.objects.filter(pk=instance.club_id):
+            club.recount_members()
+    elif created:
+        Club.objects.filter(pk=instance.club_id).update(member_count=F('member_count') + 1)
+
+
+@receiver(post_delete, sender=Membership)
+def count_departed_member(sender, instance, **kwargs):
+    """Members are discounted from their club as they leave, unless the club is going too."""
+    if is_being_deleted(Club, instance.club_id):
+        return
+    Club.objects.filter(pk=instance.club_id, member_count__gt=0).update(member_count=F('member_count') - 1)
+
+
+@receiver(applications_answered)
+def count_members_added_in_bulk(sender, club, accepted, **kwargs):
+    """Applications answered in bulk change the members and applications of the club at once."""
+    if accepted:
+        # bulk_create does not tell which memberships conflicted, so members are counted afresh.
+        club.recount_members()
+    clear_role_resolver(sender)
+    club_id = club.pk
+
+    def invalidate_lists():
+        invalidate_list('memberships', club_id)
+        invalidate_list('applications', club_id)
+    transaction.on_commit(invalidate_lists)
+
+
+@receiver(post_save, sender=Participant)
+def count_new_participant(sender, instance, created, raw=False, **kwargs):
+    """Participants are counted on their tournament as they join."""
+    if raw:
+        # Loaded fixtures hold the tournament on the parent row, loaded before this one.
+        for tournament in Tournament.objects.filter(membertournamentrelationship__pk=instance.pk):
+            tournament.recount_participants()
+    elif created:
+        Tournament.objects.filter(pk=instance.tournament_id).update(participant_count=F('participant_count') + 1)
+
+
+@receiver(post_save, sender=Club)
+@receiver(post_save, sender=Tournament)
+def count_loaded_members_and_participants(sender, instance, raw=False, **kwargs):
+    """Fixtures may load members and participants before their club or tournament."""
+    if raw:
+        if sender is Club:
+            instance.recount_members()
+        else:
+            instance.recount_participants()
+
+
+@receiver(post_delete, sender=Participant)
+def count_departed_participant(sender, instance, **kwargs):
+    """Participants are discounted from their tournament as they leave, unless the tournament is going too."""
+    if is_being_deleted(Tournament, instance.tournament_id):
+        return
+    Tournament.objects.filter(pk=instance.tournament_id, participant_count__gt=0).update(participant_count=F('participant_count') - 1)
+
+
+@receiver([post_save, post_delete], sender=Membership)
+@receiver([post_save, post_delete], sender=Application)
+@receiver([post_save, post_delete], sender=Ban)
+@receiver([post_save, post_delete], sender=Participant)
+def invalidate_paginated_list(sender, instance, **kwargs):
+    """Counts and page boundaries of the list holding the row are stale once it changes."""
+    if sender is Participant:
+        name, object_id = 'participants', instance.tournament_id
+    else:
+        name, object_id = f'{sender._meta.model_name}s', instance.club_id
+    transaction.on_commit(lambda: invalidate_list(name, object_id))
+
+
+@receiver(post_save, sender=Club)
+def update_club_search_index(sender, instance, **kwargs):
+    index_club(instance)
+
+
+@receiver([post_save, post_delete], sender=Club)
+def invalidate_club_directory(sender, **kwargs):
+    """Cached pages of the club directory are stale once any club changes."""
+    transaction.on_commit(invalidate_directory)
+
+
+@receiver(post_delete, sender=Club)
+def remove_club_from_search_index(sender, instance, **kwargs):
+    unindex_club(instance)
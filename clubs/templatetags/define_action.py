@@ -9,7 +9,9 @@ passing in many variables in the view.
 
 from django import template
 from django.utils import timezone
-from clubs.models import Application, Membership, Participant, Organiser
+from clubs.roles import (has_user_applied_to_club, is_user_member_of_club,
+    is_user_officer_of_club, is_user_owner_of_club, is_user_organiser_of_tournament,
+    is_lead_organiser_of_tournament, is_participant_in_tournament)
 
 register = template.Library()
 
@@ -54,46 +56,35 @@ def days_until(date):
     return delta.days
 
 # CLUB tags
+# Role checks use the roles cached for the request.
 
 @register.simple_tag
 def check_has_applied(club_to_check, user):
-    return Application.objects.filter(club=club_to_check, user=user).exists()
+    return has_user_applied_to_club(user, club_to_check)
 
 @register.simple_tag
 def check_is_member(club_to_check, user):
-    return Membership.objects.filter(club=club_to_check, user=user).exists()
+    return is_user_member_of_club(user, club_to_check)
 
 @register.simple_tag
 def check_is_officer(club_to_check, user):
-    return Membership.objects.filter(club=club_to_check, user=user, is_officer=True).exists()
+    return is_user_officer_of_club(user, club_to_check)
 
 @register.simple_tag
 def check_is_owner(club_to_check, user):
-    return Membership.objects.filter(club=club_to_check, user=user, is_owner=True).exists()
+    return is_user_owner_of_club(user, club_to_check)
 
 
 # TOURNAMENT tags
 
 @register.simple_tag
 def check_is_organiser(user, tournament):
-    if Membership.objects.filter(user=user, club=tournament.club).exists():
-        membership = Membership.objects.get(user=user, club=tournament.club)
-        return Organiser.objects.filter(member=membership, tournament=tournament).exists()
-    else:
-        return False
+    return is_user_organiser_of_tournament(user, tournament)
 
 @register.simple_tag
 def check_is_lead_organiser(user, tournament):
-    if Membership.objects.filter(user=user, club=tournament.club).exists():
-        membership = Membership.objects.get(user=user, club=tournament.club)
-        return Organiser.objects.filter(member=membership, tournament=tournament, is_lead_organiser = True).exists()
-    else:
-        return False
+    return is_lead_organiser_of_tournament(user, tournament)
 
 @register.simple_tag
 def check_has_joined_tournament(user, tournament):
-    if Membership.objects.filter(user=user, club=tournament.club).exists():
-        membership = Membership.objects.get(user=user, club=tournament.club)
-        return Participant.objects.filter(member=membership, tournament=tournament).exists()
-    else:
-        return False
+    return is_participant_in_tournament(user, tournament)
@@ -0,0 +1,8 @@
+"""The site's URLs with the avatar route, which is only registered when the proxy is enabled as they load."""
+
+from system import urls
+
+handler404 = urls.handler404
+handler500 = urls.handler500
+
+urlpatterns = urls.urlpatterns + urls.avatar_patterns
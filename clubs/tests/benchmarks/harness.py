@@ -0,0 +1,126 @@
+"""
+Measure the cost of every named route, for each role a user can hold in a club.
+
+A dataset is seeded in bulk at one of SCALES, then every route in system/urls.py
+is requested as the owner, an officer, a plain member and an outsider of one of
+its clubs. Each request runs in a transaction that is rolled back, so routes
+which change data, e.g. deleting the club, leave it as it was for the next one.
+"""
+
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, URLPattern, URLResolver
+from faker import Faker
+
+from clubs.models import User, Club, Membership, Application, Ban, Tournament, Match
+
+SCALES = {
+    'small': {'users': 300, 'clubs': 3, 'tournaments': 9},
+    'medium': {'users': 3000, 'clubs': 30, 'tournaments': 90},
+    'large': {'users': 20000, 'clubs': 200, 'tournaments': 600},
+}
+ROLES = ('owner', 'officer', 'member', 'outsider')
+
+def seed(scale):
+    # Seeded identically each time, so query counts can be compared between runs.
+    Faker.seed(0)
+    call_command('seed', stdout=StringIO(), **SCALES[scale])
+
+class Subjects:
+    """The users and objects the routes of one club are requested with."""
+
+    def __init__(self):
+        # The second club, as the first has nobody outside it among the users seeded before it.
+        self.club = Club.objects.order_by('id')[1]
+        memberships = Membership.objects.filter(club=self.club).order_by('id')
+        owner = memberships.get(is_owner=True)
+        officer = memberships.filter(is_officer=True).first()
+        member = memberships.filter(is_officer=False, is_owner=False).last()
+        outsider = User.objects.exclude(membership__club=self.club).exclude(application__club=self.club).first()
+        self.users = {
+            'owner': owner.user,
+            'officer': officer.user,
+            'member': member.user,
+            'outsider': outsider,
+        }
+
+        tournaments = Tournament.objects.filter(club=self.club).order_by('id')
+        ongoing = tournaments.exclude(current_round=None).order_by('-participant_count').first()
+        upcoming = tournaments.filter(current_round=None).first()
+        banned = memberships.filter(is_officer=False, is_owner=False).first()
+        ban = Ban.objects.create(club=self.club, user=banned.user)
+        banned.delete()
+        match = Match.objects.filter(collection__tournament=ongoing).order_by('result', 'id').first()
+
+        self.arguments = {
+            'club_id': self.club.id,
+            'tournament_id': ongoing.id,
+            'app_id': Application.objects.filter(club=self.club).first().id,
+            'is_accepted': True,
+            'ban_id': ban.id,
+            'member_id': member.id,
+            'match_id': match.id,
+            'user_id': member.user.id,
+            'size': 50,
+            'param': 'name',
+            'order': 'asc',
+        }
+        # Routes acting on someone in a particular role, or on a tournament not yet begun.
+        self.route_arguments = {
+            'demote_officer_to_member': {'member_id': officer.id},
+            'transfer_ownership_to_officer': {'member_id': officer.id},
+            'join_tournament': {'tournament_id': upcoming.id},
+            'begin_tournament': {'tournament_id': upcoming.id},
+        }
+
+    def arguments_for(self, name, argument_names):
+        arguments = {**self.arguments, **self.route_arguments.get(name, {})}
+        return {argument: arguments[argument] for argument in argument_names}
+
+def iter_routes(resolver=None, prefix=''):
+    """Yield (name, route) for every named URL pattern, routes carrying <argument> placeholders."""
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            # Included apps, i.e. the admin, are not ours to measure.
+            continue
+        if isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name, prefix + str(pattern.pattern)
+
+def route_key(name, route):
+    return f'{name} {route}'
+
+def build_url(route, arguments):
+    url = '/' + route
+    for argument, value in arguments.items():
+        converter = 'bool' if isinstance(value, bool) else ('int' if isinstance(value, int) else 'str')
+        url = url.replace(f'<{converter}:{argument}>', str(value).lower() if isinstance(value, bool) else str(value))
+    return url
+
+def argument_names(route):
+    names = []
+    for part in route.split('<')[1:]:
+        names.append(part.split('>')[0].split(':')[-1])
+    return names
+
+def measure(client, subjects):
+    """Return {route key: {role: {'queries': n, 'ms': t}}} for every named route."""
+    results = {}
+    for name, route in iter_routes():
+        url = build_url(route, subjects.arguments_for(name, argument_names(route)))
+        timings = {}
+        for role in ROLES:
+            with transaction.atomic():
+                client.force_login(subjects.users[role])
+                with CaptureQueriesContext(connection) as context:
+                    start = time.perf_counter()
+                    client.get(url)
+                    elapsed = time.perf_counter() - start
+                transaction.set_rollback(True)
+            timings[role] = {'queries': len(context), 'ms': round(elapsed * 1000, 1)}
+        results[route_key(name, route)] = timings
+    return results
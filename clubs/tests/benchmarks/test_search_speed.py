@@ -0,0 +1,48 @@
+"""
+Speed of club search over a large directory.
+
+Seeding 100,000 clubs takes seconds, so this only runs with the large scale,
+e.g. with BENCHMARK_SCALES=large.
+"""
+
+import time
+import unittest
+
+from django.test import TestCase, tag
+from clubs.models import Club
+from clubs.search import search_clubs, rebuild_search_index, is_search_index_available
+from clubs.tests.benchmarks.test_view_budgets import is_scale_enabled
+
+SEARCH_TIME_LIMIT = 0.05
+
+@tag('benchmark')
+class ClubSearchSpeedTestCase(TestCase):
+    """Test a search of 100,000 clubs returns its first page quickly."""
+
+    @classmethod
+    def setUpClass(cls):
+        if not is_scale_enabled('large'):
+            raise unittest.SkipTest("Set BENCHMARK_SCALES to include large to measure it.")
+        if not is_search_index_available():
+            raise unittest.SkipTest("Clubs are only indexed for search on SQLite with the trigram tokenizer.")
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        Club.objects.bulk_create(
+            (Club(name=f'Club {i}', location=f'Town {i % 500}', description=f'Description number {i}') for i in range(100000)),
+            batch_size=5000
+        )
+        rebuild_search_index()
+
+    def test_search_is_fast_with_100000_clubs(self):
+        timings = []
+        for attempt in range(3):
+            start = time.perf_counter()
+            clubs = search_clubs('Club 4242')
+            count = clubs.count()
+            first_page = list(clubs[:10])
+            timings.append(time.perf_counter() - start)
+        self.assertGreater(count, 0)
+        self.assertEqual(first_page[0].name, 'Club 4242')
+        self.assertLess(min(timings), SEARCH_TIME_LIMIT)
@@ -0,0 +1,121 @@
+"""
+Query and time budgets of every route, checked against a recorded baseline.
+
+Only the small dataset is measured by default. Set BENCHMARK_SCALES, e.g. to
+"small,medium,large", to measure more, and BENCHMARK_RECORD to write the
+measurements to baseline.json as the new budgets rather than check them. Every
+scale has a baseline for the same routes, so a route added or changed must be
+recorded at every scale.
+"""
+
+import json
+import os
+import unittest
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, tag
+from clubs.tests.benchmarks.harness import SCALES, seed, measure, Subjects
+from clubs.tests.helpers import clear_caches
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+# Timings vary between machines far more than query counts, so only large slowdowns fail.
+TIME_TOLERANCE = 5
+TIME_SLACK_MS = 100
+
+def enabled_scales():
+    scales = [scale.strip() for scale in os.environ.get('BENCHMARK_SCALES', 'small').split(',') if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        raise ImproperlyConfigured(f"Unknown BENCHMARK_SCALES {', '.join(unknown)}; choose from {', '.join(SCALES)}.")
+    return scales
+
+# Checked as the benchmarks load, so a misspelt scale fails rather than skipping every benchmark.
+ENABLED_SCALES = enabled_scales()
+
+def is_scale_enabled(scale):
+    return scale in ENABLED_SCALES
+
+def load_baseline():
+    if not BASELINE_PATH.exists():
+        return {}
+    with open(BASELINE_PATH) as baseline_file:
+        return json.load(baseline_file)
+
+def record_baseline(scale, results):
+    baseline = load_baseline()
+    baseline[scale] = results
+    with open(BASELINE_PATH, 'w') as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
+
+def exceeded_budgets(results, budgets):
+    """Return a description of every route and role over its budget."""
+    failures = []
+    for route, timings in sorted(results.items()):
+        if route not in budgets:
+            failures.append(f"{route}: no budget recorded")
+            continue
+        for role, measured in timings.items():
+            budget = budgets[route][role]
+            if measured['queries'] > budget['queries']:
+                failures.append(f"{route} as {role}: {measured['queries']} queries, budget {budget['queries']}")
+            if measured['ms'] > budget['ms'] * TIME_TOLERANCE + TIME_SLACK_MS:
+                failures.append(f"{route} as {role}: {measured['ms']} ms, budget {budget['ms']} ms")
+    return failures
+
+
+@tag('benchmark')
+class BaselineTestCase(SimpleTestCase):
+    """Test the baseline budgets every scale for the same routes."""
+
+    def test_every_scale_has_a_baseline(self):
+        self.assertEqual(sorted(load_baseline()), sorted(SCALES))
+
+    def test_every_scale_budgets_the_same_routes(self):
+        baseline = load_baseline()
+        routes = {scale: sorted(budgets) for scale, budgets in baseline.items()}
+        for scale in SCALES:
+            self.assertEqual(routes.get(scale), routes['small'], scale)
+
+
+@tag('benchmark')
+class SmallViewBudgetTestCase(TestCase):
+    """Test every route stays within the budget recorded for the small dataset."""
+
+    scale = 'small'
+
+    @classmethod
+    def setUpClass(cls):
+        if not is_scale_enabled(cls.scale):
+            raise unittest.SkipTest(f"Set BENCHMARK_SCALES to include {cls.scale} to measure it.")
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        clear_caches()
+        seed(cls.scale)
+        cls.subjects = Subjects()
+
+    def test_routes_stay_within_budget(self):
+        results = measure(self.client, self.subjects)
+        if os.environ.get('BENCHMARK_RECORD'):
+            record_baseline(self.scale, results)
+            return
+        budgets = load_baseline().get(self.scale)
+        self.assertIsNotNone(budgets, f"No baseline recorded for {self.scale}; run with BENCHMARK_RECORD=1.")
+        failures = exceeded_budgets(results, budgets)
+        self.assertEqual(failures, [], "\n".join(failures))
+
+    def test_every_route_is_measured_for_every_role(self):
+        budgets = load_baseline().get(self.scale, {})
+        for route, timings in budgets.items():
+            self.assertEqual(sorted(timings), ['member', 'officer', 'outsider', 'owner'], route)
+
+
+class MediumViewBudgetTestCase(SmallViewBudgetTestCase):
+    scale = 'medium'
+
+
+class LargeViewBudgetTestCase(SmallViewBudgetTestCase):
+    scale = 'large'
@@ -1,5 +1,6 @@
 """Helper classes and methods for unit tests"""
 
+from django.core.cache import caches
 from django.urls import reverse
 from with_asserts.mixin import AssertHTMLMixin
 
@@ -9,6 +10,17 @@ def reverse_with_next(url_name, next_url):
     return url
 
 
+def clear_caches():
+    """
+    Drop cached content and its versions.
+
+    Databases are rolled back between tests, so ids are reused, while cached
+    content keyed on those ids would otherwise outlive the test that made it.
+    """
+    for cache in caches.all():
+        cache.clear()
+
+
 class LogInTester:
 
     def _is_logged_in(self):
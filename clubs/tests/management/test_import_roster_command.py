@@ -0,0 +1,124 @@
+"""Tests for the import_roster command."""
+
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from clubs.models import User, Club, Membership, Application
+from clubs.models.user_models import email_hash
+
+HEADER = "username,email,first_name,last_name,experience,role\n"
+
+def roster_row(i, role=''):
+    return f"member{i},member{i}@example.org,Member,Number,{i % 3 + 1},{role}\n"
+
+class ImportRosterCommandTestCase(TestCase):
+    """Test aspects of importing members to a club from a CSV roster."""
+
+    fixtures = [
+        'clubs/tests/fixtures/default_user.json',
+        'clubs/tests/fixtures/other_users.json',
+        'clubs/tests/fixtures/default_club.json'
+    ]
+
+    def setUp(self):
+        self.club = Club.objects.get(name='King\'s Knights')
+        self.owner = User.objects.get(username='johndoe')
+        Membership.objects.create(club=self.club, user=self.owner, is_owner=True)
+
+    def test_import_creates_users_and_memberships(self):
+        output = self._import(HEADER + roster_row(1) + roster_row(2, 'officer'))
+        self.assertEqual(self.club.get_memberships().count(), 3)
+        self.assertTrue(self.club.get_officers().filter(user__username='member2').exists())
+        imported = User.objects.get(username='member1')
+        self.assertFalse(imported.has_usable_password())
+        self.assertEqual(imported.email_hash, email_hash('member1@example.org'))
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.member_count, 3)
+        self.assertIn("Added 2 new users as members of King's Knights.", output)
+
+    def test_import_does_not_add_existing_accounts(self):
+        jane = User.objects.get(username='janedoe')
+        Application.objects.create(club=self.club, user=jane, personal_statement='Hi')
+        output = self._import(HEADER + "janedoe,JaneDoe@Example.org,Jane,Doe,1,officer\n" + "johndoe,johndoe@example.org,John,Doe,1,officer\n")
+        self.assertEqual(User.objects.filter(email__iexact='janedoe@example.org').count(), 1)
+        self.assertFalse(self.club.get_memberships().filter(user=jane).exists())
+        self.assertTrue(Application.objects.filter(club=self.club, user=jane).exists())
+        self.assertTrue(self.club.get_memberships().get(user=self.owner).is_owner)
+        self.assertIn("Skipped line 2: JaneDoe@example.org already has an account, so must apply to the club themselves.", output)
+        self.assertIn("Added 0 new users as members of King's Knights. 1 were already members", output)
+
+    def test_import_skips_invalid_existing_and_repeated_rows(self):
+        output = self._import(
+            HEADER
+            + "x,not-an-email,Bad,Row,1,\n"
+            + "tomdoe,tomdoe@example.org,Tom,Doe,1,\n"
+            + roster_row(1) + roster_row(1).replace('member1@', 'MEMBER1@')
+            + roster_row(2, 'owner')
+            + "janedoe,someone@example.org,Some,One,1,\n"
+        )
+        self.assertEqual(list(self.club.get_memberships().exclude(user=self.owner).values_list('user__username', flat=True)), ['member1'])
+        self.assertIn("Skipped line 2: Invalid username, email.", output)
+        self.assertIn("Skipped line 3: tomdoe@example.org already has an account, so must apply to the club themselves.", output)
+        self.assertIn("Skipped line 5: MEMBER1@example.org is listed more than once.", output)
+        self.assertIn("Skipped line 6: Only members and officers can be imported.", output)
+        self.assertIn("Skipped line 7: The username janedoe is taken.", output)
+
+    def test_import_can_be_repeated(self):
+        roster = HEADER + roster_row(1) + roster_row(2)
+        self._import(roster)
+        output = self._import(roster)
+        self.assertEqual(self.club.get_memberships().count(), 3)
+        self.assertIn("Added 0 new users as members of King's Knights. 2 were already members", output)
+
+    def test_members_added_by_an_import_running_at_once_are_ignored(self):
+        bulk_create = Membership.objects.bulk_create
+
+        def added_meanwhile(memberships, **kwargs):
+            # Another import of the same roster commits the first membership before this chunk.
+            bulk_create(memberships[:1])
+            return bulk_create(memberships, **kwargs)
+
+        with mock.patch.object(Membership.objects, 'bulk_create', side_effect=added_meanwhile):
+            self._import(HEADER + roster_row(1) + roster_row(2))
+        self.assertEqual(self.club.get_memberships().count(), 3)
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.member_count, 3)
+
+    def test_queries_per_chunk_do_not_grow_with_chunk_size(self):
+        with CaptureQueriesContext(connection) as few:
+            self._import(HEADER + ''.join(roster_row(i) for i in range(5)), chunk_size=5)
+        with CaptureQueriesContext(connection) as many:
+            self._import(HEADER + ''.join(roster_row(i) for i in range(5, 50)), chunk_size=45)
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(self.club.get_memberships().count(), 51)
+
+    def test_members_are_counted_once_per_import(self):
+        with CaptureQueriesContext(connection) as context:
+            self._import(HEADER + ''.join(roster_row(i) for i in range(10)), chunk_size=3)
+        member_counts = [query for query in context if query['sql'].startswith('UPDATE "clubs_club" SET "member_count"')]
+        self.assertEqual(len(member_counts), 1)
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.member_count, 11)
+
+    def test_import_requires_the_identifying_columns(self):
+        with self.assertRaisesMessage(CommandError, "The roster has no email column."):
+            self._import("username,first_name,last_name\nmember1,Member,Number\n")
+
+    def test_import_to_missing_club_fails(self):
+        with self.assertRaises(CommandError):
+            call_command('import_roster', 0, os.devnull, stdout=StringIO())
+
+    def _import(self, contents, **options):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as roster_file:
+            roster_file.write(contents)
+        self.addCleanup(os.remove, roster_file.name)
+        output = StringIO()
+        call_command('import_roster', self.club.id, roster_file.name, stdout=output, **options)
+        return output.getvalue()
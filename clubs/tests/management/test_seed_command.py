@@ -0,0 +1,91 @@
+"""Tests for the bulk mode of the seed command."""
+
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from clubs.models import User, Club, Membership, Application, Tournament, MemberTournamentRelationship, Organiser, Participant, Match, RoundOfMatches
+from clubs.search import search_clubs
+from clubs.cache_versions import get_version, CLUB_DIRECTORY, PAGINATED_LISTS, MATCH_COLLECTIONS
+from clubs.management.helpers import next_id
+
+class BulkSeedCommandTestCase(TestCase):
+    """Test aspects of seeding large datasets in bulk."""
+
+    def test_bulk_seed_creates_requested_amounts(self):
+        self._seed(users=300, clubs=3, tournaments=6, chunk_size=40)
+        self.assertEqual(User.objects.count(), 300)
+        self.assertEqual(Club.objects.count(), 3)
+        self.assertEqual(Membership.objects.count(), 300)
+        self.assertEqual(Application.objects.count(), 15)
+        self.assertEqual(Tournament.objects.count(), 6)
+        self.assertEqual(Organiser.objects.count(), 6)
+
+    def test_bulk_seed_gives_each_club_one_owner(self):
+        self._seed(users=300, clubs=3, tournaments=0, chunk_size=40)
+        for club in Club.objects.all():
+            self.assertEqual(club.get_memberships().filter(is_owner=True).count(), 1)
+            self.assertTrue(club.get_officers().exists())
+
+    def test_bulk_seed_users_can_log_in(self):
+        self._seed(users=10, clubs=1, tournaments=0, chunk_size=4)
+        user = User.objects.first()
+        self.assertTrue(self.client.login(email=user.email, password="Password123"))
+
+    def test_bulk_seed_plays_past_tournaments_to_the_end(self):
+        # Capacities rotate, so the later tournaments take more than one round.
+        self._seed(users=300, clubs=3, tournaments=9, chunk_size=40)
+        past_tournament = Tournament.objects.order_by('id')[2]
+        self.assertTrue(past_tournament.get_is_complete())
+        participants = Participant.objects.filter(tournament=past_tournament)
+        self.assertEqual(participants.filter(round_eliminated=-1).count(), 1)
+        self.assertFalse(Match.objects.filter(collection__tournament=past_tournament, result=0).exists())
+
+        ongoing_tournament = Tournament.objects.order_by('id')[3]
+        self.assertEqual(ongoing_tournament.get_current_round().round_num, 2)
+
+        upcoming_tournament = Tournament.objects.order_by('id')[6]
+        self.assertEqual(upcoming_tournament.get_current_round(), None)
+
+    def test_bulk_seed_resets_id_sequences(self):
+        with mock.patch.object(connection.ops, 'sequence_reset_sql', return_value=['SELECT 1 AS reset_sequences']) as sequence_reset_sql:
+            with CaptureQueriesContext(connection) as context:
+                self._seed(users=20, clubs=2, tournaments=2, chunk_size=5)
+        reset_models = sequence_reset_sql.call_args[0][1]
+        self.assertEqual(set(reset_models), {User, Club, Membership, Application, Tournament, MemberTournamentRelationship})
+        self.assertIn('SELECT 1 AS reset_sequences', [query['sql'] for query in context.captured_queries])
+        user = User.objects.create_user('afterseed', email='afterseed@example.org', password='Password123', first_name='After', last_name='Seed')
+        self.assertEqual(user.id, User.objects.count())
+
+    def test_bulk_seed_invalidates_what_is_cached_for_its_ids(self):
+        # The ids may have been those of rows deleted by unseed, whose content is still cached.
+        keys = [
+            (CLUB_DIRECTORY, 'all'),
+            (PAGINATED_LISTS, f'memberships:{next_id(Club)}'),
+            (PAGINATED_LISTS, f'applications:{next_id(Club)}'),
+            (PAGINATED_LISTS, f'participants:{next_id(Tournament)}'),
+            (MATCH_COLLECTIONS, next_id(RoundOfMatches)),
+        ]
+        versions = [get_version(*key) for key in keys]
+        with self.captureOnCommitCallbacks(execute=True):
+            self._seed(users=300, clubs=3, tournaments=6, chunk_size=40)
+        for key, version in zip(keys, versions):
+            self.assertNotEqual(get_version(*key), version, key)
+
+    def test_bulk_seed_indexes_clubs_for_search(self):
+        self._seed(users=20, clubs=2, tournaments=0, chunk_size=5)
+        club = Club.objects.first()
+        self.assertIn(club, search_clubs(club.name))
+
+    def test_bulk_seed_rejects_invalid_amounts(self):
+        with self.assertRaises(CommandError):
+            self._seed(users=10, clubs=0, tournaments=0, chunk_size=5)
+        with self.assertRaises(CommandError):
+            self._seed(users=10, clubs=1, tournaments=0, chunk_size=0)
+
+    def _seed(self, **options):
+        call_command('seed', stdout=StringIO(), **options)
@@ -0,0 +1,65 @@
+"""Tests for the unseed command."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models.deletion import Collector
+from django.test import TestCase
+from unittest import mock
+from clubs.models import User, Club, Membership, Tournament, RoundOfMatches, Participant, Match
+from clubs.search import search_clubs
+from clubs.cache_versions import get_version, CLUB_DIRECTORY, PAGINATED_LISTS, MATCH_COLLECTIONS
+
+class UnseedCommandTestCase(TestCase):
+    """Test aspects of purging seeded data."""
+
+    def setUp(self):
+        call_command('seed', users=300, clubs=3, tournaments=6, chunk_size=40, stdout=StringIO())
+        self.staff = User.objects.first()
+        self.staff.is_staff = True
+        self.staff.save()
+        self.club_name = Club.objects.first().name
+
+    def test_unseed_removes_everything_but_staff_users(self):
+        self._unseed(chunk_size=25)
+        self.assertEqual(list(User.objects.all()), [self.staff])
+        for model in (Club, Membership, Tournament, Participant, RoundOfMatches, Match):
+            self.assertFalse(model.objects.exists())
+
+    def test_unseed_removes_clubs_from_search_index(self):
+        self._unseed(chunk_size=25)
+        self.assertEqual(list(search_clubs(self.club_name)), [])
+
+    def test_unseed_invalidates_what_is_cached_for_deleted_rows(self):
+        # Deleted ids are reused by the rows seeded next, which must not be shown what was cached before.
+        keys = [
+            (CLUB_DIRECTORY, 'all'),
+            (PAGINATED_LISTS, f'memberships:{Club.objects.first().id}'),
+            (PAGINATED_LISTS, f'participants:{Tournament.objects.first().id}'),
+            (MATCH_COLLECTIONS, RoundOfMatches.objects.first().id),
+        ]
+        versions = [get_version(*key) for key in keys]
+        with self.captureOnCommitCallbacks(execute=True):
+            self._unseed(chunk_size=25)
+        for key, version in zip(keys, versions):
+            self.assertNotEqual(get_version(*key), version, key)
+
+    def test_unseed_does_not_collect_cascades(self):
+        with mock.patch.object(Collector, 'collect', side_effect=AssertionError("Rows were collected")):
+            self._unseed(chunk_size=25)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_unseed_reports_progress_per_chunk(self):
+        output = self._unseed(chunk_size=100)
+        self.assertIn("Deleted 100/299 users", output)
+        self.assertIn("Deleted 299/299 users", output)
+
+    def test_unseed_rejects_invalid_chunk_size(self):
+        with self.assertRaises(CommandError):
+            self._unseed(chunk_size=0)
+
+    def _unseed(self, **options):
+        stdout = StringIO()
+        call_command('unseed', stdout=stdout, **options)
+        return stdout.getvalue()
@@ -1,6 +1,8 @@
 """Tests for Club model"""
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from clubs.models import Club, User, Membership, Ban, Application
 from django.core.exceptions import ValidationError
 
@@ -123,7 +125,39 @@ class ClubModelTestCase(TestCase):
     def test_get_owners(self):
         self.assertEqual(self.club.get_owner(), self.owner)
 
+    # Test member count
+    def test_member_count_follows_joining_members(self):
+        Membership.objects.create(user = self.user, club = self.club)
+        self._assert_member_count(2)
+
+    def test_member_count_follows_leaving_members(self):
+        Membership.objects.filter(club = self.club).delete()
+        self._assert_member_count(0)
+
+    def test_member_count_is_not_overwritten_by_stale_club(self):
+        stale_club = Club.objects.get(pk = self.club.pk)
+        Membership.objects.create(user = self.user, club = self.club)
+        stale_club.description = "Edited"
+        stale_club.save()
+        self._assert_member_count(2)
+
+    def test_recount_members(self):
+        Club.objects.filter(pk = self.club.pk).update(member_count = 5)
+        self.club.recount_members()
+        self.assertEqual(self.club.member_count, 1)
+        self._assert_member_count(1)
+
+    def test_deleting_club_does_not_update_its_member_count(self):
+        for user in User.objects.exclude(membership__club = self.club):
+            Membership.objects.create(user = user, club = self.club)
+        with CaptureQueriesContext(connection) as context:
+            self.club.delete()
+        self.assertFalse([query for query in context if query['sql'].startswith('UPDATE "clubs_club" SET "member_count"')])
+
     # Helper functions.
+    def _assert_member_count(self, count):
+        self.assertEqual(Club.objects.get(pk = self.club.pk).member_count, count)
+
     # Generic assertions.
     def _assert_club_is_valid(self):
         try:
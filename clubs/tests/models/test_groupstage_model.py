@@ -1,7 +1,9 @@
 """Tests for model of a group stage."""
 
+from django.db import connection
 from django.test import TestCase
-from clubs.models import Participant, Tournament, GroupStage, SingleGroup
+from django.test.utils import CaptureQueriesContext
+from clubs.models import Participant, Tournament, GroupStage, SingleGroup, Match
 from django.core.exceptions import ValidationError
 
 class GroupStageModelTestCase(TestCase):
@@ -46,6 +48,50 @@ class GroupStageModelTestCase(TestCase):
         self.assertEqual(set(actual_winners), set(expected_winners))
         self.assertEqual(len(actual_winners), len(set(actual_winners)))
 
+    def test_get_winners_of_finished_round_uses_constant_queries(self):
+        for match in self.group_stage.get_matches():
+            match.result = 1
+            match.save()
+
+        with self.assertNumQueries(2):
+            winners = self.group_stage.get_winners()
+        self.assertEqual(len(winners), 32)
+        self.assertFalse(Participant.objects.filter(tournament=self.tournament).exclude(round_eliminated=-1).exists())
+
+        self.group_stage.close_round()
+        self.assertEqual(Participant.objects.filter(tournament=self.tournament, round_eliminated=1).count(), 64)
+
+    def test_outstanding_matches_are_counted_for_stage_and_groups(self):
+        self.assertEqual(self.group_stage.get_outstanding_matches(), 240)
+        group = SingleGroup.objects.filter(group_stage=self.group_stage)[0]
+        self.assertEqual(group.get_outstanding_matches(), 15)
+
+        match = group.get_matches()[0]
+        match.result = 1
+        match.save()
+        self.assertEqual(self.group_stage.get_outstanding_matches(), 239)
+        self.assertEqual(group.get_outstanding_matches(), 14)
+
+    def test_get_is_complete_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertFalse(self.group_stage.get_is_complete())
+        SingleGroup.objects.filter(group_stage=self.group_stage)[0].get_matches().delete()
+        self.assertEqual(self.group_stage.get_outstanding_matches(), 225)
+
+    def test_deleting_matches_in_bulk_recounts_each_collection_once(self):
+        groups = SingleGroup.objects.filter(group_stage=self.group_stage)[:2]
+        with CaptureQueriesContext(connection) as context:
+            Match.objects.filter(collection__in=groups).delete()
+        self.assertEqual(len(self._counter_updates(context)), 1)
+        self.assertEqual(self.group_stage.get_outstanding_matches(), 210)
+        self.assertEqual(groups[0].get_outstanding_matches(), 0)
+
+    def test_deleting_tournament_does_not_update_counters_of_its_rounds(self):
+        with CaptureQueriesContext(connection) as context:
+            self.tournament.delete()
+        self.assertEqual(self._counter_updates(context), [])
+        self.assertFalse(Match.objects.exists())
+
     def test_get_player_occurrences_returns_size_of_group_minus_one_per_player(self):
         test_participant = Participant.objects.filter(tournament=self.tournament)[0]
         count = 0
@@ -64,4 +110,7 @@ class GroupStageModelTestCase(TestCase):
 
     def _assert_invalid_groupstage(self):
         with self.assertRaises(ValidationError):
-            self.group_stage.full_clean()
\ No newline at end of file
+            self.group_stage.full_clean()
+
+    def _counter_updates(self, context):
+        return [query for query in context if query['sql'].startswith('UPDATE "clubs_roundofmatches"')]
@@ -202,7 +202,50 @@ class KnockOutStageModelTestCase(TestCase):
 
         self.assertEqual(knockout_round.get_winners(), None)
 
+    def test_get_winners_does_not_write_and_is_kept(self):
+        knockout_round = self._complete_first_round_of_16()
+        with self.assertNumQueries(1):
+            winners = knockout_round.get_winners()
+            self.assertIs(knockout_round.get_winners(), winners)
+        self.assertFalse(Participant.objects.filter(tournament=self.tournament).exclude(round_eliminated=-1).exists())
+
+    def test_close_round_eliminates_losers_with_one_update(self):
+        knockout_round = self._complete_first_round_of_16()
+        winners = knockout_round.get_winners()
+        with self.assertNumQueries(1):
+            self.assertTrue(knockout_round.close_round())
+        eliminated = Participant.objects.filter(tournament=self.tournament, round_eliminated=knockout_round.round_num)
+        self.assertEqual(eliminated.count(), 8)
+        self.assertTrue(set(eliminated).isdisjoint(set(winners)))
+
+    def test_close_round_twice_keeps_first_elimination(self):
+        knockout_round = self._complete_first_round_of_16()
+        knockout_round.close_round()
+        knockout_round.round_num = 3
+        knockout_round.close_round()
+        self.assertFalse(Participant.objects.filter(tournament=self.tournament, round_eliminated=3).exists())
+
+    def test_close_round_does_nothing_on_incomplete_round(self):
+        self.knockoutStage.delete()
+        self.tournament.capacity = 16
+        self._adjust_num_participants_to_capacity()
+        knockout_round = self.tournament.generate_next_round()
+        self.assertFalse(knockout_round.close_round())
+        self.assertFalse(Participant.objects.filter(tournament=self.tournament).exclude(round_eliminated=-1).exists())
+
+    def test_close_round_does_nothing_on_round_without_matches(self):
+        self.assertFalse(self.knockoutStage.close_round())
+        self.assertFalse(Participant.objects.filter(tournament=self.tournament).exclude(round_eliminated=-1).exists())
+
     # Helpers
+    def _complete_first_round_of_16(self):
+        self.knockoutStage.delete()
+        self.tournament.capacity = 16
+        self._adjust_num_participants_to_capacity()
+        knockout_round = self.tournament.generate_next_round()
+        self._complete_round_with_single_matchset(knockout_round)
+        return KnockoutStage.objects.get(id=knockout_round.id)
+
     def _adjust_num_participants_to_capacity(self):
         participants = Participant.objects.filter(tournament=self.tournament)
         i = 0
@@ -118,6 +118,37 @@ class MatchModelTestCase(TestCase):
         with self.assertRaises(ValidationError):
             self.match.full_clean()
 
+    # Test outstanding matches counter
+    def test_new_match_without_result_is_outstanding(self):
+        self.assertEqual(self.collection.get_outstanding_matches(), 0)
+        self._create_unplayed_match()
+        self.assertEqual(self.collection.get_outstanding_matches(), 1)
+
+    def test_setting_result_completes_outstanding_match(self):
+        match = self._create_unplayed_match()
+        match = Match.objects.get(id=match.id)
+        match.result = 2
+        match.save()
+        self.assertEqual(self.collection.get_outstanding_matches(), 0)
+        match.save()
+        self.assertEqual(self.collection.get_outstanding_matches(), 0)
+
+    def test_clearing_result_makes_match_outstanding(self):
+        self.match.result = 0
+        self.match.save()
+        self.assertEqual(self.collection.get_outstanding_matches(), 1)
+
+    def test_deleting_outstanding_match_reduces_counter(self):
+        match = self._create_unplayed_match()
+        match.delete()
+        self.assertEqual(self.collection.get_outstanding_matches(), 0)
+
+    def test_outstanding_matches_never_drop_below_zero(self):
+        match = self._create_unplayed_match()
+        RoundOfMatches.objects.filter(id=self.collection.id).update(outstanding_matches=0)
+        match.delete()
+        self.assertEqual(self.collection.get_outstanding_matches(), 0)
+
     # Constraints
     def test_white_player_and_black_player_cannot_be_same(self):
         with self.assertRaises(IntegrityError):
@@ -126,6 +157,14 @@ class MatchModelTestCase(TestCase):
                 black_player = self.first_par
             )
 
+    # Helpers
+    def _create_unplayed_match(self):
+        return Match.objects.create(
+            white_player = self.second_par,
+            black_player = self.first_par,
+            collection = self.collection,
+        )
+
     # Assertions
     def _assert_valid_match(self):
         try:
@@ -5,7 +5,7 @@ The table effectively represents a many-to-many relationship, however we test a
 """
 
 from django.test import TestCase
-from clubs.models import Club, User, Membership
+from clubs.models import Club, User, Membership, Ban
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 
@@ -91,6 +91,64 @@ class MembershipModelTestCase(TestCase):
             self.member_club_owner.is_officer = True
             self.member_club_owner.full_clean()
 
+    # Role tests
+    def test_with_roles_of_annotates_roles_of_user(self):
+        officer = Membership.objects.create(user=User.objects.get(username='richarddoe'), club=self.club, is_officer=True)
+        as_owner = Membership.objects.with_roles_of(self.user_club_owner).get(pk=self.membership.pk)
+        self.assertTrue(as_owner.actor_is_owner)
+        self.assertFalse(as_owner.actor_is_officer)
+        as_officer = Membership.objects.with_roles_of(officer.user).get(pk=self.membership.pk)
+        self.assertFalse(as_officer.actor_is_owner)
+        self.assertTrue(as_officer.actor_is_officer)
+        as_member = Membership.objects.with_roles_of(self.user).get(pk=self.membership.pk)
+        self.assertFalse(as_member.actor_is_owner or as_member.actor_is_officer)
+
+    def test_owner_can_promote_and_demote_member(self):
+        self.assertTrue(self.membership.promote(self.user_club_owner))
+        self.membership.refresh_from_db()
+        self.assertTrue(self.membership.is_officer)
+        self.assertTrue(self.membership.demote(self.user_club_owner))
+        self.membership.refresh_from_db()
+        self.assertFalse(self.membership.is_officer)
+
+    def test_promotion_does_not_apply_once_actor_is_no_longer_owner(self):
+        Membership.objects.filter(pk=self.member_club_owner.pk).update(is_owner=False)
+        self.assertFalse(self.membership.promote(self.user_club_owner))
+        self.membership.refresh_from_db()
+        self.assertFalse(self.membership.is_officer)
+
+    def test_officer_cannot_be_kicked(self):
+        Membership.objects.filter(pk=self.membership.pk).update(is_officer=True)
+        self.assertFalse(self.membership.kick(self.user_club_owner))
+        self.assertTrue(Membership.objects.filter(pk=self.membership.pk).exists())
+
+    def test_ban_removes_membership_and_bans_user(self):
+        self.assertTrue(self.membership.ban(self.user_club_owner))
+        self.assertFalse(Membership.objects.filter(pk=self.membership.pk).exists())
+        self.assertTrue(Ban.objects.filter(club=self.club, user=self.user).exists())
+
+    def test_ban_by_member_does_not_apply(self):
+        other = Membership.objects.create(user=User.objects.get(username='richarddoe'), club=self.club)
+        self.assertFalse(other.ban(self.user))
+        self.assertTrue(Membership.objects.filter(pk=other.pk).exists())
+        self.assertFalse(Ban.objects.exists())
+
+    def test_transfer_ownership_swaps_roles(self):
+        Membership.objects.filter(pk=self.membership.pk).update(is_officer=True)
+        self.assertTrue(self.membership.transfer_ownership(self.user_club_owner))
+        self.membership.refresh_from_db()
+        self.member_club_owner.refresh_from_db()
+        self.assertTrue(self.membership.is_owner)
+        self.assertFalse(self.membership.is_officer)
+        self.assertFalse(self.member_club_owner.is_owner)
+        self.assertTrue(self.member_club_owner.is_officer)
+
+    def test_transfer_ownership_to_non_officer_is_rolled_back(self):
+        self.assertFalse(self.membership.transfer_ownership(self.user_club_owner))
+        self.member_club_owner.refresh_from_db()
+        self.assertTrue(self.member_club_owner.is_owner)
+        self.assertFalse(self.member_club_owner.is_officer)
+
     # Test string
     def test_str(self):
         self.assertEqual(self.membership.__str__(), f'User: {self.user.first_name} {self.user.last_name} at Club: {self.club}')
@@ -0,0 +1,81 @@
+"""Tests that the most frequent lookups are answered from an index."""
+
+import unittest
+
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.utils.timezone import now
+from clubs.models import Membership, Application, Ban, Tournament, Participant, Organiser, User, Club
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "Query plans are checked in SQLite's format.")
+class QueryPlanTestCase(TestCase):
+    """Test the query plan of each hot lookup uses an index rather than a table scan."""
+
+    fixtures = ['clubs/tests/fixtures/default_user.json',
+        'clubs/tests/fixtures/default_club.json',
+        'clubs/tests/fixtures/default_tournament.json'
+        ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='johndoe')
+        self.club = Club.objects.get(name='King\'s Knights')
+        self.tournament = Tournament.objects.get(name="Grand Championship")
+        self.member = Membership.objects.create(user=self.user, club=self.club)
+
+    # Membership
+    def test_membership_by_user_and_club_uses_index(self):
+        self._assert_uses_index(Membership.objects.filter(user=self.user, club=self.club))
+
+    def test_memberships_of_user_use_index_without_sorting(self):
+        self._assert_uses_index(Membership.objects.filter(user=self.user), 'membership_user_club_idx', sorts=False)
+
+    def test_owner_of_club_uses_index(self):
+        self._assert_uses_index(Membership.objects.filter(club=self.club, is_owner=True), 'membership_club_owner_idx')
+
+    def test_officers_of_club_use_index(self):
+        self._assert_uses_index(Membership.objects.filter(club=self.club, is_officer=True), 'membership_club_officer_idx')
+
+    # Application and Ban
+    def test_application_by_user_and_club_uses_index(self):
+        self._assert_uses_index(Application.objects.filter(user=self.user, club=self.club))
+
+    def test_applications_of_user_use_index_without_sorting(self):
+        self._assert_uses_index(Application.objects.filter(user=self.user), 'application_user_club_idx', sorts=False)
+
+    def test_ban_by_user_and_club_uses_index(self):
+        self._assert_uses_index(Ban.objects.filter(user=self.user, club=self.club))
+
+    # Tournament roles
+    def test_participant_by_member_and_tournament_uses_index(self):
+        self._assert_uses_index(Participant.objects.filter(member=self.member, tournament=self.tournament))
+
+    def test_organiser_by_member_and_tournament_uses_index(self):
+        self._assert_uses_index(Organiser.objects.filter(member=self.member, tournament=self.tournament))
+
+    def test_tournaments_of_user_use_index(self):
+        self._assert_uses_index(Participant.objects.filter(member__user=self.user, member__club=F('tournament__club')))
+
+    # Default orderings
+    def test_clubs_are_listed_without_sorting(self):
+        self._assert_uses_index(Club.objects.all(), 'club_created_on_idx', sorts=False)
+
+    # Tournament
+    def test_tournaments_of_club_use_index_without_sorting(self):
+        self._assert_uses_index(Tournament.objects.filter(club=self.club), 'tournament_club_start_end_idx', sorts=False)
+
+    def test_upcoming_tournaments_of_club_use_index(self):
+        self._assert_uses_index(Tournament.objects.filter(club=self.club, start__gt=now()), 'tournament_club_start_end_idx')
+
+    # Assertions
+    def _assert_uses_index(self, queryset, index_name=None, sorts=True):
+        plan = queryset.explain()
+        steps = [line for line in plan.splitlines() if 'SCAN' in line or 'SEARCH' in line]
+        self.assertTrue(steps, plan)
+        for step in steps:
+            # Each table is reached through an index, or directly by its primary key.
+            self.assertRegex(step, 'INDEX|PRIMARY KEY', plan)
+        if index_name is not None:
+            self.assertIn(index_name, plan)
+        if not sorts:
+            self.assertNotIn('TEMP B-TREE', plan)
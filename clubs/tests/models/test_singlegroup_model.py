@@ -81,6 +81,44 @@ class SingleGroupModelTestCase(TestCase):
         
         self._assert_invalid_singlegroup()
 
+    # Test standings
+    def test_standings_order_players_by_points(self):
+        matches = list(self.group.get_matches())
+        for match in matches:
+            match.result = 1
+            match.save()
+        matches[0].result = 3
+        matches[0].save()
+
+        standings = self.group.get_standings()
+        self.assertEqual(len(standings), 6)
+        points = [standing[1] for standing in standings]
+        self.assertEqual(points, sorted(points, reverse=True))
+        self.assertEqual(sum(points), len(matches))
+        for standing in standings:
+            self.assertEqual(standing[2], 5)
+
+    def test_standings_count_incomplete_matches_as_unplayed(self):
+        for standing in self.group.get_standings():
+            self.assertEqual(standing[1], 0)
+            self.assertEqual(standing[2], 0)
+
+    def test_standings_are_computed_with_one_query_and_kept(self):
+        with self.assertNumQueries(1):
+            standings = self.group.get_standings()
+            for standing in standings:
+                standing[0].member.user.username
+            self.assertIs(self.group.get_standings(), standings)
+
+    def test_standings_can_be_refreshed(self):
+        self.group.get_standings()
+        match = self.group.get_matches()[0]
+        match.result = 1
+        match.save()
+        standings = self.group.get_standings(refresh=True)
+        self.assertEqual(standings[0][0], match.white_player)
+        self.assertEqual(standings[0][1], 1)
+
     # Assertions
     def _assert_valid_singlegroup(self):
         try:
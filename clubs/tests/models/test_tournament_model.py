@@ -1,6 +1,10 @@
 """Tests for Tournament model, found in tournaments/models.py"""
 
+from unittest import mock
+
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from clubs.models import Tournament, Membership, User, Participant, GroupStage, KnockoutStage, SingleGroup, Match, Club
 from django.core.exceptions import ValidationError
 
@@ -170,6 +174,48 @@ class TournamentModelTestCase(TestCase):
     def test_num_participants(self):
         self.assertEqual(self.tournament.get_num_participants(), self.tournament.capacity)
 
+    def test_participants_loaded_from_fixtures_are_counted(self):
+        self.assertEqual(self.tournament.participant_count, Participant.objects.filter(tournament=self.tournament).count())
+
+    def test_participant_count_follows_joining_and_leaving(self):
+        participant = Participant.objects.create(member=self.dummy_member, tournament=self.second_tournament)
+        self.assertEqual(self.second_tournament.get_num_participants(), 1)
+        participant.delete()
+        self.assertEqual(self.second_tournament.get_num_participants(), 0)
+
+    def test_participant_count_follows_leaving_club(self):
+        Participant.objects.create(member=self.dummy_member, tournament=self.second_tournament)
+        self.dummy_member.delete()
+        self.assertEqual(self.second_tournament.get_num_participants(), 0)
+
+    def test_participant_count_is_not_overwritten_by_stale_tournament(self):
+        Participant.objects.create(member=self.dummy_member, tournament=self.second_tournament)
+        self.second_tournament.description = "Edited"
+        self.second_tournament.save()
+        self.assertEqual(self.second_tournament.get_num_participants(), 1)
+
+    def test_deleting_tournament_does_not_update_its_participant_count(self):
+        self.tournament.generate_next_round()
+        with CaptureQueriesContext(connection) as context:
+            self.tournament.delete()
+        self.assertFalse([query for query in context if query['sql'].startswith('UPDATE "clubs_tournament" SET "participant_count"')])
+
+    def test_add_participant(self):
+        participant = self.second_tournament.add_participant(self.dummy_member)
+        self.assertEqual(participant.member, self.dummy_member)
+        self.assertEqual(self.second_tournament.get_num_participants(), 1)
+
+    def test_add_participant_to_full_tournament_is_rolled_back(self):
+        participants_before = Participant.objects.count()
+        self.assertIsNone(self.tournament.add_participant(self.dummy_member))
+        self.assertEqual(Participant.objects.count(), participants_before)
+        self.assertEqual(self.tournament.get_num_participants(), self.tournament.capacity)
+
+    def test_is_full_does_not_query(self):
+        with self.assertNumQueries(0):
+            self.assertTrue(self.tournament.is_full())
+            self.assertFalse(self.second_tournament.is_full())
+
     # Test get max round num
     def test_max_round_num_over_32_participants(self):
         self.assertEqual(self.tournament.get_max_round_num(), 6)
@@ -209,6 +255,10 @@ class TournamentModelTestCase(TestCase):
         Participant.objects.filter(tournament=self.tournament).delete()
         self.assertEqual(self.tournament.generate_next_round(), None)
 
+    def test_None_returned_when_generating_next_round_with_one_participant(self):
+        Participant.objects.filter(tournament=self.tournament).exclude(id=Participant.objects.filter(tournament=self.tournament).first().id).delete()
+        self.assertEqual(self.tournament.generate_next_round(), None)
+
     def test_generate_first_round_with_32_participants(self):
         self.tournament.capacity = 32
         self._adjust_num_participants_to_capacity()
@@ -283,6 +333,50 @@ class TournamentModelTestCase(TestCase):
             self._adjust_num_participants_to_capacity()
             next_round = self.tournament.generate_next_round()
 
+    # Test cost of generating rounds
+    def test_generating_round_does_not_query_per_match(self):
+        for capacity, num_groups in [(32, 8), (48, 8), (96, 16)]:
+            with self.subTest(capacity=capacity):
+                self.tournament.capacity = capacity
+                self._adjust_num_participants_to_capacity()
+                with CaptureQueriesContext(connection) as context:
+                    next_round = self.tournament.generate_next_round()
+                num_matches = Match.objects.filter(collection__singlegroup__group_stage=next_round).count()
+                self.assertGreater(num_matches, len(context))
+                # Two inserts per group, as groups use multi-table inheritance, plus a fixed overhead.
+                self.assertLessEqual(len(context), 2 * num_groups + 15)
+                next_round.delete()
+
+    def test_generating_round_is_atomic(self):
+        self.tournament.capacity = 16
+        self._adjust_num_participants_to_capacity()
+        with mock.patch.object(Match.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.tournament.generate_next_round()
+        self.assertFalse(KnockoutStage.objects.filter(tournament=self.tournament).exists())
+
+    def test_failed_first_round_keeps_excess_participants(self):
+        self.tournament.capacity = 32
+        self._adjust_num_participants_to_capacity()
+        excess_ids = list(Participant.objects.filter(tournament=self.tournament).values_list('id', flat=True)[20:])
+        Participant.objects.filter(id__in=excess_ids).delete()
+        with mock.patch.object(Match.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.tournament.generate_next_round()
+        self.assertEqual(Participant.objects.filter(tournament=self.tournament).count(), 20)
+        self.assertEqual(self.tournament.capacity, 32)
+
+    def test_failed_next_round_leaves_current_round_open(self):
+        self.tournament.capacity = 16
+        self._adjust_num_participants_to_capacity()
+        first_round = self.tournament.generate_next_round()
+        self._complete_round_with_single_matchset(first_round)
+        with mock.patch.object(Match.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.tournament.generate_next_round()
+        self.assertFalse(Participant.objects.filter(tournament=self.tournament).exclude(round_eliminated=-1).exists())
+        self.assertEqual(KnockoutStage.objects.filter(tournament=self.tournament).count(), 1)
+
     # Test generate subsequent rounds
 
     def test_round_after_6_player_group_stage_is_4_player_group_stage_with_32_participants(self):
@@ -333,6 +427,73 @@ class TournamentModelTestCase(TestCase):
         next_round = self.tournament.generate_next_round()
         self.assertEqual(next_round, None)
 
+    def test_finishing_final_eliminates_runner_up(self):
+        self.tournament.capacity = 2
+        self._adjust_num_participants_to_capacity()
+        final = self.tournament.generate_next_round()
+        self._complete_round_with_single_matchset(final)
+        self.tournament.generate_next_round()
+        participants = Participant.objects.filter(tournament=self.tournament)
+        self.assertEqual(participants.get(round_eliminated=-1), final.get_winners()[0])
+        self.assertEqual(participants.filter(round_eliminated=1).count(), 1)
+
+    def test_checking_completion_does_not_write(self):
+        self.tournament.capacity = 2
+        self._adjust_num_participants_to_capacity()
+        final = self.tournament.generate_next_round()
+        self._complete_round_with_single_matchset(final)
+        self.assertTrue(self.tournament.get_is_complete())
+        self.assertFalse(Participant.objects.filter(tournament=self.tournament).exclude(round_eliminated=-1).exists())
+
+    # Test current round pointer
+    def test_current_round_is_none_before_tournament_begins(self):
+        self.assertEqual(self.tournament.current_round, None)
+        self.assertEqual(self.tournament.get_current_round(), None)
+
+    def test_current_round_follows_generated_rounds(self):
+        self.tournament.capacity = 32
+        self._adjust_num_participants_to_capacity()
+        first_round = self.tournament.generate_next_round()
+        self.assertEqual(Tournament.objects.get(id=self.tournament.id).current_round_id, first_round.id)
+        self._complete_group_round(first_round)
+        next_round = self.tournament.generate_next_round()
+        stored_tournament = Tournament.objects.get(id=self.tournament.id)
+        self.assertEqual(stored_tournament.current_round_id, next_round.id)
+        self.assertTrue(stored_tournament.current_round_is_knockout)
+
+    def test_get_current_round_resolves_stage_type_with_two_queries(self):
+        self.tournament.capacity = 16
+        self._adjust_num_participants_to_capacity()
+        first_round = self.tournament.generate_next_round()
+        tournament = Tournament.objects.get(id=self.tournament.id)
+        with self.assertNumQueries(2):
+            current_round = tournament.get_current_round()
+        self.assertIsInstance(current_round, KnockoutStage)
+        self.assertEqual(current_round, first_round)
+
+    def test_stale_tournament_sees_new_current_round(self):
+        stale_tournament = Tournament.objects.get(id=self.tournament.id)
+        first_round = self.tournament.generate_next_round()
+        self.assertEqual(stale_tournament.get_current_round(), first_round)
+
+    def test_saving_stale_tournament_keeps_current_round(self):
+        stale_tournament = Tournament.objects.get(id=self.tournament.id)
+        first_round = self.tournament.generate_next_round()
+        stale_tournament.description = "A new description"
+        stale_tournament.save()
+        self.assertEqual(Tournament.objects.get(id=self.tournament.id).current_round_id, first_round.id)
+
+    def test_deleting_current_round_moves_back_to_previous_round(self):
+        self.tournament.capacity = 16
+        self._adjust_num_participants_to_capacity()
+        first_round = self.tournament.generate_next_round()
+        self._complete_round_with_single_matchset(first_round)
+        next_round = self.tournament.generate_next_round()
+        next_round.delete()
+        self.assertEqual(self.tournament.get_current_round(), first_round)
+        first_round.delete()
+        self.assertEqual(self.tournament.get_current_round(), None)
+
     # Test string
     def test_str(self):
         self.assertEqual(self.tournament.__str__(), f'{self.tournament.name} by {self.tournament.club}')
@@ -1,6 +1,9 @@
 """Tests for User model, found in clubs/models.py"""
 
-from django.test import TestCase
+from hashlib import md5
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.urls import reverse
 from clubs.models import User
 from django.core.exceptions import ValidationError
 
@@ -157,6 +160,43 @@ class UserModelTestCase(TestCase):
         expected = "https://www.gravatar.com/avatar/363c1b0cd64dadffb867236a00e62986?size=50&default=mp"
         self.assertEqual(self.user.mini_gravatar(), expected)
 
+    def test_email_hash_is_stored_on_save(self):
+        self.user.save()
+        self.assertEqual(User.objects.get(pk=self.user.pk).email_hash, "363c1b0cd64dadffb867236a00e62986")
+
+    def test_email_hash_follows_email_change(self):
+        self.user.email = " Jane.Doe@Example.org "
+        self.user.save(update_fields=['email'])
+        self.assertEqual(User.objects.get(pk=self.user.pk).email_hash, md5(b"jane.doe@example.org").hexdigest())
+
+    def test_save_does_not_hash_unchanged_email(self):
+        self.user.save()
+        user = User.objects.get(pk=self.user.pk)
+        with mock.patch('clubs.models.user_models.md5_hash') as md5_hash:
+            user.bio = 'Changed'
+            user.save()
+            user.email = 'changed@example.org'
+            user.save(update_fields=['bio'])
+        md5_hash.assert_not_called()
+
+    def test_save_hashes_email_changed_since_loaded(self):
+        self.user.save()
+        user = User.objects.get(pk=self.user.pk)
+        user.email = 'changed@example.org'
+        user.save()
+        self.assertEqual(User.objects.get(pk=self.user.pk).email_hash, md5(b"changed@example.org").hexdigest())
+
+    def test_gravatar_does_not_hash_stored_email(self):
+        self.user.save()
+        with mock.patch('clubs.models.user_models.md5_hash') as md5_hash:
+            self.user.gravatar()
+            self.user.mini_gravatar()
+        md5_hash.assert_not_called()
+
+    @override_settings(AVATAR_PROXY=True, ROOT_URLCONF='clubs.tests.avatar_urls')
+    def test_gravatar_uses_avatar_endpoint_when_enabled(self):
+        self.assertEqual(self.user.mini_gravatar(), reverse('avatar', kwargs={'user_id': self.user.pk, 'size': 50}))
+
     # Helper functions.
     # Generic assertions.
     def _assert_user_is_valid(self):
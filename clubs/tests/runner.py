@@ -0,0 +1,44 @@
+"""Test runner isolating the tests from running servers' caches and from each other's cached content."""
+
+import unittest
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from clubs.tests.helpers import clear_caches
+
+class IsolatedCacheTestRunner(DiscoverRunner):
+    """
+    Keep every cache in the memory of the test process, and clear them before each test.
+
+    The shared cache may be configured to be one a running server reads, which the tests
+    must neither read nor wipe. Databases are rolled back between tests, so ids are
+    reused, while cached content keyed on those ids would otherwise outlive the test
+    that made it.
+    """
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_settings = override_settings(CACHES={
+            alias: {
+                **config,
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': f'test-{alias}',
+                'OPTIONS': {'MAX_ENTRIES': config.get('OPTIONS', {}).get('MAX_ENTRIES', 300)},
+            }
+            for alias, config in settings.CACHES.items()
+        })
+        self._cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_settings.disable()
+        super().teardown_test_environment(**kwargs)
+
+    def get_resultclass(self):
+        base = super().get_resultclass() or unittest.TextTestResult
+
+        class CacheClearingResult(base):
+            def startTest(self, test):
+                clear_caches()
+                super().startTest(test)
+
+        return CacheClearingResult
@@ -0,0 +1,117 @@
+"""Unit tests for the avatar view"""
+
+from unittest import mock
+from urllib.error import URLError
+
+from django.test import TestCase, override_settings
+from django.urls import reverse, NoReverseMatch
+from clubs.avatars import fetch_avatar, AVATAR_FETCH_TIMEOUT, MAX_AVATAR_BYTES
+from clubs.models import User
+from clubs.tests.helpers import reverse_with_next
+
+AVATAR = ('image/png', b'\x89PNG avatar')
+
+
+@override_settings(ROOT_URLCONF='clubs.tests.avatar_urls', AVATAR_PROXY=True)
+class AvatarViewTestCase(TestCase):
+    """Test all aspects of the avatar view"""
+
+    fixtures = ['clubs/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='johndoe')
+        self.user.save()
+        self.url = reverse('avatar', kwargs={'user_id': self.user.pk, 'size': 50})
+        self.client.login(email=self.user.email, password='Password123')
+        # Gravatar is never reached from the tests.
+        patcher = mock.patch('clubs.avatars.fetch_avatar', return_value=AVATAR)
+        self.fetch_avatar = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_avatar_url(self):
+        self.assertEqual(self.url, f'/user/{self.user.pk}/avatar/50/')
+
+    def test_avatar_serves_gravatar_image(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response.content, AVATAR[1])
+        self.fetch_avatar.assert_called_once_with(self.user.gravatar_url(50))
+
+    def test_avatar_is_fetched_from_gravatar_once(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertEqual(response.content, AVATAR[1])
+        self.assertEqual(self.fetch_avatar.call_count, 1)
+
+    def test_avatar_may_be_cached(self):
+        response = self.client.get(self.url)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('max-age=86400', response['Cache-Control'])
+
+    def test_avatar_redirects_to_gravatar_when_unreachable(self):
+        self.fetch_avatar.return_value = None
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], self.user.gravatar_url(50))
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.client.get(self.url)
+        self.assertEqual(self.fetch_avatar.call_count, 2)
+
+    def test_avatar_redirects_to_login_when_logged_out(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse_with_next('log_in', self.url), status_code=302, target_status_code=200)
+
+    def test_avatar_is_read_with_one_query(self):
+        # The session and the user it logs in come first.
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    def test_avatar_of_missing_user_is_not_found(self):
+        response = self.client.get(reverse('avatar', kwargs={'user_id': self.user.pk + 100, 'size': 50}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_avatar_of_invalid_size_is_not_found(self):
+        response = self.client.get(reverse('avatar', kwargs={'user_id': self.user.pk, 'size': 0}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_avatar_only_accepts_get(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 405)
+
+
+class AvatarRouteTestCase(TestCase):
+    """Test the avatar route is only served when the proxy is enabled"""
+
+    def test_avatar_route_is_not_registered_by_default(self):
+        with self.assertRaises(NoReverseMatch):
+            reverse('avatar', kwargs={'user_id': 1, 'size': 50})
+
+
+class AvatarFetchTestCase(TestCase):
+    """Test fetching avatars from gravatar"""
+
+    url = 'https://www.gravatar.com/avatar/0?size=50&default=mp'
+
+    def _fetch(self, content_type='image/png', content=AVATAR[1], error=None):
+        response = mock.MagicMock()
+        response.__enter__.return_value = response
+        response.headers.get_content_type.return_value = content_type
+        response.read.side_effect = lambda amount: content[:amount]
+        with mock.patch('urllib.request.urlopen', return_value=response, side_effect=error) as urlopen:
+            avatar = fetch_avatar(self.url)
+        urlopen.assert_called_once_with(self.url, timeout=AVATAR_FETCH_TIMEOUT)
+        return avatar
+
+    def test_image_is_fetched(self):
+        self.assertEqual(self._fetch(), AVATAR)
+
+    def test_unreachable_gravatar_gives_nothing(self):
+        self.assertIsNone(self._fetch(error=URLError('unreachable')))
+
+    def test_content_other_than_images_is_refused(self):
+        self.assertIsNone(self._fetch(content_type='text/html'))
+
+    def test_oversized_image_is_refused(self):
+        self.assertIsNone(self._fetch(content=b'x' * (MAX_AVATAR_BYTES + 1)))
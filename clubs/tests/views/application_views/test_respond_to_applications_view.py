@@ -0,0 +1,146 @@
+"""Test backend implementation of the ability to accept/reject many applications at once."""
+
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from clubs.models import User, Club, Membership, Application
+from clubs.tests.helpers import reverse_with_next
+
+class RespondToApplicationsViewTestCase(TestCase):
+    """Test all aspects of the bulk respond to applications view"""
+
+    fixtures = [
+        'clubs/tests/fixtures/default_user.json',
+        'clubs/tests/fixtures/other_users.json',
+        'clubs/tests/fixtures/default_club.json'
+    ]
+
+    def setUp(self):
+        self.user_club_owner = User.objects.get(username='johndoe')
+        self.club = Club.objects.get(name='King\'s Knights')
+        Membership.objects.create(club=self.club, user=self.user_club_owner, is_owner=True)
+        self.user_club_member = User.objects.get(username='richarddoe')
+        Membership.objects.create(club=self.club, user=self.user_club_member)
+
+        self.applicants = [User.objects.get(username=username) for username in ['janedoe', 'jamiedoe', 'tomdoe']]
+        self.applicants[2].experience = 3
+        self.applicants[2].save()
+        self.applications = [
+            Application.objects.create(club=self.club, user=user, personal_statement='I love chess!')
+            for user in self.applicants
+        ]
+        self.url = reverse('respond_to_applications', kwargs={'club_id': self.club.id})
+        self.list_url = reverse('show_applications_to_club', kwargs={'club_id': self.club.id})
+
+    def _respond(self, **data):
+        self.client.login(email=self.user_club_owner.email, password='Password123')
+        return self.client.post(self.url, data, follow=True)
+
+    def test_respond_to_applications_url(self):
+        self.assertEqual(self.url, f'/club/{self.club.id}/applications/respond/')
+
+    def test_respond_to_applications_redirects_when_not_logged_in(self):
+        response = self.client.post(self.url, {'decision': 'accept', 'scope': 'matching'})
+        redirect_url = reverse_with_next('log_in', self.url)
+        self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
+
+    def test_get_respond_to_applications_is_not_allowed(self):
+        self.client.login(email=self.user_club_owner.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+
+    def test_accept_selected_applications(self):
+        selected = [self.applications[0].id, self.applications[1].id]
+        response = self._respond(decision='accept', scope='selected', applications=selected)
+        self.assertRedirects(response, self.list_url, status_code=302, target_status_code=200)
+        for user in self.applicants[:2]:
+            self.assertTrue(Membership.objects.filter(club=self.club, user=user).exists())
+        self.assertFalse(Application.objects.filter(id__in=selected).exists())
+        self.assertTrue(Application.objects.filter(id=self.applications[2].id).exists())
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.member_count, 4)
+        messages_list = [str(message) for message in response.context['messages']]
+        self.assertEqual(messages_list, ['Accepted @janedoe, @jamiedoe.'])
+
+    def test_reject_all_matching_applications(self):
+        response = self._respond(decision='reject', scope='matching', experience='')
+        self.assertFalse(Application.objects.filter(club=self.club).exists())
+        self.assertFalse(Membership.objects.filter(club=self.club, user__in=self.applicants).exists())
+        messages_list = [str(message) for message in response.context['messages']]
+        self.assertEqual(messages_list, ['Rejected @janedoe, @jamiedoe, @tomdoe.'])
+
+    def test_accept_applications_matching_experience(self):
+        self._respond(decision='accept', scope='matching', experience='3')
+        self.assertTrue(Membership.objects.filter(club=self.club, user=self.applicants[2]).exists())
+        self.assertEqual(Application.objects.filter(club=self.club).count(), 2)
+
+    def test_outcome_of_answered_applications_and_existing_members_is_reported(self):
+        selected = [application.id for application in self.applications]
+        self.applications[0].delete()
+        Membership.objects.create(club=self.club, user=self.applicants[1])
+        response = self._respond(decision='accept', scope='selected', applications=selected)
+        self.assertEqual(Membership.objects.filter(club=self.club, user=self.applicants[1]).count(), 1)
+        self.assertFalse(Application.objects.filter(club=self.club).exists())
+        messages_list = [str(message) for message in response.context['messages']]
+        self.assertEqual(messages_list, [
+            'Accepted @tomdoe.',
+            'Already members, so their applications were removed: @jamiedoe.',
+            '1 of the selected applications had already been answered.',
+        ])
+
+    def test_accept_all_names_only_the_first_applicants(self):
+        for i in range(10):
+            user = User.objects.create_user(f'applicant{i}', email=f'applicant{i}@example.org', password='Password123', first_name='App', last_name='Licant')
+            Application.objects.create(club=self.club, user=user, personal_statement='I love chess!')
+        response = self._respond(decision='accept', scope='matching', experience='')
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.member_count, 15)
+        messages_list = [str(message) for message in response.context['messages']]
+        self.assertEqual(messages_list, ['Accepted @janedoe, @jamiedoe, @tomdoe, @applicant0, @applicant1 and 8 more.'])
+
+    def test_applicant_joining_meanwhile_is_not_added_twice(self):
+        Membership.objects.create(club=self.club, user=self.applicants[0])
+        get_memberships = Club.get_memberships
+        lookups = []
+
+        def memberships_read_before_joining(club):
+            # The applicant joins from another request after the existing members were read.
+            lookups.append(club)
+            return Membership.objects.none() if len(lookups) == 1 else get_memberships(club)
+
+        with mock.patch.object(Club, 'get_memberships', autospec=True, side_effect=memberships_read_before_joining):
+            self.club.respond_to_applications(Application.objects.filter(id__in=[self.applications[0].id, self.applications[1].id]), True)
+        self.assertEqual(Membership.objects.filter(club=self.club, user=self.applicants[0]).count(), 1)
+        self.assertTrue(Membership.objects.filter(club=self.club, user=self.applicants[1]).exists())
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.member_count, 4)
+
+    def test_applications_of_other_clubs_are_not_answered(self):
+        other_club = Club.objects.create(name='Other Club', location='Hull', description='Another club')
+        application = Application.objects.create(club=other_club, user=self.user_club_owner, personal_statement='Hello')
+        self._respond(decision='accept', scope='selected', applications=[application.id])
+        self.assertTrue(Application.objects.filter(id=application.id).exists())
+        self.assertFalse(Membership.objects.filter(club=other_club).exists())
+
+    def test_selected_scope_requires_applications(self):
+        response = self._respond(decision='accept', scope='selected')
+        self.assertEqual(Application.objects.filter(club=self.club).count(), 3)
+        messages_list = [str(message) for message in response.context['messages']]
+        self.assertEqual(messages_list, ['Select at least one application.'])
+
+    def test_member_cannot_respond_to_applications(self):
+        self.client.login(email=self.user_club_member.email, password='Password123')
+        response = self.client.post(self.url, {'decision': 'accept', 'scope': 'matching'}, follow=True)
+        self.assertRedirects(response, reverse('show_club', kwargs={'club_id': self.club.id}), status_code=302, target_status_code=200)
+        self.assertEqual(Application.objects.filter(club=self.club).count(), 3)
+
+    def test_queries_do_not_grow_with_applications(self):
+        self.client.login(email=self.user_club_owner.email, password='Password123')
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(self.url, {'decision': 'accept', 'scope': 'selected', 'applications': [self.applications[0].id]})
+        with CaptureQueriesContext(connection) as many:
+            self.client.post(self.url, {'decision': 'accept', 'scope': 'selected', 'applications': [a.id for a in self.applications[1:]]})
+        self.assertEqual(len(many), len(few))
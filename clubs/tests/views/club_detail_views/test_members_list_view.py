@@ -5,6 +5,8 @@ from django.urls import reverse
 from clubs.models import User, Club, Membership
 from clubs.tests.helpers import reverse_with_next, MenuTesterMixin
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 class MembersTestCase(TestCase, MenuTesterMixin):
     """Test aspects of account view"""
@@ -238,6 +240,32 @@ class MembersTestCase(TestCase, MenuTesterMixin):
         self.assertTrue(applications_page.has_other_pages())
         self.assertContains(response, '<ul class="pagination ">')
 
+    def test_members_list_query_count_does_not_grow_with_page_length(self):
+        self.member.is_owner = True
+        self.member.save()
+        self.client.login(email=self.user.email, password='Password123')
+        with CaptureQueriesContext(connection) as short_page:
+            self.client.get(self.url)
+        self._create_test_memberships_for_default_club(settings.MEMBERSHIPS_PER_PAGE)
+        with CaptureQueriesContext(connection) as full_page:
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context['page_obj']), settings.MEMBERSHIPS_PER_PAGE)
+        self.assertEqual(len(full_page.captured_queries), len(short_page.captured_queries))
+
+    def test_club_is_fetched_once(self):
+        self.client.login(email=self.user.email, password='Password123')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['club'], self.club)
+        self.assertEqual(len([query for query in context if query['sql'].startswith('SELECT') and 'FROM "clubs_club"' in query['sql']]), 1)
+
+    def test_get_members_list_of_missing_club_redirects(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(reverse('members_list', kwargs={'club_id': self.club.id + 1}), follow=True)
+        self.assertRedirects(response, reverse(settings.REDIRECT_URL_WHEN_LOGGED_IN), status_code=302, target_status_code=200)
+        messages_list = list(response.context['messages'])
+        self.assertEqual(str(messages_list[0]), f'No club with id {self.club.id + 1} exists.')
+
     def _create_test_memberships_for_default_club(self, members_count = 10):
         for future_member in range(members_count):
             
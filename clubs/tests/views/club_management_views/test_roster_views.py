@@ -0,0 +1,99 @@
+"""Tests of the views importing and exporting the members of a club as CSV."""
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.urls import reverse
+from clubs.models import User, Club, Membership
+
+class ClubRosterViewsTestCase(TestCase):
+    """Test all aspects of the roster import and export views"""
+
+    fixtures = [
+        'clubs/tests/fixtures/default_user.json',
+        'clubs/tests/fixtures/other_users.json',
+        'clubs/tests/fixtures/default_club.json'
+    ]
+
+    def setUp(self):
+        self.user_club_owner = User.objects.get(username='johndoe')
+        self.club = Club.objects.get(name='King\'s Knights')
+        Membership.objects.create(club=self.club, user=self.user_club_owner, is_owner=True)
+        self.user_club_officer = User.objects.get(username='janedoe')
+        Membership.objects.create(club=self.club, user=self.user_club_officer, is_officer=True)
+        self.export_url = reverse('export_club_roster', kwargs={'club_id': self.club.id})
+        self.import_url = reverse('import_club_roster', kwargs={'club_id': self.club.id})
+        self.members_url = reverse('members_list', kwargs={'club_id': self.club.id})
+
+    def test_roster_urls(self):
+        self.assertEqual(self.export_url, f'/club/{self.club.id}/members/export/')
+        self.assertEqual(self.import_url, f'/club/{self.club.id}/members/import/')
+
+    def test_owner_exports_members_as_streamed_csv(self):
+        self.client.login(email=self.user_club_owner.email, password='Password123')
+        response = self.client.get(self.export_url)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines, [
+            'username,email,first_name,last_name,experience,role',
+            'johndoe,johndoe@example.org,John,Doe,2,owner',
+            'janedoe,janedoe@example.org,Jane,Doe,2,officer',
+        ])
+
+    def test_officer_cannot_export_members(self):
+        self.client.login(email=self.user_club_officer.email, password='Password123')
+        response = self.client.get(self.export_url)
+        self.assertRedirects(response, reverse('show_club', kwargs={'club_id': self.club.id}), status_code=302, target_status_code=200)
+
+    def test_owner_imports_roster(self):
+        self.client.login(email=self.user_club_owner.email, password='Password123')
+        roster = b'\xef\xbb\xbfusername,email,first_name,last_name,experience,role\r\n' \
+            + b'newmember,newmember@example.org,New,Member,2,\r\n' \
+            + b'richarddoe,richarddoe@example.org,Richard,Doe,1,officer\r\n' \
+            + b'bad,bad,Bad,Row,1,\r\n'
+        response = self.client.post(self.import_url, {'roster': SimpleUploadedFile('roster.csv', roster, 'text/csv')}, follow=True)
+        self.assertRedirects(response, self.members_url, status_code=302, target_status_code=200)
+        self.assertTrue(self.club.get_memberships().filter(user__username='newmember').exists())
+        self.assertFalse(self.club.get_memberships().filter(user__username='richarddoe').exists())
+        self.assertEqual(len(response.context['page_obj']), 3)
+        messages_list = [str(message) for message in response.context['messages']]
+        self.assertEqual(messages_list, [
+            'Added 1 new users as members. 0 were already members.',
+            'Skipped line 3: richarddoe@example.org already has an account, so must apply to the club themselves.',
+            'Skipped line 4: Invalid email.',
+        ])
+
+    def test_export_escapes_cells_read_as_formulas(self):
+        self.user_club_officer.first_name = '=HYPERLINK("http://example.org")'
+        self.user_club_officer.last_name = '@SUM(A1)'
+        self.user_club_officer.save()
+        self.client.login(email=self.user_club_owner.email, password='Password123')
+        response = self.client.get(self.export_url)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[2], 'janedoe,janedoe@example.org,"\'=HYPERLINK(""http://example.org"")",\'@SUM(A1),2,officer')
+
+    def test_escaped_cells_are_imported_as_exported(self):
+        self.client.login(email=self.user_club_owner.email, password='Password123')
+        roster = b'username,email,first_name,last_name\r\n' + b"newmember,newmember@example.org,Ann,'-Lee\r\n"
+        self.client.post(self.import_url, {'roster': SimpleUploadedFile('roster.csv', roster, 'text/csv')})
+        user = User.objects.get(username='newmember')
+        self.assertEqual((user.first_name, user.last_name), ('Ann', '-Lee'))
+
+    def test_import_without_required_columns_is_reported(self):
+        self.client.login(email=self.user_club_owner.email, password='Password123')
+        roster = SimpleUploadedFile('roster.csv', b'name\nsomeone\n', 'text/csv')
+        response = self.client.post(self.import_url, {'roster': roster}, follow=True)
+        messages_list = [str(message) for message in response.context['messages']]
+        self.assertEqual(messages_list, ['The roster has no username, email, first_name, last_name column.'])
+
+    def test_officer_cannot_import_roster(self):
+        self.client.login(email=self.user_club_officer.email, password='Password123')
+        roster = SimpleUploadedFile('roster.csv', b'username,email,first_name,last_name\nnewmember,newmember@example.org,New,Member\n')
+        self.client.post(self.import_url, {'roster': roster})
+        self.assertFalse(User.objects.filter(username='newmember').exists())
+
+    def test_get_import_roster_is_not_allowed(self):
+        self.client.login(email=self.user_club_owner.email, password='Password123')
+        response = self.client.get(self.import_url)
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,116 @@
+"""Tests for the cached pages of the club directory."""
+
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from clubs.cache_versions import version_key, CLUB_DIRECTORY
+from clubs.directory import directory_cache_stats, reset_directory_cache_stats, flush_directory_cache_stats, HITS_KEY, MISSES_KEY
+from clubs.models import Club, Membership, User
+
+class ClubDirectoryCacheTestCase(TestCase):
+    """Test aspects of caching the club directory."""
+
+    fixtures = ['clubs/tests/fixtures/default_user.json',
+    'clubs/tests/fixtures/default_club.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='johndoe')
+        self.client.login(email=self.user.email, password="Password123")
+        Club.objects.bulk_create([
+            Club(name=f'Club {i:02}', location='Hull', description='A club') for i in range(25)
+        ])
+        self.url = reverse('show_clubs')
+        self.sorted_url = reverse('show_clubs', kwargs={'param': 'name', 'order': 'asc'})
+
+    def test_repeated_page_is_served_from_cache(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertFalse([query for query in context if 'FROM "clubs_club"' in query['sql'] and 'COUNT' in query['sql']])
+        self.assertEqual(directory_cache_stats()['hits'], 2)
+
+    def test_pages_and_orders_are_cached_separately(self):
+        first_page = list(self.client.get(self.sorted_url).context['page_obj'])
+        second_page = list(self.client.get(self.sorted_url + '?page=2').context['page_obj'])
+        descending = list(self.client.get(reverse('show_clubs', kwargs={'param': 'name', 'order': 'des'})).context['page_obj'])
+        self.assertEqual(first_page[0].name, 'Club 00')
+        self.assertEqual(second_page[0].name, 'Club 10')
+        self.assertEqual(descending[0].name, 'King\'s Knights')
+
+    def test_created_club_invalidates_directory(self):
+        self.client.get(self.sorted_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Club.objects.create(name='Aardvark Club', location='Hull', description='First by name')
+        response = self.client.get(self.sorted_url)
+        self.assertEqual(response.context['page_obj'][0].name, 'Aardvark Club')
+        self.assertEqual(response.context['page_obj'].paginator.count, 27)
+
+    def test_edited_club_invalidates_directory(self):
+        self.client.get(self.sorted_url)
+        club = Club.objects.get(name='Club 00')
+        with self.captureOnCommitCallbacks(execute=True):
+            club.name = 'Zebra Club'
+            club.save()
+        response = self.client.get(self.sorted_url)
+        self.assertEqual(response.context['page_obj'][0].name, 'Club 01')
+
+    def test_deleted_club_invalidates_directory(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Club.objects.get(name='Club 00').delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 25)
+
+    def test_change_in_another_process_invalidates_directory(self):
+        self.client.get(self.sorted_url)
+        Club.objects.filter(name='Club 00').update(name='Aardvark Club')
+        # Another worker process saving the club bumps the version in the cache they share.
+        other_process_cache = caches.create_connection('shared')
+        other_process_cache.set(version_key(CLUB_DIRECTORY, 'all'), 0)
+        response = self.client.get(self.sorted_url)
+        self.assertEqual(response.context['page_obj'][0].name, 'Aardvark Club')
+
+    def test_hits_and_misses_are_read_by_other_processes_once_flushed(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        other_process_cache = caches.create_connection('shared')
+        self.assertEqual(other_process_cache.get_many([HITS_KEY, MISSES_KEY]), {})
+        flush_directory_cache_stats()
+        self.assertEqual(other_process_cache.get_many([HITS_KEY, MISSES_KEY]), {HITS_KEY: 2, MISSES_KEY: 2})
+
+    def test_hits_and_misses_are_flushed_once_the_interval_passes(self):
+        other_process_cache = caches.create_connection('shared')
+        with mock.patch('clubs.directory.STATS_FLUSH_INTERVAL', 0):
+            self.client.get(self.url)
+        self.assertEqual(other_process_cache.get_many([HITS_KEY, MISSES_KEY]), {MISSES_KEY: 2})
+
+    def test_cached_page_shows_current_member_counts(self):
+        self.client.get(self.sorted_url)
+        club = Club.objects.get(name='Club 00')
+        Membership.objects.create(club=club, user=self.user)
+        response = self.client.get(self.sorted_url)
+        self.assertEqual(response.context['page_obj'][0].member_count, 1)
+
+    def test_member_counts_are_not_counted_per_club(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url)
+        self.assertFalse([query for query in context if 'FROM "clubs_membership"' in query['sql'] and 'COUNT' in query['sql']])
+
+    def test_hit_rate_is_reported(self):
+        reset_directory_cache_stats()
+        self.client.get(self.url)
+        self.client.get(self.url)
+        stats = directory_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 2))
+        self.assertEqual(stats['hit_rate'], 0.5)
+        stdout = StringIO()
+        call_command('directory_cache_stats', '--reset', stdout=stdout)
+        self.assertIn("hit rate: 50.0%", stdout.getvalue())
+        self.assertEqual(directory_cache_stats()['hit_rate'], None)
@@ -0,0 +1,96 @@
+"""Tests for searching clubs by name, location and description."""
+
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from clubs.models import Club, User
+from clubs.search import search_clubs, rebuild_search_index, is_search_index_available
+
+class ClubSearchTestCase(TestCase):
+    """Test aspects of club search."""
+
+    fixtures = ['clubs/tests/fixtures/default_user.json',
+    'clubs/tests/fixtures/default_club.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='johndoe')
+        self.club = Club.objects.get(name='King\'s Knights')
+        self.url = reverse('show_clubs')
+
+    def test_search_index_is_available_on_sqlite(self):
+        self.assertEqual(is_search_index_available(), connection.vendor == 'sqlite')
+
+    def test_empty_search_returns_all_clubs(self):
+        self.assertEqual(list(search_clubs('')), list(Club.objects.all()))
+        self.assertEqual(list(search_clubs(None)), list(Club.objects.all()))
+
+    def test_search_matches_name_location_and_description(self):
+        club = self._create_club('Rook Society', 'Bristol', 'Casual evening games')
+        self.assertIn(club, search_clubs('Society'))
+        self.assertIn(club, search_clubs('bristol'))
+        self.assertIn(club, search_clubs('evening'))
+        self.assertNotIn(club, search_clubs('Manchester'))
+
+    def test_search_matches_part_of_a_word(self):
+        club = self._create_club('Grandmasters', 'Leeds', 'Serious play')
+        self.assertIn(club, search_clubs('master'))
+
+    def test_search_requires_every_term(self):
+        club = self._create_club('Rook Society', 'Bristol', 'Casual evening games')
+        self.assertIn(club, search_clubs('rook bristol'))
+        self.assertNotIn(club, search_clubs('rook leeds'))
+
+    def test_search_ranks_better_matches_first(self):
+        weak_match = self._create_club('Knight Owls', 'York', 'We meet late, and have the odd bishop endgame')
+        strong_match = self._create_club('Bishop Bishop', 'Bath', 'Bishop endgames only')
+        results = list(search_clubs('bishop'))
+        self.assertEqual(results, [strong_match, weak_match])
+
+    def test_search_with_short_term_falls_back_to_substring_match(self):
+        club = self._create_club('Pawn Stars', 'Ely', 'Friendly')
+        self.assertIn(club, search_clubs('el'))
+        self.assertNotIn(club, search_clubs('zq'))
+
+    def test_search_treats_query_syntax_as_text(self):
+        club = self._create_club('The "Best" Club', 'Oxford', 'Find us AND play')
+        self.assertIn(club, search_clubs('"Best"'))
+        self.assertEqual(list(search_clubs('AND OR NOT')), [])
+
+    def test_edited_club_is_found_by_new_name(self):
+        club = self._create_club('Rook Society', 'Bristol', 'Casual evening games')
+        club.name = 'Castle Society'
+        club.save()
+        self.assertIn(club, search_clubs('Castle'))
+        self.assertNotIn(club, search_clubs('Rook'))
+
+    def test_deleted_club_is_not_found(self):
+        club = self._create_club('Rook Society', 'Bristol', 'Casual evening games')
+        club.delete()
+        self.assertEqual(list(search_clubs('Rook')), [])
+
+    def test_rebuilt_index_contains_bulk_created_clubs(self):
+        Club.objects.bulk_create([Club(name='Bulk Club', location='Hull', description='Made in bulk')])
+        rebuild_search_index()
+        self.assertEqual([club.name for club in search_clubs('Bulk')], ['Bulk Club'])
+
+    def test_search_results_are_paginated_in_view(self):
+        self.client.login(email=self.user.email, password="Password123")
+        Club.objects.bulk_create([
+            Club(name=f'Searchable {i}', location='Hull', description='A club') for i in range(25)
+        ])
+        rebuild_search_index()
+        response = self.client.post(self.url, {'searched': 'Searchable'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 25)
+        self.assertTrue(page_obj.has_next())
+
+    def test_search_falls_back_to_substring_match_without_trigram_tokenizer(self):
+        club = self._create_club('Rook Society', 'Bristol', 'Casual evening games')
+        with mock.patch.object(connection.Database, 'sqlite_version_info', (3, 31, 1)):
+            self.assertFalse(is_search_index_available())
+            self.assertEqual(list(search_clubs('society')), [club])
+
+    def _create_club(self, name, location, description):
+        return Club.objects.create(name=name, location=location, description=description)
@@ -9,6 +9,8 @@ from clubs.models import User, Club, Membership, Application
 from clubs.tests.helpers import reverse_with_next, MenuTesterMixin
 from django.core.exceptions import ObjectDoesNotExist
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 
 class MyClubsListTestCase(TestCase, MenuTesterMixin):
@@ -380,6 +382,40 @@ class MyClubsListTestCase(TestCase, MenuTesterMixin):
         self.assertTrue(applications_page.has_other_pages())
         self.assertContains(response, '<ul class="pagination ">')
 
+    def test_club_user_has_applied_to_and_joined_is_listed_once(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self._make_new_membership(self.club, self.user)
+        Application.objects.create(club=self.club, user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['page_obj']), [self.club])
+
+    def test_my_clubs_list_query_count_does_not_grow_with_number_of_clubs(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self._make_new_membership(self.club, self.user)
+        self._create_other_clubs(10)
+        small_catalogue_queries = self._count_queries_for_my_clubs_list()
+        self._create_other_clubs(10000, offset=10)
+        large_catalogue_queries = self._count_queries_for_my_clubs_list()
+        self.assertEqual(small_catalogue_queries, large_catalogue_queries)
+
+    def _count_queries_for_my_clubs_list(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), 1)
+        return len(context.captured_queries)
+
+    def _create_other_clubs(self, club_count, offset=0):
+        Club.objects.bulk_create([
+            Club(
+                name = f'OTHER_CLUB{club_id}',
+                location = f'LOCATION {club_id}',
+                description = f'DESCRIPTION {club_id}'
+            )
+            for club_id in range(offset, offset + club_count)
+        ])
+
     def _create_test_clubs_and_apply_default_user(self, club_count=10):
         for club_id in range(club_count):
 
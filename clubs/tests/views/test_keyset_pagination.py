@@ -0,0 +1,103 @@
+"""Tests for keyset pagination of long lists."""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.db.models.functions import Lower
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from clubs.cache_versions import version_key, PAGINATED_LISTS
+from clubs.models import User, Club, Membership, Application
+from clubs.pagination import KeysetList, list_key
+
+class KeysetPaginationTestCase(TestCase):
+    """Test aspects of paginating lists by their keys."""
+
+    fixtures = ['clubs/tests/fixtures/default_user.json',
+    'clubs/tests/fixtures/default_club.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='johndoe')
+        self.club = Club.objects.get(name='King\'s Knights')
+        Membership.objects.create(user=self.user, club=self.club, is_owner=True)
+        self.client.login(email=self.user.email, password='Password123')
+        User.objects.bulk_create([
+            User(username=f'user{i}', email=f'user{i}@test.org', first_name='User', last_name=f'{i % 7}')
+            for i in range(settings.MEMBERSHIPS_PER_PAGE * 4)
+        ])
+        users = User.objects.filter(username__startswith='user')
+        Membership.objects.bulk_create([Membership(user=user, club=self.club) for user in users])
+        self.club.recount_members()
+        self.url = reverse('members_list', kwargs={'club_id': self.club.id})
+
+    def _members_on_page(self, page):
+        response = self.client.get(self.url + f'?page={page}')
+        return [membership.pk for membership in response.context['page_obj']]
+
+    def test_pages_list_every_member_once_in_order(self):
+        pages = [self._members_on_page(page) for page in range(1, 6)]
+        listed = [pk for page in pages for pk in page]
+        self.assertEqual(listed, list(self.club.get_memberships().order_by('pk').values_list('pk', flat=True)))
+
+    def test_next_page_seeks_past_the_previous_page(self):
+        self._members_on_page(2)
+        with CaptureQueriesContext(connection) as context:
+            self._members_on_page(3)
+        membership_queries = [query['sql'] for query in context if 'FROM "clubs_membership"' in query['sql']]
+        self.assertTrue(membership_queries)
+        self.assertFalse([sql for sql in membership_queries if 'OFFSET' in sql or 'COUNT' in sql])
+
+    def test_previous_page_seeks_back_from_the_next_page(self):
+        expected = self._members_on_page(3)
+        self._members_on_page(4)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self._members_on_page(3), expected)
+        self.assertFalse([query for query in context if 'OFFSET' in query['sql']])
+
+    def test_page_jumped_to_is_fetched_with_offset(self):
+        # Numbered links carry no key to seek past, so a page without a fetched neighbour is counted off.
+        with CaptureQueriesContext(connection) as context:
+            self._members_on_page(2)
+        self.assertTrue([query for query in context if 'FROM "clubs_membership"' in query['sql'] and 'OFFSET' in query['sql']])
+
+    def test_last_page_is_fetched_from_the_end(self):
+        last_page = self._members_on_page(5)
+        memberships = list(self.club.get_memberships().order_by('pk').values_list('pk', flat=True))
+        self.assertEqual(last_page, memberships[settings.MEMBERSHIPS_PER_PAGE * 4:])
+
+    def test_new_member_is_listed_once_list_is_invalidated(self):
+        self._members_on_page(5)
+        user = User.objects.create(username='latecomer', email='latecomer@test.org')
+        with self.captureOnCommitCallbacks(execute=True):
+            membership = Membership.objects.create(user=user, club=self.club)
+        self.assertEqual(self._members_on_page(5)[-1], membership.pk)
+
+    def test_application_count_is_cached_until_applications_change(self):
+        url = reverse('show_applications_to_club', kwargs={'club_id': self.club.id})
+        Application.objects.create(user=User.objects.get(username='user0'), club=self.club, personal_statement='Hello')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+        self.assertFalse([query for query in context if 'COUNT' in query['sql'] and 'FROM "clubs_application"' in query['sql']])
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.create(user=User.objects.get(username='user1'), club=self.club, personal_statement='Hello')
+        self.assertEqual(self.client.get(url).context['page_obj'].paginator.count, 2)
+
+    def test_application_added_in_another_process_is_counted(self):
+        url = reverse('show_applications_to_club', kwargs={'club_id': self.club.id})
+        self.client.get(url)
+        Application.objects.create(user=User.objects.get(username='user0'), club=self.club, personal_statement='Hello')
+        # Another worker process adding the application bumps the version in the cache they share.
+        other_process_cache = caches.create_connection('shared')
+        other_process_cache.set(version_key(PAGINATED_LISTS, f'applications:{self.club.id}'), 0)
+        self.assertEqual(self.client.get(url).context['page_obj'].paginator.count, 1)
+
+    def test_slices_follow_expression_ordering_in_any_order(self):
+        users = User.objects.order_by(Lower('last_name').desc())
+        expected = list(users.order_by(Lower('last_name').desc(), '-pk'))
+        keyset = KeysetList(users, list_key('users', 'all'))
+        slices = [(45, 60), (30, 45), (0, 15), (15, 30), (46, 50), (60, 61)]
+        for start, stop in slices:
+            self.assertEqual(keyset[start:stop], expected[start:stop])
@@ -0,0 +1,87 @@
+"""Tests for the per view query instrumentation and its reports."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.cache import caches
+from clubs.instrumentation import QueryRecorder, record_request, view_reports, view_key
+from clubs.models import User, Club, Membership
+
+
+@override_settings(QUERY_INSTRUMENTATION=True)
+class QueryInstrumentationTestCase(TestCase):
+    """Test requests are measured per view, and reported to staff only."""
+
+    fixtures = ['clubs/tests/fixtures/default_user.json',
+    'clubs/tests/fixtures/other_users.json',
+    'clubs/tests/fixtures/default_club.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='johndoe')
+        self.staff = User.objects.get(username='janedoe')
+        self.staff.is_staff = True
+        self.staff.save()
+        self.club = Club.objects.get(name='King\'s Knights')
+        Membership.objects.create(user=self.user, club=self.club, is_owner=True)
+        self.client.login(email=self.user.email, password="Password123")
+
+    def test_requests_are_recorded_per_url_name(self):
+        self.client.get(reverse('show_clubs'))
+        self.client.get(reverse('show_clubs'))
+        self.client.get(reverse('members_list', kwargs={'club_id': self.club.id}))
+        reports = {report['view']: report for report in view_reports()}
+        self.assertEqual(reports['show_clubs']['requests'], 2)
+        self.assertEqual(reports['members_list']['requests'], 1)
+        self.assertGreater(reports['members_list']['avg_queries'], 0)
+        self.assertGreater(reports['members_list']['avg_wall_ms'], reports['members_list']['avg_sql_ms'])
+
+    def test_totals_are_read_by_other_processes(self):
+        self.client.get(reverse('show_clubs'))
+        # A cache connection of its own, as another worker process would have.
+        other_process_cache = caches.create_connection('shared')
+        self.assertEqual(other_process_cache.get(view_key('show_clubs'))['requests'], 1)
+
+    def test_repeated_statements_are_reported(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for user in User.objects.all():
+                list(Membership.objects.filter(user=user))
+        record_request('members_of_each_user', recorder, 0.1)
+        report = next(report for report in view_reports() if report['view'] == 'members_of_each_user')
+        users = User.objects.count()
+        self.assertEqual(report['avg_queries'], users + 1)
+        self.assertEqual(report['avg_duplicate_queries'], users - 1)
+        self.assertEqual(len(report['duplicate_signatures']), 1)
+        self.assertIn('clubs_membership', report['duplicate_signatures'][0]['sql'])
+
+    def test_unresolved_requests_are_recorded_together(self):
+        self.client.get('/no/such/page/')
+        self.assertIn('<unresolved>', [report['view'] for report in view_reports()])
+
+    @override_settings(QUERY_INSTRUMENTATION=False)
+    def test_nothing_is_recorded_unless_enabled(self):
+        self.client.get(reverse('show_clubs'))
+        self.assertEqual(view_reports(), [])
+
+    def test_staff_get_report_as_json(self):
+        self.client.get(reverse('show_clubs'))
+        self.client.login(email=self.staff.email, password="Password123")
+        response = self.client.get(reverse('query_report'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['enabled'])
+        self.assertIn('show_clubs', [report['view'] for report in data['views']])
+
+    def test_report_is_forbidden_to_other_users(self):
+        response = self.client.get(reverse('query_report'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_query_report_command(self):
+        self.client.get(reverse('show_clubs'))
+        stdout = StringIO()
+        call_command('query_report', '--signatures', '--reset', stdout=stdout)
+        self.assertIn('show_clubs: 1 requests', stdout.getvalue())
+        self.assertEqual(view_reports(), [])
@@ -0,0 +1,71 @@
+"""Tests for the request scoped role resolver used by views and templates."""
+
+from django.test import TestCase
+from clubs.models import User, Club, Membership, Application, Tournament, Organiser
+from clubs.roles import RoleResolver, activate_role_resolver, deactivate_role_resolver
+from clubs.views.helpers import is_user_officer_of_club, is_user_member_of_club
+
+
+class RoleResolverTestCase(TestCase):
+    """Test the roles answered by the resolver and when they are reloaded."""
+
+    fixtures = ['clubs/tests/fixtures/default_user.json',
+    'clubs/tests/fixtures/other_users.json',
+    'clubs/tests/fixtures/default_club.json',
+    'clubs/tests/fixtures/other_clubs.json',
+    'clubs/tests/fixtures/default_tournament.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='johndoe')
+        self.other_user = User.objects.get(username='janedoe')
+        self.club = Club.objects.get(id=1)
+        self.other_club = Club.objects.get(id=2)
+        self.tournament = Tournament.objects.get(id=1)
+        self.membership = Membership.objects.create(user=self.user, club=self.club, is_officer=True)
+        Application.objects.create(user=self.user, club=self.other_club)
+        Organiser.objects.create(member=self.membership, tournament=self.tournament, is_lead_organiser=True)
+        self.roles = RoleResolver(self.user)
+
+    def test_roles_of_current_user(self):
+        self.assertTrue(self.roles.is_member(self.club))
+        self.assertTrue(self.roles.is_officer(self.club))
+        self.assertFalse(self.roles.is_owner(self.club))
+        self.assertFalse(self.roles.is_member(self.other_club))
+        self.assertTrue(self.roles.has_applied(self.other_club))
+        self.assertTrue(self.roles.is_organiser(self.tournament))
+        self.assertTrue(self.roles.is_lead_organiser(self.tournament))
+        self.assertFalse(self.roles.is_participant(self.tournament))
+
+    def test_roles_of_current_user_are_loaded_once(self):
+        self.roles.is_member(self.club)
+        self.roles.has_applied(self.club)
+        self.roles.is_organiser(self.tournament)
+        self.roles.is_participant(self.tournament)
+        with self.assertNumQueries(0):
+            self.roles.is_owner(self.club)
+            self.roles.is_officer(self.other_club)
+            self.roles.has_applied(self.other_club)
+            self.roles.is_lead_organiser(self.tournament)
+            self.roles.is_participant(self.tournament)
+
+    def test_memberships_of_other_users_are_loaded_in_bulk(self):
+        users = list(User.objects.exclude(id=self.user.id))
+        Membership.objects.create(user=self.other_user, club=self.club, is_owner=True)
+        with self.assertNumQueries(1):
+            self.roles.load_memberships(self.club, users)
+        with self.assertNumQueries(0):
+            self.assertTrue(self.roles.is_owner(self.club, self.other_user))
+            for user in users:
+                self.roles.is_member(self.club, user)
+
+    def test_helpers_use_active_resolver_and_see_changes(self):
+        token = activate_role_resolver(self.roles)
+        try:
+            self.assertTrue(is_user_officer_of_club(self.user, self.club))
+            self.membership.is_officer = False
+            self.membership.save()
+            self.assertFalse(is_user_officer_of_club(self.user, self.club))
+            self.membership.delete()
+            self.assertFalse(is_user_member_of_club(self.user, self.club))
+        finally:
+            deactivate_role_resolver(token)
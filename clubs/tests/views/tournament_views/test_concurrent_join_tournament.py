@@ -0,0 +1,89 @@
+"""Stress test of many members joining one tournament at once."""
+
+import threading
+
+from django.db import connections, IntegrityError, OperationalError
+from django.test import TransactionTestCase
+from clubs.models import User, Club, Membership, Tournament, Participant
+
+def is_lock_contention(error):
+    return isinstance(error, OperationalError) and 'locked' in str(error)
+
+class ConcurrentJoinTournamentTestCase(TransactionTestCase):
+    """Test concurrent joins never take a tournament over capacity."""
+
+    fixtures = ['clubs/tests/fixtures/default_user.json',
+        'clubs/tests/fixtures/default_club.json',
+        'clubs/tests/fixtures/default_tournament.json']
+
+    NUM_THREADS = 24
+
+    def setUp(self):
+        self.club = Club.objects.get(name='King\'s Knights')
+        self.tournament = Tournament.objects.get(name="Grand Championship")
+        self.tournament.capacity = 16
+        self.tournament.save()
+        self.members = []
+        for i in range(self.NUM_THREADS):
+            user = User.objects.create_user(
+                username=f'racer{i}',
+                first_name='Race',
+                last_name='Runner',
+                email=f'racer{i}@example.org',
+                password='Password123',
+            )
+            self.members.append(Membership.objects.create(user=user, club=self.club))
+
+    def test_concurrent_joins_fill_tournament_exactly(self):
+        outcomes = self._join_at_once(self.members)
+        joined = [member for member, result, error in outcomes if result is not None]
+        self.assertLessEqual(len(joined), 16)
+        self.assertEqual(Participant.objects.filter(tournament=self.tournament).count(), len(joined))
+        self.assertEqual(self.tournament.get_num_participants(), len(joined))
+
+        # SQLite's shared in-memory test database reports lock contention at once rather than
+        # waiting. The view asks those members to try again, which they do here one at a time.
+        blocked = [member for member, result, error in outcomes if error is not None]
+        self.assertTrue(all(is_lock_contention(error) for member, result, error in outcomes if error is not None))
+        tournament = Tournament.objects.get(pk=self.tournament.pk)
+        for member in blocked:
+            tournament.add_participant(member)
+        self.assertEqual(Participant.objects.filter(tournament=self.tournament).count(), 16)
+        self.assertEqual(self.tournament.get_num_participants(), 16)
+
+    def test_concurrent_duplicate_joins_enrol_member_once(self):
+        outcomes = self._join_at_once([self.members[0]] * 8)
+        self.assertEqual(len([result for member, result, error in outcomes if result is not None]), 1)
+        errors = [error for member, result, error in outcomes if error is not None]
+        self.assertEqual(len(errors), 7)
+        self.assertTrue(all(isinstance(error, IntegrityError) or is_lock_contention(error) for error in errors))
+        self.assertEqual(self.tournament.get_num_participants(), 1)
+
+    def _join_at_once(self, members):
+        """Let every member join at the same moment, returning each member with the participant or error it got."""
+        barrier = threading.Barrier(len(members))
+        outcomes = []
+        lock = threading.Lock()
+
+        def join(member, tournament):
+            barrier.wait()
+            result = error = None
+            try:
+                result = tournament.add_participant(member)
+            except Exception as raised:
+                error = raised
+            finally:
+                connections.close_all()
+            with lock:
+                outcomes.append((member, result, error))
+
+        # Tournaments are read beforehand, as reads may also meet lock contention on SQLite.
+        threads = [
+            threading.Thread(target=join, args=(member, Tournament.objects.get(pk=self.tournament.pk)))
+            for member in members
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
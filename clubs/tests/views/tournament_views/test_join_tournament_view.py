@@ -1,5 +1,8 @@
 """Test backend of the create club form."""
 
+from unittest import mock
+
+from django.db import OperationalError
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.hashers import check_password
@@ -109,3 +112,14 @@ class JoinTournamentViewTest(TestCase, MenuTesterMixin):
 
         redirect_url = reverse('show_club', kwargs = {'club_id': self.tournament.club.id})
         self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
+
+    def test_join_blocked_by_concurrent_joins_is_reported(self):
+        self.client.login(email=self.user.email, password='Password123')
+        participant_count_before = Participant.objects.count()
+        with mock.patch.object(Tournament, 'add_participant', side_effect=OperationalError('database is locked')):
+            response = self.client.post(self.url, follow=True)
+        self.assertEqual(Participant.objects.count(), participant_count_before)
+        redirect_url = reverse('show_club', kwargs = {'club_id': self.tournament.club.id})
+        self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
+        messages_list = [str(message) for message in response.context['messages']]
+        self.assertEqual(messages_list, ['Many members are joining the tournament right now, please try again'])
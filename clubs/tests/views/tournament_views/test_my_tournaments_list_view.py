@@ -7,6 +7,8 @@ from clubs.models import User, Tournament, Participant, Organiser, Membership, C
 
 from datetime import timedelta
 from django.utils.timezone import now
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 class MyTournamentListViewTestCase(TestCase):
     """Test all validation within view my tournaments list"""
@@ -70,4 +72,57 @@ class MyTournamentListViewTestCase(TestCase):
         self.client.login(email=self.user.email, password="Password123")
         response = self.client.get(self.url, follow=True)
         self.assertTemplateUsed(response, "tournament/my_tournament_list.html")
-        self.assertEqual(response.status_code, 200)
\ No newline at end of file
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_my_tournaments_sorts_tournaments_by_role_and_date(self):
+        # The tournaments are only moved into the past and present in memory by setUp.
+        self.t2.save()
+        self.t3.save()
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['participant_upcoming_tournaments'], [self.t1])
+        self.assertEqual(response.context['participant_ongoing_tournaments'], [self.t2])
+        self.assertEqual(response.context['participant_past_tournaments'], [])
+        self.assertEqual(response.context['organiser_upcoming_tournaments'], [])
+        self.assertEqual(response.context['organiser_ongoing_tournaments'], [])
+        self.assertEqual(response.context['organiser_past_tournaments'], [self.t3])
+
+    def test_get_my_tournaments_ignores_tournaments_of_other_clubs(self):
+        other_club = Club.objects.get(id=2)
+        Membership.objects.create(user=self.user, club=other_club)
+        other_tournament = Tournament.objects.create(
+            club=other_club,
+            name="Somebody else's tournament",
+            description="Not joined.",
+            deadline=now() + timedelta(days=1),
+            start=now() + timedelta(days=2),
+            end=now() + timedelta(days=3),
+        )
+        self.client.login(email=self.user.email, password="Password123")
+        response = self.client.get(self.url)
+        for tournaments in response.context['participant_upcoming_tournaments'], response.context['organiser_upcoming_tournaments']:
+            self.assertNotIn(other_tournament, tournaments)
+
+    def test_get_my_tournaments_query_budget_with_5000_tournaments(self):
+        self.client.login(email=self.user.email, password="Password123")
+        with CaptureQueriesContext(connection) as few_tournaments:
+            self.client.get(self.url)
+
+        club = Club.objects.get(id=2)
+        Tournament.objects.bulk_create([
+            Tournament(
+                club=club,
+                name=f'Tournament {i}',
+                description='Benchmark tournament.',
+                deadline=now() + timedelta(days=1),
+                start=now() + timedelta(days=2),
+                end=now() + timedelta(days=3),
+            )
+            for i in range(5000)
+        ])
+        with CaptureQueriesContext(connection) as many_tournaments:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(many_tournaments.captured_queries), len(few_tournaments.captured_queries))
+        self.assertLessEqual(len(many_tournaments.captured_queries), 20)
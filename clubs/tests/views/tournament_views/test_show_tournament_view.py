@@ -1,8 +1,12 @@
 """Test view to fetch info about a specific tournament."""
 
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from clubs.models import Club, Membership, User, Tournament, Organiser
+from clubs.cache_versions import version_key, MATCH_COLLECTIONS
+from clubs.models import Club, Membership, User, Tournament, Organiser, Match, KnockoutStage
 from clubs.tests.helpers import reverse_with_next, MenuTesterMixin
 
 class ShowClubViewTestCase(TestCase, MenuTesterMixin):
@@ -13,6 +17,7 @@ class ShowClubViewTestCase(TestCase, MenuTesterMixin):
         'clubs/tests/fixtures/default_user.json',
         'clubs/tests/fixtures/other_users.json',
         'clubs/tests/fixtures/default_tournament.json',
+        'clubs/tests/fixtures/default_tournament_participants.json',
     ]
 
     def setUp(self):
@@ -65,3 +70,87 @@ class ShowClubViewTestCase(TestCase, MenuTesterMixin):
         self.assertTemplateUsed(response, "tournament/show_tournament.html")
         self.assertEqual(response.status_code, 200) #OK
         self.assert_menu(response)
+
+    def test_show_tournament_before_start_has_no_rounds(self):
+        self.client.login(email=self.owner_user.email, password="Password123")
+        response = self.client.get(self.url)
+        bracket = response.context['bracket']
+        self.assertEqual(bracket.num_participants, 96)
+        self.assertEqual(bracket.current_round, None)
+        self.assertEqual(bracket.knockout_stages, [])
+        self.assertEqual(bracket.group_stages, [])
+        self.assertEqual(bracket.organisers, [self.organiser])
+
+    def test_show_tournament_builds_bracket_of_finished_tournament(self):
+        self._play_whole_tournament()
+        self.client.login(email=self.owner_user.email, password="Password123")
+        response = self.client.get(self.url)
+        bracket = response.context['bracket']
+        self.assertEqual([stage.round_num for stage in bracket.group_stages], [2, 1])
+        self.assertEqual([stage.round_num for stage in bracket.knockout_stages], [6, 5, 4, 3])
+        self.assertEqual(bracket.current_round.stage, KnockoutStage.objects.get(tournament=self.tournament, round_num=6))
+        first_stage = bracket.group_stages[-1]
+        self.assertEqual(len(first_stage.groups), 16)
+        self.assertEqual(len(first_stage.groups[0].matches), 15)
+        self.assertEqual(len(first_stage.groups[0].standings), 6)
+        self.assertEqual(len(bracket.knockout_stages[0].matches), 1)
+
+    def test_show_tournament_queries_do_not_grow_with_bracket(self):
+        self.client.login(email=self.owner_user.email, password="Password123")
+        self.tournament.generate_next_round()
+        with CaptureQueriesContext(connection) as first_round_context:
+            self.client.get(self.url)
+        self._play_whole_tournament()
+        with CaptureQueriesContext(connection) as finished_context:
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Knockout Stage')
+        self.assertEqual(len(finished_context), len(first_round_context))
+        self.assertLessEqual(len(finished_context), 20)
+
+    def test_show_tournament_renders_stages_from_cache(self):
+        self.client.login(email=self.owner_user.email, password="Password123")
+        self._play_whole_tournament()
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as cached_context:
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Group Stage 1')
+        self.assertFalse([query for query in cached_context if '"clubs_match"' in query['sql']])
+
+    def test_show_tournament_shows_new_result_of_cached_stage(self):
+        self.client.login(email=self.owner_user.email, password="Password123")
+        self.tournament.generate_next_round()
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'bi-award-fill')
+        match = Match.objects.filter(collection__tournament=self.tournament).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            match.result = 1
+            match.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, 'bi-award-fill', count=1)
+
+    def test_show_tournament_shows_result_entered_in_another_process(self):
+        self.client.login(email=self.owner_user.email, password="Password123")
+        self.tournament.generate_next_round()
+        self.client.get(self.url)
+        match = Match.objects.filter(collection__tournament=self.tournament).first()
+        Match.objects.filter(pk=match.pk).update(result=1)
+        # Another worker process saving the result bumps the version in the cache they share.
+        other_process_cache = caches.create_connection('shared')
+        other_process_cache.set(version_key(MATCH_COLLECTIONS, match.collection_id), 0)
+        self.assertContains(self.client.get(self.url), 'bi-award-fill', count=1)
+
+    def test_show_tournament_caches_stages_separately_for_organisers(self):
+        Membership.objects.create(club=self.club, user=self.non_member_user)
+        self.tournament.generate_next_round()
+        self.client.login(email=self.owner_user.email, password="Password123")
+        self.assertContains(self.client.get(self.url), 'Add Result')
+        self.client.login(email=self.non_member_user.email, password="Password123")
+        self.assertNotContains(self.client.get(self.url), 'Add Result')
+
+    def _play_whole_tournament(self):
+        # White wins every match, which is enough to decide every round.
+        self.tournament.refresh_from_db()
+        while True:
+            Match.objects.filter(collection__tournament=self.tournament, result=0).update(result=1)
+            if self.tournament.generate_next_round() is None:
+                break
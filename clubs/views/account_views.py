@@ -10,12 +10,16 @@ from django.utils.decorators import method_decorator
 from clubs.forms import SignUpForm, EditAccountForm
 from django.contrib.auth.forms import PasswordChangeForm
 from clubs.models import User
+from clubs.avatars import get_avatar
 
 from django.contrib import messages
 from django.contrib.auth import login
 from django.urls import reverse
 from django.conf import settings
-from django.shortcuts import render
+from django.shortcuts import render, get_object_or_404
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET
 
 @login_required
 def account(request):
@@ -23,6 +27,25 @@ def account(request):
     return render(request, 'account/account.html', { 'current_user': request.user })
 
 
+@login_required
+@require_GET
+def avatar(request, user_id, size):
+    """Serve the gravatar of a user from the cache, from a URL browsers may cache by user."""
+    if not 1 <= size <= 2048:
+        raise Http404
+    user = get_object_or_404(User.objects.only('email', 'email_hash'), pk=user_id)
+    avatar = get_avatar(user, size)
+    if avatar is None:
+        # Gravatar could not be reached from here, so the browser is sent there, without caching the detour.
+        response = HttpResponseRedirect(user.gravatar_url(size))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    content_type, content = avatar
+    response = HttpResponse(content, content_type=content_type)
+    patch_cache_control(response, private=True, max_age=settings.AVATAR_MAX_AGE)
+    return response
+
+
 class SignUpView(FormView):
     """Create a new user account."""
     form_class = SignUpForm
@@ -6,10 +6,12 @@ from django.views.generic.edit import FormView
 from .helpers import is_user_owner_of_club, is_user_officer_of_club
 from .decorators import club_exists, membership_exists, not_banned, application_exists
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.utils.decorators import method_decorator
 
-from clubs.forms import ApplyToClubForm
-from clubs.models import Membership, Club, Application
+from clubs.forms import ApplyToClubForm, RespondToApplicationsForm
+from clubs.models import Membership, Club, Application, ACCEPTED, REJECTED, ALREADY_MEMBER
+from clubs.pagination import KeysetList, list_key
 
 from django.contrib import messages
 from django.urls import reverse
@@ -18,6 +20,9 @@ from django.shortcuts import render, redirect
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.conf import settings
 
+# Applicants named in the message reporting applications answered at once.
+MAX_LISTED_APPLICANTS = 5
+
 # User applying to club views:
 
 class ApplyToClubView(FormView):
@@ -34,7 +39,7 @@ class ApplyToClubView(FormView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['current_user'] = self.request.user
-        context['club'] = Club.objects.get(id=self.kwargs['club_id'])
+        context['club'] = self.request.club
         return context
 
     def form_valid(self, form):
@@ -61,7 +66,7 @@ class ApplyToClubView(FormView):
 def withdraw_application_to_club(request, club_id):
     """Have currently logged in user delete an application to the specified club, if it exists."""
     current_user = request.user
-    applied_club = Club.objects.get(id=club_id)
+    applied_club = request.club
     if Application.objects.filter(club=applied_club, user = current_user).exists():
         Application.objects.get(club=applied_club, user=current_user).delete()
     else:
@@ -74,10 +79,11 @@ def withdraw_application_to_club(request, club_id):
 @club_exists
 def show_applications_to_club(request, club_id):
     """Allow the owner of a club to view all applications to said club."""
-    club_to_view = Club.objects.get(id = club_id)
+    club_to_view = request.club
     if is_user_owner_of_club(request.user, club_to_view) or is_user_officer_of_club(request.user, club_to_view):
 
-        paginator = Paginator(club_to_view.get_applications(), settings.APPLICATIONS_PER_PAGE)
+        applications = KeysetList(club_to_view.get_applications().select_related('user').order_by('pk'), list_key('applications', club_to_view.pk))
+        paginator = Paginator(applications, settings.APPLICATIONS_PER_PAGE)
 
         page = request.GET.get('page')
         try:
@@ -87,16 +93,21 @@ def show_applications_to_club(request, club_id):
         except EmptyPage:
             page_obj  = paginator.page(paginator.num_pages)
 
-        return render(request, 'club/application_list.html', {'current_user': request.user, 'club': club_to_view, 'page_obj': page_obj})
+        return render(request, 'club/application_list.html', {
+            'current_user': request.user,
+            'club': club_to_view,
+            'page_obj': page_obj,
+            'form': RespondToApplicationsForm(),
+        })
     else: #Access denied
         messages.error(request, "Only the club owner and officers can view applications")
         return redirect('show_club', club_id=club_id)
 
 @login_required
-@application_exists
+@application_exists(select_related=['club', 'user'])
 def respond_to_application(request, app_id, is_accepted):
     """Allow the owner of a club to accept or reject some application to said club."""
-    application = Application.objects.get(id = app_id)
+    application = request.application
     club_applied_to = application.club
     if is_user_owner_of_club(request.user, club_applied_to) or is_user_officer_of_club(request.user, club_applied_to):
         if is_accepted: #Applications are delete wether rejected or accepted but iff accepted a membership is created.
@@ -112,3 +123,48 @@ def respond_to_application(request, app_id, is_accepted):
     else:
         messages.error(request, 'Only owners or officers can accept or reject applications.')
         return redirect("show_club", club_id=club_applied_to.id)
+
+@login_required
+@require_POST
+@club_exists
+def respond_to_applications(request, club_id):
+    """Allow the owner or officers of a club to accept or reject many of its applications at once."""
+    club = request.club
+    if not (is_user_owner_of_club(request.user, club) or is_user_officer_of_club(request.user, club)):
+        messages.error(request, 'Only owners or officers can accept or reject applications.')
+        return redirect('show_club', club_id=club.id)
+
+    form = RespondToApplicationsForm(request.POST)
+    if not form.is_valid():
+        for error in form.non_field_errors() or ['The applications could not be answered.']:
+            messages.error(request, error)
+        return redirect('show_applications_to_club', club_id=club.id)
+
+    outcomes = club.respond_to_applications(form.chosen_applications(club), form.is_accept())
+    report_application_outcomes(request, outcomes, form.cleaned_data['applications'])
+    return redirect('show_applications_to_club', club_id=club.id)
+
+def list_applicants(usernames):
+    """Join the first few usernames, counting the rest, so answering every application keeps the message short."""
+    listed = ', '.join(usernames[:MAX_LISTED_APPLICANTS])
+    if len(usernames) > MAX_LISTED_APPLICANTS:
+        listed += f' and {len(usernames) - MAX_LISTED_APPLICANTS} more'
+    return listed
+
+def report_application_outcomes(request, outcomes, selected_ids):
+    """Add a message listing the applicants of each outcome, and how many selected applications were no longer pending."""
+    usernames = {ACCEPTED: [], REJECTED: [], ALREADY_MEMBER: []}
+    for application, outcome in outcomes:
+        usernames[outcome].append('@' + application.user.username)
+    if usernames[ACCEPTED]:
+        messages.success(request, 'Accepted ' + list_applicants(usernames[ACCEPTED]) + '.')
+    if usernames[REJECTED]:
+        messages.warning(request, 'Rejected ' + list_applicants(usernames[REJECTED]) + '.')
+    if usernames[ALREADY_MEMBER]:
+        messages.info(request, 'Already members, so their applications were removed: ' + list_applicants(usernames[ALREADY_MEMBER]) + '.')
+
+    answered = len(set(selected_ids) - {application.pk for application, outcome in outcomes})
+    if answered:
+        messages.warning(request, f'{answered} of the selected applications had already been answered.')
+    elif not outcomes:
+        messages.info(request, 'No applications matched.')
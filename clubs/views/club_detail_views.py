@@ -16,14 +16,16 @@ from django.shortcuts import render, redirect
 
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.conf import settings
+from clubs.pagination import KeysetList, list_key
 
 @login_required
 @club_exists
 def members_list(request, club_id):
     """Display a list of the members in a club"""
-    club = Club.objects.get(id = club_id)
+    club = request.club
 
-    paginator = Paginator(club.get_memberships(), settings.MEMBERSHIPS_PER_PAGE)
+    memberships = KeysetList(club.get_memberships().select_related('user').order_by('pk'), list_key('memberships', club.pk), count=club.member_count)
+    paginator = Paginator(memberships, settings.MEMBERSHIPS_PER_PAGE)
 
     page = request.GET.get('page')
     try:
@@ -33,13 +35,16 @@ def members_list(request, club_id):
     except EmptyPage:
         page_obj  = paginator.page(paginator.num_pages)
 
+    # The rows check the role of each listed member, which is already loaded.
+    request.roles.add_memberships(page_obj)
+
     return render(request, 'club/members_list.html', {'current_user': request.user, 'club': club, 'page_obj': page_obj})
 
 @login_required
 @club_exists
 def show_club(request, club_id):
     """View details of a club."""
-    club = Club.objects.get(id=club_id)
+    club = request.club
 
     today = timezone.now()
     ongoing_t = Tournament.objects.filter(club=club, start__lte=today, end__gte=today)
@@ -62,7 +67,7 @@ def show_club(request, club_id):
 def leave_club(request, club_id):
     """Delete the member object linking the current user to the specified club, if it exists."""
     current_user = request.user
-    club_to_leave = Club.objects.get(id=club_id)
+    club_to_leave = request.club
 
     if Membership.objects.filter(club=club_to_leave, user=current_user).exists():
         if not is_user_owner_of_club(current_user, club_to_leave):
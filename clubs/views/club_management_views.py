@@ -3,13 +3,19 @@
 from django.views import View
 from django.views.generic.edit import FormView, UpdateView, DeleteView
 
-from .helpers import is_user_owner_of_club, is_user_officer_of_club
+from .helpers import is_user_owner_of_club, is_user_officer_of_club, ROLES_CHANGED_MESSAGE
 from .decorators import club_exists, membership_exists
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.utils.decorators import method_decorator
 
-from clubs.forms import CreateClubForm, EditClubInfoForm
+from clubs.forms import CreateClubForm, EditClubInfoForm, ImportRosterForm
 from clubs.models import Membership, Club
+from clubs import roster
+
+from io import TextIOWrapper
+from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
 
 from django.contrib import messages
 from django.urls import reverse
@@ -43,24 +49,17 @@ class CreateClubView(FormView):
 
 
 @login_required
-@membership_exists
+@membership_exists(select_related=['club', 'user'])
 def transfer_ownership_to_officer(request, member_id):
     """Allow the owner of a club to promote some member of said club to officer."""
-    member = Membership.objects.get(id = member_id)
+    member = request.membership
     club = member.club
-    if is_user_owner_of_club(request.user, club):
-        if is_user_officer_of_club(member.user, club):
-            curr_owner = Membership.objects.get(club=club, user=request.user)
-
-            curr_owner.is_owner = False
-            curr_owner.is_officer = True
-            curr_owner.save()
-
-            member.is_owner = True
-            member.is_officer = False
-            member.save() # Or database won't update.
-
-            messages.warning(request, 'Ownership transfered to ' + '@' + member.user.username + '.')
+    if member.actor_is_owner:
+        if member.is_officer:
+            if member.transfer_ownership(request.user):
+                messages.warning(request, 'Ownership transfered to ' + '@' + member.user.username + '.')
+            else:
+                messages.error(request, ROLES_CHANGED_MESSAGE)
         else: # Access denied, targetted member should be an officer.
             messages.error(request, 'Ownership must be transfered to an officer. Promote '
                 + '@' + member.user.username + ' first.')
@@ -83,7 +82,7 @@ class EditClubInfoView(UpdateView):
 
     def get_object(self):
         """Return the object (club) to be updated."""
-        return Club.objects.get(id=self.kwargs['club_id'])
+        return self.request.club
 
     def get_success_url(self):
         """Return redirect URL after successful update."""
@@ -95,12 +94,58 @@ class EditClubInfoView(UpdateView):
 def delete_club(request, club_id):
     """Delete the club, you must be the owner in order to delete the club"""
     current_user = request.user
-    club_to_delete = Club.objects.get(id=club_id)
+    club_to_delete = request.club
 
     if is_user_owner_of_club(current_user, club_to_delete):
-        Club.objects.get(id=club_id).delete()
+        club_to_delete.delete()
         messages.add_message(request, messages.INFO, "The club has successfully been deleted.")
         return redirect('show_clubs')
     else:
         messages.add_message(request, messages.ERROR, "You are not the owner of this club.")
         return redirect('show_club', club_id=club_id)
+
+@login_required
+@club_exists
+def export_club_roster(request, club_id):
+    """Download the members of the club as CSV, streamed as it is read. Only the owner may export it."""
+    club = request.club
+    if not is_user_owner_of_club(request.user, club):
+        messages.error(request, "Only the owner can export the members of a club.")
+        return redirect('show_club', club_id=club_id)
+
+    response = StreamingHttpResponse(roster.export_roster(club), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="club-{club.id}-roster.csv"'
+    return response
+
+@login_required
+@require_POST
+@club_exists
+def import_club_roster(request, club_id):
+    """Create accounts for the new users listed in an uploaded CSV roster, as members of the club. Only the owner may import one."""
+    club = request.club
+    if not is_user_owner_of_club(request.user, club):
+        messages.error(request, "Only the owner can import members to a club.")
+        return redirect('show_club', club_id=club_id)
+
+    form = ImportRosterForm(request.POST, request.FILES)
+    if not form.is_valid():
+        messages.error(request, "Choose a CSV file to import.")
+        return redirect('members_list', club_id=club_id)
+
+    # Read line by line, so large uploads, which are kept on disk, are never held in memory.
+    lines = TextIOWrapper(form.cleaned_data['roster'].file, encoding='utf-8-sig', newline='')
+    try:
+        result = roster.import_roster(club, lines)
+    except ValidationError as error:
+        messages.error(request, error.messages[0])
+        return redirect('members_list', club_id=club_id)
+    except UnicodeDecodeError:
+        messages.error(request, "The roster must be a UTF-8 CSV file.")
+        return redirect('members_list', club_id=club_id)
+
+    messages.success(request, f"Added {result.members_added} new users as members. {result.already_members} were already members.")
+    for line, reason in result.skipped[:5]:
+        messages.warning(request, f"Skipped line {line}: {reason}")
+    if len(result.skipped) > 5:
+        messages.warning(request, f"Skipped {len(result.skipped) - 5} more lines.")
+    return redirect('members_list', club_id=club_id)
@@ -1,5 +1,7 @@
 """Decorators representing requirements of views to be accessed"""
 
+from functools import wraps
+
 from django.contrib import messages
 from django.shortcuts import redirect
 from django.conf import settings
@@ -15,71 +17,47 @@ def login_prohibited(view_function):
 
     return modified_view_fuction
 
-def club_exists(view_function):
-    def modified_view_fuction(request, club_id, **kwargs):
-        if not Club.objects.filter(id=club_id).exists():
-            messages.error(request, 'No club with id ' + str(club_id) + ' exists.')
-            return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
-        else:
-            return view_function(request, club_id, **kwargs)
-
-    return modified_view_fuction
-
-def membership_exists(view_function):
-    def modified_view_fuction(request, member_id, **kwargs):
-        if not Membership.objects.filter(id=member_id).exists():
-            messages.error(request, 'No membership with id ' + str(member_id) + ' exists.')
-            return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
-        else:
-            return view_function(request, member_id, **kwargs)
-
-    return modified_view_fuction
-
-def application_exists(view_function):
-    def modified_view_fuction(request, app_id, **kwargs):
-        if not Application.objects.filter(id=app_id).exists():
-            messages.error(request, 'No application with id ' + str(app_id) + ' exists.')
-            return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
-        else:
-            return view_function(request, app_id, **kwargs)
-
-    return modified_view_fuction
-
-def ban_exists(view_function):
-    def modified_view_fuction(request, ban_id, **kwargs):
-        if not Ban.objects.filter(id=ban_id).exists():
-            messages.error(request, 'No ban with id ' + str(ban_id) + ' exists.')
-            return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
-        else:
-            return view_function(request, ban_id, **kwargs)
-
-    return modified_view_fuction
-
-def tournament_exists(view_function):
-    def modified_view_fuction(request, tournament_id, **kwargs):
-        if not Tournament.objects.filter(id=tournament_id).exists():
-            messages.error(request, 'No tournament with id ' + str(tournament_id) + ' exists.')
-            return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
-        else:
-            return view_function(request, tournament_id, **kwargs)
-
-    return modified_view_fuction
-
-def match_exists(view_function):
-    def modified_view_fuction(request, match_id, **kwargs):
-        if not Match.objects.filter(id=match_id).exists():
-            messages.error(request, 'No match with id ' + str(match_id) + ' exists.')
-            return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
-        else:
-            return view_function(request, match_id, **kwargs)
-
-    return modified_view_fuction
+def object_exists(model, id_name, attribute, queryset=None):
+    """
+    Return a decorator loading the object whose id a view takes, or redirecting if there is none.
+
+    The object is fetched once, with the joins the view declares, and set on the
+    request as attribute so the view does not fetch it again, e.g. @club_exists
+    or @membership_exists(select_related=['club', 'user']). It is fetched from
+    queryset(request) if given, e.g. to annotate it for the current user.
+    """
+    def decorator(view_function=None, select_related=()):
+        if view_function is None:
+            return lambda view_function: decorator(view_function, select_related)
+
+        @wraps(view_function)
+        def modified_view_fuction(request, *args, **kwargs):
+            object_id = kwargs[id_name] if id_name in kwargs else args[0]
+            objects = model.objects.all() if queryset is None else queryset(request)
+            loaded = objects.select_related(*select_related).filter(id=object_id).first()
+            if loaded is None:
+                messages.error(request, f'No {model._meta.verbose_name} with id {object_id} exists.')
+                return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
+            setattr(request, attribute, loaded)
+            return view_function(request, *args, **kwargs)
+
+        return modified_view_fuction
+
+    return decorator
+
+club_exists = object_exists(Club, 'club_id', 'club')
+# Memberships are acted on by other members, so the roles of the current user in the club come along.
+membership_exists = object_exists(Membership, 'member_id', 'membership', lambda request: Membership.objects.with_roles_of(request.user))
+application_exists = object_exists(Application, 'app_id', 'application')
+ban_exists = object_exists(Ban, 'ban_id', 'ban')
+tournament_exists = object_exists(Tournament, 'tournament_id', 'tournament')
+match_exists = object_exists(Match, 'match_id', 'match')
 
 def not_banned(view_function):
     def modified_view_fuction(request, club_id, **kwargs):
-        club = Club.objects.get(id=club_id) #Must be used with @club_exists
+        club = request.club #Must be used with @club_exists
         if Ban.objects.filter(club=club, user=request.user).exists():
-            member = Membership.objects.get(club=club, is_owner=True)
+            member = Membership.objects.select_related('user').get(club=club, is_owner=True)
             messages.error(request, 'You are banned from ' + club.name + '. Contact the owner ' + member.user.first_name + ' ' + member.user.last_name + ' for details by email at ' + member.user.email + '.')
             return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
         else:
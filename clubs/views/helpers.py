@@ -1,41 +1,16 @@
 """Functions to aid functionality of the views"""
-from django.core.exceptions import ObjectDoesNotExist
-from clubs.models import Club, Membership, Organiser, Participant
+from clubs.models import Club, Organiser, Participant, TournamentStageBase, SingleGroup, Match, compute_standings
+from clubs.roles import (has_user_applied_to_club, is_user_member_of_club,
+    is_user_officer_of_club, is_user_owner_of_club, is_user_organiser_of_tournament,
+    is_lead_organiser_of_tournament, is_participant_in_tournament)
+from clubs.cache_versions import get_versions, MATCH_COLLECTIONS
+from django.db.models import F
 from django.db.models.functions import Lower
+from django.utils.functional import cached_property
+from django.utils.timezone import now
 
-
-def is_user_officer_of_club(user, club):
-    return Membership.objects.filter(user=user, club=club, is_officer=True).exists()
-
-def is_user_owner_of_club(user, club):
-    return Membership.objects.filter(user=user, club=club, is_owner=True).exists()
-
-def is_user_member_of_club(user, club):
-    return Membership.objects.filter(user=user, club=club).exists()
-
-def is_user_organiser_of_tournament(user, tournament):
-    try:
-        possible_organiser_member = Membership.objects.get(club = tournament.club, user = user)
-    except(ObjectDoesNotExist):
-        return False
-    else:
-        return Organiser.objects.filter(member = possible_organiser_member, tournament = tournament).exists()
-
-def is_lead_organiser_of_tournament(user, tournament):
-    try:
-        possible_organiser_member = Membership.objects.get(club = tournament.club, user = user)
-    except(ObjectDoesNotExist):
-        return False
-    else:
-        return Organiser.objects.filter(member = possible_organiser_member, tournament = tournament, is_lead_organiser = True).exists()
-
-def is_participant_in_tournament(user, tournament):
-    try:
-        possible_organiser_member = Membership.objects.get(club = tournament.club, user = user)
-    except(ObjectDoesNotExist):
-        return False
-    else:
-        return Participant.objects.filter(member = possible_organiser_member, tournament = tournament).exists()
+# Shown when a member management action finds the roles it was allowed for changed by another request.
+ROLES_CHANGED_MESSAGE = 'The roles in this club have just changed. Please try again.'
 
 def sort_clubs(param, order):
     if order == "asc":
@@ -47,3 +22,143 @@ def sort_clubs(param, order):
     else:
         clubs = Club.objects.all()
     return clubs
+
+def get_tournaments_of_user(user):
+    """
+    Sort the tournaments a user plays in or organises into past, ongoing and upcoming.
+
+    Returns a pair of lists (participating, organising), each holding three lists of
+    tournaments: past, ongoing and upcoming. Only two queries are made regardless of
+    how many tournaments exist.
+    """
+    participants = (Participant.objects
+        .filter(member__user=user, member__club=F('tournament__club'))
+        .select_related('tournament', 'member__club')
+        .order_by('tournament__start', 'tournament__id'))
+    organisers = (Organiser.objects
+        .filter(member__user=user, member__club=F('tournament__club'))
+        .select_related('tournament', 'member__club')
+        .order_by('tournament__start', 'tournament__id'))
+
+    curr_time = now()
+    my_tournaments = ([[], [], []], [[], [], []])
+    participating_ids = set()
+    for outer_index, relationships in enumerate((participants, organisers)):
+        for relationship in relationships:
+            tournament = relationship.tournament
+            if outer_index == 0:
+                participating_ids.add(tournament.id)
+            elif tournament.id in participating_ids:
+                # A participant is never listed as organiser of the same tournament.
+                continue
+
+            if tournament.end <= curr_time:
+                inner_index = 0
+            elif tournament.start <= curr_time:
+                inner_index = 1
+            else:
+                inner_index = 2
+            my_tournaments[outer_index][inner_index].append(tournament)
+
+    return my_tournaments
+
+
+class BracketStage:
+    """A single round of a TournamentBracket, holding its matches or groups."""
+    def __init__(self, bracket, stage):
+        self.bracket = bracket
+        self.stage = stage
+        self.id = stage.id
+        self.round_num = stage.round_num
+        self.groups = []
+        self._matches = []
+
+    @property
+    def matches(self):
+        self.bracket.load_matches()
+        return self._matches
+
+    @property
+    def cache_version(self):
+        """Changes whenever a result within the stage does, for keying its cached fragments."""
+        versions = self.bracket.cache_versions
+        return '-'.join(str(versions[collection.id]) for collection in (self.groups or [self]))
+
+class BracketGroup:
+    """A single round robin group within a BracketStage."""
+    def __init__(self, bracket, group):
+        self.bracket = bracket
+        self.group = group
+        self.id = group.id
+        self.winners_required = group.winners_required
+        self._matches = []
+
+    @property
+    def matches(self):
+        self.bracket.load_matches()
+        return self._matches
+
+    @cached_property
+    def standings(self):
+        return compute_standings(self.matches)
+
+class TournamentBracket:
+    """
+    Everything the tournament page shows, loaded up front.
+
+    Stages, groups, matches with their players, and organisers are each fetched
+    with a single query and assembled into a tree, so templates can walk the
+    whole bracket without touching the database. Matches are only fetched once
+    first needed, as stages rendered from the cache do not need them.
+    """
+    def __init__(self, tournament):
+        self.tournament = tournament
+        self.organisers = list(Organiser.objects.filter(tournament=tournament).select_related('member__user'))
+        self.num_participants = tournament.participant_count
+
+        stages = (TournamentStageBase.objects
+            .filter(tournament=tournament)
+            .select_related('knockoutstage', 'groupstage')
+            .order_by('-round_num'))
+        self.knockout_stages = []
+        self.group_stages = []
+        self.current_round = None
+        # Matches belong either to a knockout stage or to a group, both of which are collections.
+        self._collections = {}
+        self._matches_loaded = False
+        for stage_base in stages:
+            stage = stage_base.get_stage()
+            if stage is None:
+                continue
+            node = BracketStage(self, stage)
+            if self.current_round is None:
+                self.current_round = node
+            if hasattr(stage_base, 'knockoutstage'):
+                self.knockout_stages.append(node)
+                self._collections[node.id] = node
+            else:
+                self.group_stages.append(node)
+
+        if self.group_stages:
+            group_stages = {node.id: node for node in self.group_stages}
+            for group in SingleGroup.objects.filter(tournament=tournament).order_by('id'):
+                node = BracketGroup(self, group)
+                group_stages[group.group_stage_id].groups.append(node)
+                self._collections[node.id] = node
+
+    @cached_property
+    def cache_versions(self):
+        return get_versions(MATCH_COLLECTIONS, self._collections)
+
+    def load_matches(self):
+        """Fetch the matches of every stage at once, the first time any are needed."""
+        if self._matches_loaded:
+            return
+        self._matches_loaded = True
+        if self._collections:
+            matches = (Match.objects
+                .filter(collection__tournament=self.tournament)
+                .select_related('white_player__member__user', 'black_player__member__user')
+                .order_by('collection', 'id'))
+            for match in matches:
+                self._collections[match.collection_id]._matches.append(match)
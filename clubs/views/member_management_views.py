@@ -4,29 +4,31 @@ from django.views import View
 from django.contrib import messages
 from django.shortcuts import render, redirect
 
-from .helpers import is_user_owner_of_club, is_user_officer_of_club
+from .helpers import is_user_owner_of_club, is_user_officer_of_club, ROLES_CHANGED_MESSAGE
 from .decorators import membership_exists, ban_exists, club_exists
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 
 from clubs.models import Membership, Club, Ban
+from clubs.pagination import KeysetList, list_key
 
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.conf import settings
 
 
 @login_required
-@membership_exists
+@membership_exists(select_related=['club', 'user'])
 def kick_member(request, member_id):
     """Allow an owner or officer to kick a given member from their club."""
-    current_user = request.user
-    member = Membership.objects.get(id=member_id)
+    member = request.membership
     club = member.club
-    if is_user_owner_of_club(current_user, club) or is_user_officer_of_club(current_user, club):
-        if not is_user_officer_of_club(member.user, club):
-            if not is_user_owner_of_club(member.user, club):
-                Membership.objects.filter(id=member_id).delete()
-                messages.warning(request, '@' + member.user.username + ' was kicked from the club.')
+    if member.actor_is_owner or member.actor_is_officer:
+        if not member.is_officer:
+            if not member.is_owner:
+                if member.kick(request.user):
+                    messages.warning(request, '@' + member.user.username + ' was kicked from the club.')
+                else:
+                    messages.error(request, ROLES_CHANGED_MESSAGE)
             else:
                 messages.error(request, 'You are the owner. You cannot kick yourself from your club. Transfer ownership before leaving or delete the club.')
         else:
@@ -36,18 +38,18 @@ def kick_member(request, member_id):
     return redirect('members_list', club_id=club.id)
 
 @login_required
-@membership_exists
+@membership_exists(select_related=['club', 'user'])
 def ban_member(request, member_id):
     """Allow the owner to ban a given member from their club."""
-    current_user = request.user
-    member = Membership.objects.get(id=member_id)
+    member = request.membership
     club = member.club
-    if is_user_owner_of_club(current_user, club):
-        if not is_user_officer_of_club(member.user, club): #Owners can only ban members, not officers.
-            if not is_user_owner_of_club(member.user, club): #An owner cannot ban themselves.
-                Ban.objects.create(club=club, user=member.user)
-                Membership.objects.filter(id=member_id).delete()
-                messages.warning(request, '@' + member.user.username + ' was banned from the club.')
+    if member.actor_is_owner:
+        if not member.is_officer: #Owners can only ban members, not officers.
+            if not member.is_owner: #An owner cannot ban themselves.
+                if member.ban(request.user):
+                    messages.warning(request, '@' + member.user.username + ' was banned from the club.')
+                else:
+                    messages.error(request, ROLES_CHANGED_MESSAGE)
             else:
                 messages.error(request, "You are the owner. You cannot ban yourself from your club.")
         else: #Tried to ban an officer.
@@ -61,10 +63,11 @@ def ban_member(request, member_id):
 @club_exists
 def banned_members(request, club_id):
     """Allow the owner and officer of a club to view banned members to said club."""
-    club_to_view = Club.objects.get(id = club_id)
+    club_to_view = request.club
     if is_user_owner_of_club(request.user, club_to_view) or is_user_officer_of_club(request.user, club_to_view):
 
-        paginator = Paginator(club_to_view.get_banned_members(), settings.BANNED_MEMBERS_PER_PAGE)
+        bans = KeysetList(club_to_view.get_banned_members().order_by('pk'), list_key('bans', club_to_view.pk))
+        paginator = Paginator(bans, settings.BANNED_MEMBERS_PER_PAGE)
 
         page = request.GET.get('page')
         try:
@@ -81,11 +84,11 @@ def banned_members(request, club_id):
 
 
 @login_required
-@ban_exists
+@ban_exists(select_related=['club', 'user'])
 def unban_member(request, ban_id):
     """Allow the owner to revoke a given ban from their club."""
     current_user = request.user
-    ban = Ban.objects.get(id=ban_id)
+    ban = request.ban
     club = ban.club
     if is_user_owner_of_club(current_user, club):
         Membership.objects.create(club=club, user=ban.user)
@@ -97,17 +100,18 @@ def unban_member(request, ban_id):
     return redirect('banned_members', club_id=club.id)
 
 @login_required
-@membership_exists
+@membership_exists(select_related=['club', 'user'])
 def promote_member_to_officer(request, member_id):
     """Allow the owner of a club to promote some member of said club to officer."""
-    member = Membership.objects.get(id = member_id)
+    member = request.membership
     club = member.club
-    if is_user_owner_of_club(request.user, club):
-        if not is_user_owner_of_club(member.user, club):
-            if not is_user_officer_of_club(member.user, club):
-                member.is_officer = True
-                member.save() # Or database won't update.
-                messages.success(request, '@' + member.user.username + ' was promoted to officer.')
+    if member.actor_is_owner:
+        if not member.is_owner:
+            if not member.is_officer:
+                if member.promote(request.user):
+                    messages.success(request, '@' + member.user.username + ' was promoted to officer.')
+                else:
+                    messages.error(request, ROLES_CHANGED_MESSAGE)
             else: #Access denied owner is trying to promote an officer.
                 messages.warning(request, '@' + member.user.username + ' is already an officer.')
         else: #Access denied owner is trying to promote themselves.
@@ -118,17 +122,18 @@ def promote_member_to_officer(request, member_id):
     return redirect('members_list', club_id=club.id)
 
 @login_required
-@membership_exists
+@membership_exists(select_related=['club', 'user'])
 def demote_officer_to_member(request, member_id):
     """Allow the owner of a club to promote some member of said club to officer."""
-    member = Membership.objects.get(id = member_id)
+    member = request.membership
     club = member.club
-    if is_user_owner_of_club(request.user, club) :
-        if not is_user_owner_of_club(member.user, club):
-            if is_user_officer_of_club(member.user, club):
-                member.is_officer = False
-                member.save() # Or database won't update.
-                messages.warning(request, '@' + member.user.username + ' was demoted.')
+    if member.actor_is_owner:
+        if not member.is_owner:
+            if member.is_officer:
+                if member.demote(request.user):
+                    messages.warning(request, '@' + member.user.username + ' was demoted.')
+                else:
+                    messages.error(request, ROLES_CHANGED_MESSAGE)
             else: #Access denied, trying to demote non-officer.
                 messages.warning(request, '@' + member.user.username + ' is not an officer.')
         else: #Access denied, owner is trying to demote themselves.
@@ -1,6 +1,9 @@
 """Miscellaneous views."""
 
 from .helpers import sort_clubs
+from clubs.search import search_clubs
+from clubs.directory import CachedDirectory
+from clubs.instrumentation import view_reports
 from .decorators import login_prohibited, club_exists
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
@@ -15,6 +18,8 @@ from django.conf import settings
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from itertools import chain
 from django.views import View
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
 
 @login_prohibited
 def home(request):
@@ -26,9 +31,8 @@ def home(request):
 def show_clubs(request, param=None, order=None):
     """Return a list of every club created on the website"""
     if request.method == "POST":
-        #print(f"\n\n\n-----SEARCHED{searched}-----\n\n\n")
         searched = request.POST.get('searched')
-        clubs = Club.objects.filter(name__contains=searched)
+        clubs = search_clubs(searched)
 
 
         paginator = Paginator(clubs, settings.CLUBS_PER_PAGE)
@@ -43,7 +47,9 @@ def show_clubs(request, param=None, order=None):
 
         return render(request, 'club/show_clubs.html', {'searched': searched, 'current_user': request.user, 'page_obj':page_obj,})
 
-    clubs = sort_clubs(param, order)
+    if order not in ("asc", "des"):
+        param = order = None
+    clubs = CachedDirectory(sort_clubs(param, order), param, order)
 
     paginator = Paginator(clubs, settings.CLUBS_PER_PAGE)
 
@@ -60,15 +66,9 @@ def show_clubs(request, param=None, order=None):
 
 @login_required
 def my_clubs_list(request):
+    """Return a list of the clubs the user is a member of or has applied to."""
     current_user = request.user
-    my_clubs = []
-    for club in Club.objects.all():
-        if Application.objects.filter(club=club, user=current_user):
-            my_clubs.append(club)
-        if Membership.objects.filter(club=club, user=current_user):
-            my_clubs.append(club)
-
-    paginator = Paginator(my_clubs, settings.CLUBS_PER_PAGE)
+    paginator = Paginator(current_user.get_clubs_and_applications(), settings.CLUBS_PER_PAGE)
 
     page = request.GET.get('page')
     try:
@@ -82,3 +82,11 @@ def my_clubs_list(request):
         'current_user':current_user,
         'page_obj':page_obj,
     })
+
+
+@login_required
+def query_report(request):
+    """Return the query counts and latency recorded for each view, as JSON for staff."""
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return JsonResponse({'enabled': settings.QUERY_INSTRUMENTATION, 'views': view_reports()})
@@ -4,9 +4,10 @@ from django.views.generic.edit import UpdateView, FormView
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 
-from .decorators import match_exists, tournament_exists, club_exists
+from .decorators import match_exists, tournament_exists, club_exists, membership_exists
 from .helpers import is_lead_organiser_of_tournament, is_user_organiser_of_tournament, is_participant_in_tournament, is_user_owner_of_club, is_user_officer_of_club, is_user_member_of_club
 
+from django.db import transaction
 from django.utils.timezone import now
 
 from django.contrib import messages
@@ -35,7 +36,7 @@ class OrganiseTournamentView(FormView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['current_user'] = self.request.user
-        context['club'] = Club.objects.get(id=self.kwargs['club_id'])
+        context['club'] = self.request.club
         return context
 
     def form_valid(self, form):
@@ -54,10 +55,10 @@ class OrganiseTournamentView(FormView):
         return reverse('show_club', kwargs={'club_id': club.id})
 
 @login_required
-@tournament_exists
+@tournament_exists(select_related=['club'])
 def begin_tournament(request, tournament_id):
     """View to begin a tournament."""
-    tournament = Tournament.objects.get(id=tournament_id)
+    tournament = request.tournament
     if not is_user_member_of_club(request.user, tournament.club):
         messages.add_message(request, messages.ERROR, "The tournament is for members only!")
         return redirect('show_clubs')
@@ -82,7 +83,7 @@ class AddResultView(UpdateView):
     template_name = "tournament/tournament_add_match_result.html"
     form_class = AddResultForm
 
-    @method_decorator(match_exists)
+    @method_decorator(match_exists(select_related=['collection__tournament__club', 'white_player__member__user', 'black_player__member__user']))
     @method_decorator(login_required)
     def dispatch(self, request, match_id):
         match = self.get_object()
@@ -122,10 +123,12 @@ class AddResultView(UpdateView):
         return my_form
 
     def form_valid(self, form):
-        response = super().form_valid(form)
-        t = self.get_object().collection.tournament
-        if t.get_current_round().get_is_complete():
-            t.generate_next_round()
+        # Recording the last result and drawing the next round succeed or fail together.
+        with transaction.atomic():
+            response = super().form_valid(form)
+            t = self.object.collection.tournament
+            if t.get_current_round().get_is_complete():
+                t.generate_next_round()
         return response
 
     def get_context_data(self, **kwargs):
@@ -135,7 +138,7 @@ class AddResultView(UpdateView):
 
     def get_object(self):
         """Return the object (match) to be updated."""
-        return Match.objects.get(id=self.kwargs['match_id'])
+        return self.request.match
 
     def get_success_url(self):
         """Return redirect URL after successful update."""
@@ -146,9 +149,9 @@ class AddResultView(UpdateView):
 
 
 @login_required
-@tournament_exists
+@tournament_exists(select_related=['club'])
 def add_tournament_organiser_list(request, tournament_id):
-    tournament = Tournament.objects.get(id=tournament_id)
+    tournament = request.tournament
     club = tournament.club
     if Membership.objects.filter(user=request.user, club=club).exists():
         member =  Membership.objects.get(user=request.user, club=club)
@@ -166,37 +169,32 @@ def add_tournament_organiser_list(request, tournament_id):
     return redirect('show_tournament', tournament_id=tournament.id)
 
 @login_required
-@tournament_exists
+@tournament_exists(select_related=['club'])
+@membership_exists(select_related=['user'])
 def add_organiser_to_tournament(request, tournament_id, member_id):
     """Allow the head organiser of a tournament to assign other officers/owner of the club organising the tournament to officer."""
+    tournament = request.tournament
+    new_organiser_member = request.membership
+
+    if is_lead_organiser_of_tournament(request.user, tournament):
+        if not is_user_organiser_of_tournament(new_organiser_member.user, tournament):
+            if not is_participant_in_tournament(new_organiser_member.user, tournament):
+                if is_user_owner_of_club(new_organiser_member.user, tournament.club) or is_user_officer_of_club(new_organiser_member.user, tournament.club):
+                    Organiser.objects.create(
+                        member = new_organiser_member,
+                        tournament = tournament
+                    )
+                    messages.success(request, '@' + new_organiser_member.user.username + ' is now an organiser of the tournament: ' + tournament.name + ".")
+                else: #Access denied organiser can only assign organiser roles to other members who are officers or the owner
+                    messages.error(request, 'You can only assign officers or the owner to be organisers for tournaments.')
+            else: # User is a participant, so they cannot be an organiser of the same tournament
+                messages.warning(request, '@' + new_organiser_member.user.username + ' is already a participant of tournament ' + tournament.name)
+        else: # User is already an organiser
+            if is_user_organiser_of_tournament(new_organiser_member.user, tournament):
+                messages.error(request, "You are the lead organiser. You cannot add yourself as organiser.")
+            else:
+                messages.warning(request, '@' + new_organiser_member.user.username + ' is already an organiser of tournament ' + tournament.name)
+    else: # Access denied, member isn't the lead organiser of tournament
+        messages.warning(request, 'Only the lead organiser can assign other organisers to their tournament.')
 
-    if not Membership.objects.filter(id=member_id).exists(): #View function takes various arguments, so decorator to check for it throws an error
-        messages.error(request, 'No membership with id ' + str(member_id) + ' exists.')
-        return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
-    else:
-
-        tournament = Tournament.objects.get(id = tournament_id)
-        new_organiser_member = Membership.objects.get(id = member_id)
-
-        if is_lead_organiser_of_tournament(request.user, tournament):
-            if not is_user_organiser_of_tournament(new_organiser_member.user, tournament):
-                if not is_participant_in_tournament(new_organiser_member.user, tournament):
-                    if is_user_owner_of_club(new_organiser_member.user, tournament.club) or is_user_officer_of_club(new_organiser_member.user, tournament.club):
-                        Organiser.objects.create(
-                            member = new_organiser_member,
-                            tournament = tournament
-                        )
-                        messages.success(request, '@' + new_organiser_member.user.username + ' is now an organiser of the tournament: ' + tournament.name + ".")
-                    else: #Access denied organiser can only assign organiser roles to other members who are officers or the owner
-                        messages.error(request, 'You can only assign officers or the owner to be organisers for tournaments.')
-                else: # User is a participant, so they cannot be an organiser of the same tournament
-                    messages.warning(request, '@' + new_organiser_member.user.username + ' is already a participant of tournament ' + tournament.name)
-            else: # User is already an organiser
-                if is_user_organiser_of_tournament(new_organiser_member.user, tournament):
-                    messages.error(request, "You are the lead organiser. You cannot add yourself as organiser.")
-                else:
-                    messages.warning(request, '@' + new_organiser_member.user.username + ' is already an organiser of tournament ' + tournament.name)
-        else: # Access denied, member isn't the lead organiser of tournament
-            messages.warning(request, 'Only the lead organiser can assign other organisers to their tournament.')
-
-        return redirect('show_tournament', tournament_id=tournament.id)
+    return redirect('show_tournament', tournament_id=tournament.id)
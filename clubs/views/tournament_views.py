@@ -1,13 +1,15 @@
 from django.http import request
+from django.db import IntegrityError, OperationalError
 from django.views import View
 
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 
 from clubs.models import Tournament, Club, Organiser, Membership, Participant, GroupStage, KnockoutStage, MemberTournamentRelationship
+from clubs.pagination import KeysetList, list_key
 
 from .decorators import club_exists, tournament_exists, membership_exists
-from .helpers import is_user_organiser_of_tournament, is_user_owner_of_club, is_user_officer_of_club, is_lead_organiser_of_tournament, is_participant_in_tournament
+from .helpers import is_user_organiser_of_tournament, is_user_owner_of_club, is_user_officer_of_club, is_lead_organiser_of_tournament, is_participant_in_tournament, is_user_member_of_club, get_tournaments_of_user, TournamentBracket
 
 
 from datetime import datetime
@@ -23,18 +25,19 @@ from django.conf import settings
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 
 @login_required
-@tournament_exists
+@tournament_exists(select_related=['club'])
 def show_tournament(request, tournament_id):
-    tournament = Tournament.objects.get(id=tournament_id)
+    tournament = request.tournament
     club = tournament.club
-    if Membership.objects.filter(user=request.user, club=club).exists():
-        tournament_group_stages = list(reversed(GroupStage.objects.filter(tournament=tournament)))
-        tournament_knockout_stages = list(reversed(KnockoutStage.objects.filter(tournament=tournament)))
+    if is_user_member_of_club(request.user, club):
+        bracket = TournamentBracket(tournament)
         return render(request, 'tournament/show_tournament.html', {
                 'current_user': request.user,
                 'tournament': tournament,
-                'tournament_group_stages': tournament_group_stages,
-                'tournament_knockout_stages': tournament_knockout_stages,
+                'bracket': bracket,
+                'tournament_group_stages': bracket.group_stages,
+                'tournament_knockout_stages': bracket.knockout_stages,
+                'results_cache_timeout': settings.RESULTS_CACHE_TIMEOUT,
             }
         )
     else:
@@ -42,13 +45,14 @@ def show_tournament(request, tournament_id):
     return redirect('show_club', club_id=club.id)
 
 @login_required
-@tournament_exists
+@tournament_exists(select_related=['club'])
 def show_tournament_participants(request, tournament_id):
-    tournament = Tournament.objects.get(id=tournament_id)
+    tournament = request.tournament
     club = tournament.club
     if Membership.objects.filter(user=request.user, club=club).exists():
 
-        paginator = Paginator(tournament.get_participants(), settings.TOURNAMENT_PARTICIPANTS_PER_PAGE)
+        participants = KeysetList(tournament.get_participants().order_by('pk'), list_key('participants', tournament.pk), count=tournament.participant_count)
+        paginator = Paginator(participants, settings.TOURNAMENT_PARTICIPANTS_PER_PAGE)
 
         page = request.GET.get('page')
         try:
@@ -69,10 +73,10 @@ def show_tournament_participants(request, tournament_id):
     return redirect('show_club', club_id=club.id)
 
 @login_required
-@tournament_exists
+@tournament_exists(select_related=['club'])
 def withdraw_participation_from_tournament(request, tournament_id):
     """Have currently logged in user withdraw from a tournament, if it exists."""
-    tournament = Tournament.objects.get(id=tournament_id)
+    tournament = request.tournament
     member = get_object_or_404(Membership, user = request.user, club = tournament.club)
 
     if Participant.objects.filter(tournament=tournament, member=member).exists():
@@ -86,9 +90,9 @@ def withdraw_participation_from_tournament(request, tournament_id):
     return redirect('show_club', club_id=tournament.club.id)
 
 @login_required
-@tournament_exists
+@tournament_exists(select_related=['club'])
 def join_tournament(request, tournament_id):
-    tour = Tournament.objects.get(id = tournament_id)
+    tour = request.tournament
     if Membership.objects.filter(club=tour.club, user=request.user).exists():
         member = Membership.objects.get(club=tour.club, user=request.user)
     else:
@@ -98,14 +102,22 @@ def join_tournament(request, tournament_id):
     is_not_organiser = not Organiser.objects.filter(member = member, tournament = tour).exists()
     is_in_tournament = Participant.objects.filter(member = member, tournament = tour).exists()
 
-    current_capacity = Participant.objects.filter(tournament = tour)
-    if(current_capacity.count() < tour.capacity):
+    if(not tour.is_full()):
         if(is_not_organiser == True):
             if(is_in_tournament == False):
-                participant = Participant.objects.create(
-                    member = member,
-                    tournament = tour
-                )
+                try:
+                    participant = tour.add_participant(member)
+                except IntegrityError:
+                    # The same member joined from another request meanwhile.
+                    participant = None
+                    messages.error(request, 'You are already enrolled in the tournament')
+                except OperationalError:
+                    # The counter stayed locked by other joins for longer than the database waits, e.g. on SQLite.
+                    participant = None
+                    messages.error(request, 'Many members are joining the tournament right now, please try again')
+                else:
+                    if participant is None:
+                        messages.error(request, 'Tournament is full')
             else:
                  messages.error(request, 'You are already enrolled in the tournament')
         else:
@@ -117,33 +129,8 @@ def join_tournament(request, tournament_id):
 
 @login_required
 def my_tournaments_list(request):
-    current_user = request.user
-    my_tournaments = [
-        [[],[],[]], # Participant... past/present/future
-        [[],[],[]] # Organiser
-    ]
-
-    curr_time = now()
-
-    for tournament in Tournament.objects.all():
-        if Membership.objects.filter(user=current_user, club=tournament.club).exists():
-            member= Membership.objects.get(user=current_user, club=tournament.club)
-            if Participant.objects.filter(tournament=tournament, member=member).exists():
-                outer_index=0
-            elif Organiser.objects.filter(tournament=tournament, member=member).exists():
-                outer_index=1
-            else:
-                outer_index=None
-
-            if outer_index!=None:
-                if tournament.end <= curr_time:
-                    inner_index = 0
-                elif tournament.start <= curr_time:
-                    inner_index = 1
-                else:
-                    inner_index = 2
-
-                my_tournaments[outer_index][inner_index].append(tournament)
+    """List the tournaments the user takes part in, split by role and by date."""
+    my_tournaments = get_tournaments_of_user(request.user)
 
     return render(request, 'tournament/my_tournament_list.html', {
                 'current_user': request.user,
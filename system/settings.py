@@ -45,11 +45,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'clubs.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'clubs.middleware.RoleResolverMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -152,6 +154,54 @@ APPLICATIONS_PER_PAGE = 15
 BANNED_MEMBERS_PER_PAGE = 15
 TOURNAMENT_PARTICIPANTS_PER_PAGE = 15
 
+#Caching
+# Content is cached in each process, under versions kept in the shared cache. A change made
+# through one process invalidates what every process reading the same shared cache cached.
+# Production, with several gunicorn workers and dynos, therefore needs memcached or a database
+# cache there, set through SHARED_CACHE_BACKEND and SHARED_CACHE_LOCATION, e.g.
+# django.core.cache.backends.db.DatabaseCache with a table made by `manage.py createcachetable`.
+# Left unset, each process keeps its own, which only suits a single process such as runserver.
+# Tests always keep it in memory, see clubs.tests.runner.
+SHARED_CACHE_BACKEND = os.environ.get('SHARED_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'chess-clubs',
+    },
+    'shared': {
+        'BACKEND': SHARED_CACHE_BACKEND,
+        'LOCATION': os.environ.get('SHARED_CACHE_LOCATION', 'chess-clubs-shared'),
+        'TIMEOUT': None,
+        # Versions are kept for every club, list and stage, so far more than the default 300.
+        # Memcached evicts entries itself and takes no such option.
+        'OPTIONS': {} if 'memcached' in SHARED_CACHE_BACKEND else {'MAX_ENTRIES': 100000},
+    },
+}
+
+TEST_RUNNER = 'clubs.tests.runner.IsolatedCacheTestRunner'
+
+# Rendered results and fixtures of tournament stages. Entries are replaced as soon as a result
+# changes, so the timeout only bounds how long renamed players keep their old names.
+RESULTS_CACHE_TIMEOUT = 60 * 60
+
+# Pages of the club directory, which are replaced as soon as any club changes.
+CLUB_DIRECTORY_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Counts and page boundaries of paginated lists, which are replaced as soon as their rows change.
+PAGINATION_CACHE_TIMEOUT = 60 * 60
+
+#Instrumentation
+# Record the queries and latency of every request per view, reported by the query_report
+# command and at /instrumentation/queries/ for staff.
+QUERY_INSTRUMENTATION = False
+
+#Avatars
+# Serve avatars from this site, which fetches each from gravatar once and caches it, so
+# browsers cache them by user and list pages send no requests to gravatar. Avatars are
+# only served to logged in users, as the email hash they are looked up by is private.
+AVATAR_PROXY = False
+AVATAR_MAX_AGE = 60 * 60 * 24
+
 # Activate django_heroku
 if '/app' in os.environ['HOME']:
     import django_heroku
@@ -13,6 +13,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, register_converter
 from clubs import views
@@ -25,6 +26,7 @@ handler500 = 'clubs.views.errors.server_error_custom'
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('instrumentation/queries/', views.query_report, name='query_report'),
     path('', views.home, name='home'),
     path('sign_up/', views.SignUpView.as_view(), name='sign_up'),
     path('log_in/', views.LogInView.as_view(), name='log_in'),
@@ -46,6 +48,8 @@ urlpatterns = [
     path('club/<int:club_id>/withdraw_application/', views.withdraw_application_to_club, name = 'withdraw_application_to_club'),
     path('club/<int:club_id>/leave/', views.leave_club, name = 'leave_club'),
     path('club/<int:club_id>/members/', views.members_list, name='members_list'),
+    path('club/<int:club_id>/members/export/', views.export_club_roster, name='export_club_roster'),
+    path('club/<int:club_id>/members/import/', views.import_club_roster, name='import_club_roster'),
     path('club/<int:club_id>/applications/', views.show_applications_to_club, name='show_applications_to_club'),
     path('club/<int:club_id>/banned_members/', views.banned_members, name='banned_members'),
     path('club/<int:club_id>/organise_tournament/', views.OrganiseTournamentView.as_view(), name='organise_tournament'),
@@ -54,6 +58,7 @@ urlpatterns = [
 
 
     path('application/<int:app_id>/respond/<bool:is_accepted>/', views.respond_to_application, name='respond_to_application'),
+    path('club/<int:club_id>/applications/respond/', views.respond_to_applications, name='respond_to_applications'),
 
     path('banned/<int:ban_id>/unban/', views.unban_member, name='unban_member'),
 
@@ -74,3 +79,10 @@ urlpatterns = [
     
     path('match/<int:match_id>/add_result/', views.AddResultView.as_view(), name='add_result')
 ]
+
+# Avatars are only linked to through this route when the proxy is enabled.
+avatar_patterns = [
+    path('user/<int:user_id>/avatar/<int:size>/', views.avatar, name = 'avatar'),
+]
+if settings.AVATAR_PROXY:
+    urlpatterns += avatar_patterns